@@ -1,33 +1,117 @@
-from queue import PriorityQueue
+import heapq
+import os
 import random
+from chase import chase_step
+from spatial_index import nearest_resource
+from route_planner import route_target
+from forecast import forecast, aim
+from projectiles import ARROW_DAMAGE
+import parallel_search
+import ai_trace
+from line_of_sight import has_los, firing_position, LOS_RADIUS
+
+def _unreachable(start, goal, board):
+    comps = getattr(board, 'components', None)
+    return comps is not None and not comps.reachable(start, goal)
 
 def a_star(start, goal, board):
-    dirs = [(1,0),(-1,0),(0,1),(0,-1)]
-    open_set = PriorityQueue()
-    open_set.put((0,start))
+    if not ai_trace.ENABLED:
+        return _a_star(start, goal, board)[0]
+    t0 = ai_trace.clock()
+    path, expanded = _a_star(start, goal, board)
+    ai_trace.search('a_star', ai_trace.clock()-t0, nodes=expanded, path_len=len(path), found=int(bool(path)))
+    return path
+
+def _a_star(start, goal, board):
+    """(path, nodes expanded)"""
+    if _unreachable(start, goal, board):
+        return [], 0   # walled off: don't flood the whole component to find out
+    # Big boards carry a hierarchical pathfinder (hpa.py)
+    hpa = getattr(board, 'hpa', None)
+    if hpa is not None:
+        return hpa.path(start, goal), 0
+    bits = getattr(board, 'bits', None)
+    nbrs = bits.neighbors if bits is not None else (lambda c: _grid_neighbors(c, board))
+    open_set = [(0,start)]   # plain heap: same order as queue.PriorityQueue without its locking
     came_from = {}
     g_score = {start:0}
+    expanded = 0
 
-    while not open_set.empty():
-        _, current = open_set.get()
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        expanded += 1
         if current == goal:
             path = []
             while current in came_from:
                 path.append(current)
                 current = came_from[current]
             path.reverse()
-            return path
-        for dx, dy in dirs:
-            neighbor = (current[0]+dx, current[1]+dy)
-            if 0 <= neighbor[0] < board.size and 0 <= neighbor[1] < board.size:
-                if board.grid[neighbor[0]][neighbor[1]] == "X": continue
-                tentative = g_score[current] + 1
-                if neighbor not in g_score or tentative < g_score[neighbor]:
-                    g_score[neighbor] = tentative
-                    f = tentative + abs(neighbor[0]-goal[0]) + abs(neighbor[1]-goal[1])
-                    open_set.put((f, neighbor))
-                    came_from[neighbor] = current
-    return []
+            return path, expanded
+        for neighbor in nbrs(current):
+            tentative = g_score[current] + 1
+            if neighbor not in g_score or tentative < g_score[neighbor]:
+                g_score[neighbor] = tentative
+                f = tentative + abs(neighbor[0]-goal[0]) + abs(neighbor[1]-goal[1])
+                heapq.heappush(open_set, (f, neighbor))
+                came_from[neighbor] = current
+    return [], expanded
+
+def first_step(start, goal, board):
+    """Next cell toward goal, or None. Strategies only need the first step."""
+    if _unreachable(start, goal, board):
+        return None
+    hpa = getattr(board, 'hpa', None)
+    if hpa is not None:
+        return hpa.next_step(start, goal)
+    path = a_star(start, goal, board)
+    return path[0] if path else None
+
+# ---------- Tunable parameters (tuner.py) ----------
+# Weights/thresholds of the fuzzy strategies. A robot may carry its own vector
+# as `robot.params`; otherwise the level profile (load_profiles) or these
+# defaults apply.
+DEFAULT_PARAMS = {
+    # personality offsets (ai_decision)
+    'aggr_attack_bias': 0.3, 'aggr_gather': 0.5,
+    'def_attack_scale': 0.5, 'def_retreat_bias': 0.3, 'def_gather': 1.0,
+    'bal_gather': 0.7,
+    # per-level multipliers
+    'easy_attack': 0.7, 'easy_gather': 0.9,
+    'medium_attack': 1.0, 'medium_gather': 1.1,
+    'hard_attack': 1.3, 'hard_gather': 1.3,
+    # easy fuzzy rules
+    'easy_res_range': 8, 'easy_end_near': 6, 'easy_end_span': 10,
+    'easy_gather_res_w': 0.7, 'easy_goal_res_w': 0.4,
+    # medium fuzzy rules
+    'medium_res_range': 6, 'medium_end_near': 4, 'medium_end_span': 8,
+    'medium_gather_res_w': 0.4, 'medium_goal_res_w': 0.75,
+    # hard desires
+    'hard_res_range': 6, 'hard_end_near': 4, 'hard_end_span': 8,
+    'hard_attack_far_w': 0.7, 'hard_cooldown_damp': 0.6,
+    'hard_goal_w': 0.7, 'hard_gather_w': 0.3, 'hard_ranged_cooldown': 3,
+    # ai_vs_ai_decision
+    'ranged_min': 3, 'ranged_max': 5, 'ranged_cooldown': 3, 'intercept_radius': 6,
+}
+PROFILES = {}   # level -> params, see load_profiles
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.json")  # tuner.py writes it
+
+def get_params(robot, level=None):
+    params = getattr(robot, 'params', None)
+    if params is None:
+        params = PROFILES.get(level, DEFAULT_PARAMS)
+    return params
+
+def load_profiles(path=PROFILES_PATH):
+    """Load tuned per-level profiles (tuner.py output); missing file keeps the defaults."""
+    import json
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        data = json.load(f)
+    PROFILES.clear()
+    for level, params in data.get('profiles', data).items():
+        PROFILES[level] = dict(DEFAULT_PARAMS, **params)
+    return True
 
 # ---------- Minimax with Alpha-Beta (hard mode) ----------
 def _evaluate_state(ai_pos, ai_health, player_pos, player_health):
@@ -35,12 +119,22 @@ def _evaluate_state(ai_pos, ai_health, player_pos, player_health):
     return (ai_health - player_health) - 0.5*dist
 
 def _neighbors(pos, board):
+    # bitboard.py move generation when attached (no bounds checks / string compares)
+    bits = getattr(board, 'bits', None)
+    if bits is not None:
+        return bits.neighbors(pos)
+    return _grid_neighbors(pos, board)
+
+def _grid_neighbors(pos, board):
     for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
         nx,ny = pos[0]+dx, pos[1]+dy
         if 0<=nx<board.size and 0<=ny<board.size and board.grid[nx][ny] != "X":
             yield (nx,ny)
 
+_SEARCH = [0, 0]   # minimax nodes, alpha-beta cutoffs (read by ai_trace around root calls)
+
 def _minimax(ai_pos, ai_health, player_pos, player_health, board, depth, alpha, beta, maximizing):
+    _SEARCH[0] += 1
     if depth==0 or ai_health<=0 or player_health<=0:
         return _evaluate_state(ai_pos, ai_health, player_pos, player_health), None
     if maximizing:
@@ -57,14 +151,17 @@ def _minimax(ai_pos, ai_health, player_pos, player_health, board, depth, alpha,
                 nai_pos = npos
             elif atype=="melee":
                 npl_health = max(0, npl_health-10)
-            # shoot is delayed; heuristic benefit applied in evaluation via distance
-            val,_ = _minimax(nai_pos, nai_health, npl_pos, npl_health, board, depth-1, alpha, beta, False)
-            if atype=="shoot":
-                val += 2  # slight bias to use ranged when far
+            # shoot is delayed; its benefit is the expected arrow damage (forecast.py).
+            # The child is searched with the window shifted by it, so a cutoff
+            # bound plus the bonus is still a bound
+            bonus = _shoot_bonus(ai_pos, player_pos, board) if atype=="shoot" else 0
+            val,_ = _minimax(nai_pos, nai_health, npl_pos, npl_health, board, depth-1, alpha-bonus, beta-bonus, False)
+            val += bonus
             if val>best:
                 best=val; best_action=(atype,npos)
             alpha = max(alpha, best)
-            if beta<=alpha: break
+            if beta<=alpha:
+                _SEARCH[1] += 1; break
         return best, best_action
     else:
         best = 10**9; best_action=None
@@ -83,17 +180,50 @@ def _minimax(ai_pos, ai_health, player_pos, player_health, board, depth, alpha,
             if val<best:
                 best=val; best_action=(atype,npos)
             beta = min(beta, best)
-            if beta<=alpha: break
+            if beta<=alpha:
+                _SEARCH[1] += 1; break
         return best, best_action
 
+SHOOT_WEIGHT = 0.25   # share of the expected arrow damage credited to a shot
+
+def _shoot_bonus(ai_pos, player_pos, board):
+    """Search credit for shooting: expected damage at the best visible cell of the
+    player's one-turn forecast (a flat 2 on boards without one)."""
+    fc = getattr(board, 'forecast', None)
+    if fc is None:
+        return 2
+    _, p = aim(ai_pos, fc.occupancy(player_pos, getattr(board, 'end_player', None)), board)
+    return SHOOT_WEIGHT*ARROW_DAMAGE*p
+
+def _root_search(ai, player, board):
+    """Hard-mode root search (parallel if enabled); returns the best action."""
+    if not ai_trace.ENABLED:
+        if parallel_search.PARALLEL_SEARCH:
+            return parallel_search.parallel_minimax(ai.pos, ai.health, player.pos, player.health, board)[1]
+        return _minimax(ai.pos, ai.health, player.pos, player.health, board, depth=2, alpha=-10**9, beta=10**9, maximizing=True)[1]
+    nodes, cutoffs = _SEARCH
+    t0 = ai_trace.clock()
+    if parallel_search.PARALLEL_SEARCH:
+        val, best, depth = parallel_search.parallel_minimax(ai.pos, ai.health, player.pos, player.health, board)
+    else:
+        depth = 2
+        val, best = _minimax(ai.pos, ai.health, player.pos, player.health, board, depth=2, alpha=-10**9, beta=10**9, maximizing=True)
+    # workers count their own nodes; a parallel search only reports its depth here
+    ai_trace.search('minimax', ai_trace.clock()-t0, nodes=_SEARCH[0]-nodes, cutoffs=_SEARCH[1]-cutoffs, depth=depth)
+    ai_trace.note(minimax_value=val, minimax_action=best and best[0])
+    return best
+
 def _minimax_eval(ai, player, board):
     return (ai.health - player.health) + (ai.score - player.score) * 0.5 - ai.distance(player)
 
+@ai_trace.traced
 def ai_decision(ai, player, board, level='easy'):
     # Stun handling: if stunned, skip action this turn
     if hasattr(ai, 'stunned_turns') and ai.stunned_turns and ai.stunned_turns > 0:
         ai.stunned_turns -= 1
+        ai_trace.branch('stunned')
         return
+    P = get_params(ai, level)
     dist = ai.distance(player)
     health_low = max(0, min(1, (50 - ai.health)/50))
     health_high = max(0, min(1, (ai.health-50)/50))
@@ -102,83 +232,74 @@ def ai_decision(ai, player, board, level='easy'):
 
     # Normalize decision so either agent plays the same logic
     if getattr(ai, 'personality', 'Balanced') == 'Aggressive':
-        score_attack = dist_close * health_high + 0.3
+        score_attack = dist_close * health_high + P['aggr_attack_bias']
         score_retreat = health_low
-        score_gather = dist_far * 0.5
+        score_gather = dist_far * P['aggr_gather']
     elif getattr(ai, 'personality', 'Balanced') == 'Defensive':
-        score_attack = dist_close * health_high * 0.5
-        score_retreat = health_low + 0.3
-        score_gather = dist_far
+        score_attack = dist_close * health_high * P['def_attack_scale']
+        score_retreat = health_low + P['def_retreat_bias']
+        score_gather = dist_far * P['def_gather']
     else:
         score_attack = dist_close * health_high
         score_retreat = health_low
-        score_gather = dist_far * 0.7
+        score_gather = dist_far * P['bal_gather']
 
     # Difficulty scaling
-    if level == 'easy':
-        score_attack *= 0.7
-        score_gather *= 0.9
-    elif level == 'medium':
-        score_attack *= 1.0
-        score_gather *= 1.1
-    elif level == 'hard':
-        score_attack *= 1.3
-        score_gather *= 1.3
+    if level in ('easy', 'medium', 'hard'):
+        score_attack *= P[level+'_attack']
+        score_gather *= P[level+'_gather']
+    ai_trace.note(attack=score_attack, retreat=score_retreat, gather=score_gather)
 
     # EASY: fuzzy with more weight on resource than goal; melee if near
     if level == 'easy':
         if dist <= 2:
-            ai.attack(player); return
+            ai_trace.branch('melee'); ai.attack(player); return
         goal = getattr(board, 'end_ai', (0,0))
-        if board.resources:
-            nearest = min(board.resources, key=lambda r: abs(ai.pos[0]-r[0])+abs(ai.pos[1]-r[1]))
-            d_res = abs(ai.pos[0]-nearest[0])+abs(ai.pos[1]-nearest[1])
-        else:
-            nearest = None; d_res = 99
+        nearest = route_target(ai, board, goal)
+        d_res = abs(ai.pos[0]-nearest[0])+abs(ai.pos[1]-nearest[1]) if nearest else 99
         d_end = abs(ai.pos[0]-goal[0])+abs(ai.pos[1]-goal[1])
-        near_resource = max(0, min(1, (8 - d_res)/8))
-        far_from_end = max(0, min(1, (d_end - 6)/10))
+        near_resource = max(0, min(1, (P['easy_res_range'] - d_res)/P['easy_res_range']))
+        far_from_end = max(0, min(1, (d_end - P['easy_end_near'])/P['easy_end_span']))
         # resource weighted higher
-        score_gather_fuzzy = 0.7*near_resource + 0.3*far_from_end
-        score_goal_fuzzy = 0.4*(1-near_resource) + 0.6*(1-far_from_end)
+        w, v = P['easy_gather_res_w'], P['easy_goal_res_w']
+        score_gather_fuzzy = w*near_resource + (1-w)*far_from_end
+        score_goal_fuzzy = v*(1-near_resource) + (1-v)*(1-far_from_end)
+        ai_trace.note(gather_fuzzy=score_gather_fuzzy, goal_fuzzy=score_goal_fuzzy)
         if nearest and score_gather_fuzzy >= score_goal_fuzzy:
-            path = a_star(ai.pos, nearest, board)
-            if path:
-                step = path[0]
-                ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
-        path = a_star(ai.pos, goal, board)
-        if path:
-            step = path[0]
-            ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+            step = first_step(ai.pos, nearest, board)
+            if step:
+                ai_trace.branch('resource'); ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+        step = first_step(ai.pos, goal, board)
+        if step:
+            ai_trace.branch('goal_path'); ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+        ai_trace.branch('random_fallback')
         dx,dy = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
         ai.move(dx,dy,board); return
 
     # MEDIUM: fuzzy decide gather vs head to end; goal has more weight; still melee if in range
     if level == 'medium':
         if dist <= 2:
-            ai.attack(player); return
+            ai_trace.branch('melee'); ai.attack(player); return
         goal = getattr(board, 'end_ai', (0,0))
-        # fuzzy inputs: distance to nearest resource, distance to end
-        if board.resources:
-            nearest = min(board.resources, key=lambda r: abs(ai.pos[0]-r[0])+abs(ai.pos[1]-r[1]))
-            d_res = abs(ai.pos[0]-nearest[0])+abs(ai.pos[1]-nearest[1])
-        else:
-            nearest = None; d_res = 99
+        # fuzzy inputs: distance to the next resource on the route, distance to end
+        nearest = route_target(ai, board, goal)
+        d_res = abs(ai.pos[0]-nearest[0])+abs(ai.pos[1]-nearest[1]) if nearest else 99
         d_end = abs(ai.pos[0]-goal[0])+abs(ai.pos[1]-goal[1])
-        near_resource = max(0, min(1, (6 - d_res)/6))
-        far_from_end = max(0, min(1, (d_end - 4)/8))
-        score_gather_fuzzy = 0.4*near_resource + 0.6*far_from_end
-        score_goal_fuzzy = 0.75*(1-near_resource) + 0.25*(1-far_from_end)
+        near_resource = max(0, min(1, (P['medium_res_range'] - d_res)/P['medium_res_range']))
+        far_from_end = max(0, min(1, (d_end - P['medium_end_near'])/P['medium_end_span']))
+        w, v = P['medium_gather_res_w'], P['medium_goal_res_w']
+        score_gather_fuzzy = w*near_resource + (1-w)*far_from_end
+        score_goal_fuzzy = v*(1-near_resource) + (1-v)*(1-far_from_end)
+        ai_trace.note(gather_fuzzy=score_gather_fuzzy, goal_fuzzy=score_goal_fuzzy)
         if score_goal_fuzzy > score_gather_fuzzy or not nearest:
-            path = a_star(ai.pos, goal, board)
-            if path:
-                step = path[0]
-                ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+            step = first_step(ai.pos, goal, board)
+            if step:
+                ai_trace.branch('goal_path'); ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
         else:
-            path = a_star(ai.pos, nearest, board)
-            if path:
-                step = path[0]
-                ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+            step = first_step(ai.pos, nearest, board)
+            if step:
+                ai_trace.branch('resource'); ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+        ai_trace.branch('random_fallback')
         dx,dy = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
         ai.move(dx,dy,board); return
 
@@ -186,47 +307,55 @@ def ai_decision(ai, player, board, level='easy'):
     if level == 'hard':
         # If in melee range, attack
         if dist <= 2:
-            ai.attack(player); return
+            ai_trace.branch('melee'); ai.attack(player); return
         goal = getattr(board, 'end_ai', (0,0))
-        if board.resources:
-            nearest = min(board.resources, key=lambda r: abs(ai.pos[0]-r[0])+abs(ai.pos[1]-r[1]))
-            d_res = abs(ai.pos[0]-nearest[0])+abs(ai.pos[1]-nearest[1])
-        else:
-            nearest = None; d_res = 99
+        nearest = route_target(ai, board, goal)
+        d_res = abs(ai.pos[0]-nearest[0])+abs(ai.pos[1]-nearest[1]) if nearest else 99
         d_end = abs(ai.pos[0]-goal[0])+abs(ai.pos[1]-goal[1])
-        near_resource = max(0, min(1, (6 - d_res)/6))
-        far_from_end = max(0, min(1, (d_end - 4)/8))
+        near_resource = max(0, min(1, (P['hard_res_range'] - d_res)/P['hard_res_range']))
+        far_from_end = max(0, min(1, (d_end - P['hard_end_near'])/P['hard_end_span']))
         # Tune desires so AI doesn't end too fast: require stronger desire to attack, otherwise progress to goal
         # Reduce attack desire if ranged is on cooldown to avoid confusing spam
-        attack_desire = 0.7*dist_far + 0.3*health_high
+        w = P['hard_attack_far_w']
+        attack_desire = w*dist_far + (1-w)*health_high
         if getattr(ai, 'ranged_cooldown', 0) > 0:
-            attack_desire *= 0.6
-        goal_desire = 0.7*(1-far_from_end)
-        gather_desire = 0.3*near_resource
+            attack_desire *= P['hard_cooldown_damp']
+        goal_desire = P['hard_goal_w']*(1-far_from_end)
+        gather_desire = P['hard_gather_w']*near_resource
+        ai_trace.note(attack_desire=attack_desire, goal_desire=goal_desire, gather_desire=gather_desire)
         if attack_desire >= max(goal_desire, gather_desire):
             # prefer attack; if ranged on cooldown, move toward player aggressively instead of idling
             if getattr(ai, 'ranged_cooldown', 0) == 0:
-                ai.pending_ranged = {'target_pos': player.pos, 'turns': 1}
-                ai.ranged_cooldown = 3
-                return
+                if has_los(board, ai.pos, player.pos):
+                    ai_trace.branch('ranged')
+                    ai.pending_ranged = {'target_pos': ranged_target(ai, player, board, level), 'turns': 1}
+                    ai.ranged_cooldown = P['hard_ranged_cooldown']
+                    return
+                # wall in the way: step to a cell with a clear shot if one is close
+                step = firing_position(ai, player.pos, board, 3, LOS_RADIUS)
+                if step:
+                    ai_trace.branch('firing_position')
+                    ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
+                    return
             else:
                 ai.ranged_cooldown -= 1
-                # move toward player
-                path = a_star(ai.pos, player.pos, board)
-                if path:
-                    step = path[0]
-                    ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
-                return
+            # move toward player
+            step = chase_step(ai, player.pos, board)
+            if step:
+                ai_trace.branch('chase')
+                ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
+            else:
+                ai_trace.branch('no_step_wait')
+            return
         if goal_desire >= gather_desire:
-            path = a_star(ai.pos, goal, board)
-            if path:
-                step = path[0]
-                ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+            step = first_step(ai.pos, goal, board)
+            if step:
+                ai_trace.branch('goal_path'); ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
         if nearest:
-            path = a_star(ai.pos, nearest, board)
-            if path:
-                step = path[0]
-                ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+            step = first_step(ai.pos, nearest, board)
+            if step:
+                ai_trace.branch('resource'); ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board); return
+        ai_trace.branch('random_fallback')
         dx,dy = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
         ai.move(dx,dy,board); return
 
@@ -239,6 +368,7 @@ def ai_decision(ai, player, board, level='easy'):
         for dx,dy in moves:
             nx, ny = ai.pos[0]+dx, ai.pos[1]+dy
             if 0 <= nx < board.size and 0 <= ny < board.size and board.grid[nx][ny] != "X":
+                ai_trace.branch('retreat')
                 ai.move(dx, dy, board)
                 return
     elif action == 'attack':
@@ -247,88 +377,97 @@ def ai_decision(ai, player, board, level='easy'):
         if cd > 0:
             ai.attack_cooldown = cd - 1
             # fallback move toward player slightly using A*
-            path = a_star(ai.pos, player.pos, board)
-            if path:
-                step = path[0]
+            step = chase_step(ai, player.pos, board)
+            if step:
+                ai_trace.branch('attack_cooldown_chase')
                 ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
+            else:
+                ai_trace.branch('attack_cooldown_wait')
             return
         melee_range = 1 if level=='easy' else 2
         if level in ('easy','medium') and dist <= melee_range:
+            ai_trace.branch('melee')
             ai.attack(player)
             ai.attack_cooldown = 2 if level=='easy' else 1
             return
         if level == 'hard':
             # If in melee range, prioritize immediate melee
             if dist <= 2:
+                ai_trace.branch('melee')
                 ai.attack(player)
                 return
             # Use minimax to choose action
-            _, best = _minimax(ai.pos, ai.health, player.pos, player.health, board, depth=2, alpha=-10**9, beta=10**9, maximizing=True)
+            best = _root_search(ai, player, board)
             if best:
                 atype, npos = best
                 if atype=='melee' and dist<=2:
+                    ai_trace.branch('minimax_melee')
                     ai.attack(player); return
                 if atype=='move' and npos:
+                    ai_trace.branch('minimax_move')
                     dx,dy = npos[0]-ai.pos[0], npos[1]-ai.pos[1]
                     ai.move(dx,dy,board); return
-                if atype=='shoot' and dist>2:
-                    ai.pending_ranged = {'target_pos': player.pos, 'turns': 1}; return
+                if atype=='shoot' and dist>2 and has_los(board, ai.pos, player.pos):
+                    ai_trace.branch('minimax_shoot')
+                    ai.pending_ranged = {'target_pos': ranged_target(ai, player, board, level), 'turns': 1}; return
             # fallback
+            if dist>2 and not has_los(board, ai.pos, player.pos):
+                step = firing_position(ai, player.pos, board, 3, LOS_RADIUS) or chase_step(ai, player.pos, board)
+                if step:
+                    ai_trace.branch('firing_position')
+                    ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
+                else:
+                    ai_trace.branch('no_shot_wait')
+                return
+            ai_trace.branch('ranged' if dist>2 else 'melee')
             if dist>2:
-                ai.pending_ranged = {'target_pos': player.pos, 'turns': 1}; return
+                ai.pending_ranged = {'target_pos': ranged_target(ai, player, board, level), 'turns': 1}; return
             ai.attack(player); return
     elif action == 'gather' and board.resources:
-        target = min(board.resources, key=lambda r: abs(ai.pos[0]-r[0])+abs(ai.pos[1]-r[1]))
-        path = a_star(ai.pos, target, board)
-        if path:
-            next_step = path[0]
+        target = route_target(ai, board, getattr(board, 'end_ai', (0,0)))
+        next_step = first_step(ai.pos, target, board) if target else None
+        if next_step:
+            ai_trace.branch('resource')
             dx, dy = next_step[0]-ai.pos[0], next_step[1]-ai.pos[1]
             ai.move(dx, dy, board)
             return
         # Medium: occasionally fire ranged to harass when far
-        if level=='medium' and dist>2 and random.random()<0.4:
+        if level=='medium' and dist>2 and random.random()<0.4 and has_los(board, ai.pos, player.pos):
+            ai_trace.branch('ranged_harassment')
             ai.pending_ranged = {'target_pos': player.pos, 'turns': 1}
             return
+    ai_trace.branch('random_fallback')
     dx,dy = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
     ai.move(dx,dy,board)
 
 
 
-def predict_next_move(player, board):
-    """Predict player's next tile based on last move or nearest resource."""
-    # Default: stay in place
-    predicted = player.pos  
-
-    # If player just moved recently, extrapolate direction
-    if hasattr(player, "last_pos"):
-        dx = player.pos[0] - player.last_pos[0]
-        dy = player.pos[1] - player.last_pos[1]
-        predicted = (player.pos[0] + dx, player.pos[1] + dy)
-        # keep inside bounds
-        if not (0 <= predicted[0] < board.size and 0 <= predicted[1] < board.size):
-            predicted = player.pos
-
-    # Otherwise, bias prediction toward nearest resource
-    elif board.resources:
-        closest = min(board.resources.keys(),
-                      key=lambda r: abs(r[0]-player.pos[0]) + abs(r[1]-player.pos[1]))
-        dx = (closest[0] - player.pos[0])
-        dy = (closest[1] - player.pos[1])
-        step = (player.pos[0] + (1 if dx>0 else -1 if dx<0 else 0),
-                player.pos[1] + (1 if dy>0 else -1 if dy<0 else 0))
-        predicted = step
-
-    return predicted
-
+# A target that can shoot back usually holds its ground to do so; with this
+# stay odds its current cell wins in that case (measured best for hard AI vs AI).
+ENGAGED_STAY_LOGIT = 4.0
 
+def ranged_target(shooter, target, board, level=None):
+    """Cell to fire at: where target most likely stands next turn among the
+    cells shooter can see; target.pos when there is no forecast. level picks
+    the target's profile when it has no params of its own."""
+    P = get_params(target, level)
+    engaged = (P['ranged_min'] <= target.distance(shooter) <= P['ranged_max']
+               and has_los(board, target.pos, shooter.pos))
+    occ = forecast(target, board, stay=ENGAGED_STAY_LOGIT) if engaged else forecast(target, board)
+    if occ is None:
+        return target.pos
+    cell, _ = aim(shooter.pos, occ, board)
+    return cell or target.pos
 
 
+@ai_trace.traced
 def ai_vs_ai_decision(ai, opponent, board, level='medium'):
     """Smart AI for AI vs AI mode with goals prioritized over endless melee."""
 
     # Handle stun
     if hasattr(ai, 'stunned_turns') and ai.stunned_turns:
         ai.stunned_turns -= 1
+        ai_trace.branch('stunned')
         return
 
     # --- AUTO-GOAL DISCOVERY (important!) ---
@@ -341,6 +480,21 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
 
     goal = ai.goal
 
+    # Precomputed policy (policy_table.py) for this exact board: O(1) lookup
+    policy = getattr(board, 'policy', None)
+    if policy is not None:
+        action = policy.lookup(ai, opponent, board)
+        if action is not None:
+            ai_trace.branch('policy_table', action=str(action))
+            if action == 'melee':
+                ai.attack(opponent)
+            elif action != 'stay':
+                ai.move(action[0], action[1], board)
+            ai._last_goal_dist = abs(ai.pos[0]-goal[0]) + abs(ai.pos[1]-goal[1])
+            ai._last_pos = ai.pos
+            return
+
+    P = get_params(ai, level)
     dist = ai.distance(opponent)
     melee_range = 2
     melee_damage = getattr(ai, 'melee_damage', 10)
@@ -361,9 +515,11 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
         ai._no_progress_turns += 1
     else:
         ai._no_progress_turns = 0
+    ai_trace.note(dist=dist, goal_dist=cur_goal_dist, no_progress=ai._no_progress_turns)
 
     # 1) Lethal strike (always finish enemy if possible)
     if dist <= melee_range and opponent.health <= melee_damage:
+        ai_trace.branch('lethal_strike')
         ai.attack(opponent)
         ai._attack_cooldown = 1
         ai._last_goal_dist = cur_goal_dist
@@ -374,9 +530,9 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
     if dist <= melee_range:
         if ai._attack_cooldown > 0:
             ai._attack_cooldown -= 1
-            path = a_star(ai.pos, goal, board)
-            if path:
-                next_step = path[0]
+            next_step = first_step(ai.pos, goal, board)
+            if next_step:
+                ai_trace.branch('melee_cooldown_move')
                 # ✅ avoid oscillation: don’t step back into last_pos
                 if ai._last_pos and next_step == ai._last_pos:
                     # try alternate directions
@@ -402,16 +558,28 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
                 return
         else:
             # Attack once, then set cooldown so we won’t repeat
+            ai_trace.branch('melee')
             ai.attack(opponent)
             ai._attack_cooldown = 1
             ai._last_goal_dist = cur_goal_dist
             ai._last_pos = ai.pos
             return
 
-    # 3) Ranged harassment
-    if 3 <= dist <= 5 and getattr(ai, 'ranged_cooldown', 0) == 0:
-        ai.pending_ranged = {'target_pos': opponent.pos, 'turns': 1}
-        ai.ranged_cooldown = 3
+    # 3) Ranged harassment (needs a clear shot; a wall in the way costs a step or two)
+    in_range = P['ranged_min'] <= dist <= P['ranged_max']
+    if in_range and getattr(ai, 'ranged_cooldown', 0) == 0 and not has_los(board, ai.pos, opponent.pos):
+        step = firing_position(ai, opponent.pos, board, P['ranged_min'], P['ranged_max'], max_steps=2)
+        if step and step != ai._last_pos:
+            ai_trace.branch('firing_position')
+            ai._last_pos = ai.pos   # the cell we left, so the next turn doesn't step straight back
+            ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
+            ai._last_goal_dist = abs(ai.pos[0]-goal[0]) + abs(ai.pos[1]-goal[1])
+            return
+        in_range = False
+    if in_range and getattr(ai, 'ranged_cooldown', 0) == 0:
+        ai_trace.branch('ranged_harassment')
+        ai.pending_ranged = {'target_pos': ranged_target(ai, opponent, board, level) if level == 'hard' else opponent.pos, 'turns': 1}
+        ai.ranged_cooldown = P['ranged_cooldown']
         ai._last_goal_dist = cur_goal_dist
         ai._last_pos = ai.pos
         return
@@ -419,27 +587,36 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
         if getattr(ai, 'ranged_cooldown', 0) > 0:
             ai.ranged_cooldown -= 1
 
+    # 3b) Intercept a nearly dead opponent (incremental chase planner)
+    if opponent.health <= melee_damage and dist <= P['intercept_radius']:
+        step = chase_step(ai, opponent.pos, board)
+        if step:
+            ai_trace.branch('intercept')
+            ai.move(step[0]-ai.pos[0], step[1]-ai.pos[1], board)
+            ai._last_goal_dist = abs(ai.pos[0]-goal[0]) + abs(ai.pos[1]-goal[1])
+            ai._last_pos = ai.pos
+            return
+
     # 4) Path to goal
-    chosen_step = None
-    pg = a_star(ai.pos, goal, board)
-    if pg:
-        chosen_step = pg[0]
+    chosen_step = first_step(ai.pos, goal, board)
+    reason = 'goal_path'
 
     # Opportunistic resource
     if board.resources:
-        nearest = min(board.resources, key=lambda r: abs(ai.pos[0]-r[0]) + abs(ai.pos[1]-r[1]))
-        pr = a_star(ai.pos, nearest, board)
-        if pr:
-            step_r = pr[0]
+        nearest = nearest_resource(ai.pos, board)
+        step_r = first_step(ai.pos, nearest, board) if nearest else None
+        if step_r:
             if (chosen_step is None or
                 (abs(step_r[0]-goal[0]) + abs(step_r[1]-goal[1])
                  <= abs(chosen_step[0]-goal[0]) + abs(chosen_step[1]-goal[1]))):
                 chosen_step = step_r
+                reason = 'resource_detour'
 
     # 5) Execute movement (anti-oscillation here too)
     if chosen_step:
         if ai._last_pos and chosen_step == ai._last_pos:
             # choose alternative direction
+            ai_trace.branch('anti_oscillation')
             moves = [(1,0),(-1,0),(0,1),(0,-1)]
             random.shuffle(moves)
             for dx,dy in moves:
@@ -455,6 +632,7 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
             dx, dy = random.choice(moves)
             ai.move(dx, dy, board)
         else:
+            ai_trace.branch(reason)
             dx, dy = chosen_step[0]-ai.pos[0], chosen_step[1]-ai.pos[1]
             ai.move(dx, dy, board)
         ai._last_goal_dist = abs(ai.pos[0]-goal[0]) + abs(ai.pos[1]-goal[1])
@@ -462,6 +640,7 @@ def ai_vs_ai_decision(ai, opponent, board, level='medium'):
         return
 
     # 6) Fallback random move
+    ai_trace.branch('random_fallback')
     dx, dy = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
     ai.move(dx, dy, board)
     ai._last_goal_dist = cur_goal_dist
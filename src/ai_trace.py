@@ -0,0 +1,144 @@
+# ai_trace.py
+# Search statistics and per-turn decision records, for "why did it do that?".
+#
+# Off by default. When ENABLED is False the only cost is a flag check per
+# decision / path search (and a plain counter bump per minimax node), so it
+# can stay compiled in. When on:
+#   - search(): a_star / minimax calls add to COUNTERS (calls, ms, nodes,
+#     cutoffs, path lengths...) and append a record to the ring buffer.
+#   - @traced strategy functions append one record per call: which branch
+#     fired (branch()), the fuzzy scores (note()), time taken and the move.
+# The ring buffer is a fixed-size deque, so memory stays bounded however long
+# the game runs; dump() writes it out as JSON lines on demand.
+#
+#   import ai_trace; ai_trace.enable()
+#   ... play ...
+#   ai_trace.dump("trace.jsonl")
+import json, time
+from collections import deque
+from functools import wraps
+
+ENABLED = False
+RING_SIZE = 4096
+
+COUNTERS = {}          # name -> {'calls', 'ms', 'max_ms', <amounts>...}
+turn = 0               # set by the game loop so records can be lined up with turns
+clock = time.perf_counter
+
+_ring = deque(maxlen=RING_SIZE)
+_seq = 0
+_current = None        # decision record being filled by branch()/note()
+
+def enable(on=True, ring_size=None):
+    global ENABLED, _ring
+    if ring_size is not None and ring_size != _ring.maxlen:
+        _ring = deque(_ring, maxlen=ring_size)
+    ENABLED = on
+
+def reset():
+    global _seq
+    COUNTERS.clear()
+    _ring.clear()
+    _seq = 0
+
+def _push(rec):
+    global _seq
+    _seq += 1
+    rec['seq'] = _seq
+    rec['turn'] = turn
+    _ring.append(rec)
+
+# ---------- Search statistics ----------
+def search(name, secs, **amounts):
+    """One finished search call: time taken plus amounts to sum (nodes, cutoffs, path_len...)."""
+    ms = secs*1000.0
+    st = COUNTERS.get(name)
+    if st is None:
+        st = COUNTERS[name] = {'calls': 0, 'ms': 0.0, 'max_ms': 0.0}
+    st['calls'] += 1
+    st['ms'] += ms
+    if ms > st['max_ms']:
+        st['max_ms'] = ms
+    for k, v in amounts.items():
+        st[k] = st.get(k, 0) + v
+    rec = {'kind': 'search', 'name': name, 'ms': round(ms, 3)}
+    rec.update(amounts)
+    _push(rec)
+
+# ---------- Decision records ----------
+def branch(name, **scores):
+    """Called by a traced strategy at the branch it takes."""
+    if _current is not None:
+        _current['branch'] = name
+        _current['scores'].update(scores)
+
+def note(**scores):
+    """Fuzzy scores / inputs worth keeping with the current decision."""
+    if _current is not None:
+        _current['scores'].update(scores)
+
+def traced(fn):
+    """Decorator for decision functions fn(ai, other, board, level=...)."""
+    name = fn.__name__
+    default_level = fn.__defaults__[-1] if fn.__defaults__ else None
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        global _current
+        if not ENABLED or _current is not None:
+            return fn(*args, **kwargs)
+        ai = args[0]
+        level = kwargs.get('level', args[3] if len(args) > 3 else default_level)
+        rec = _current = {'kind': 'decision', 'fn': name, 'robot': getattr(ai, 'name', '?'),
+                          'level': level, 'pos': ai.pos, 'health': ai.health,
+                          'branch': None, 'scores': {}}
+        t0 = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current = None
+            ms = (clock()-t0)*1000.0
+            rec['ms'] = round(ms, 3)
+            rec['to'] = ai.pos
+            rec['ranged'] = bool(getattr(ai, 'pending_ranged', None))
+            rec['scores'] = {k: round(v, 3) if isinstance(v, float) else v
+                             for k, v in rec['scores'].items()}
+            st = COUNTERS.setdefault(name, {'calls': 0, 'ms': 0.0, 'max_ms': 0.0})
+            st['calls'] += 1
+            st['ms'] += ms
+            st['max_ms'] = max(st['max_ms'], ms)
+            b = 'branch:' + str(rec['branch'])
+            st[b] = st.get(b, 0) + 1
+            _push(rec)
+    return wrapper
+
+# ---------- Output ----------
+def records(kind=None):
+    return [r for r in _ring if kind is None or r['kind'] == kind]
+
+def stats():
+    """COUNTERS with per-call averages filled in."""
+    out = {}
+    for name, st in COUNTERS.items():
+        s = dict(st)
+        n = s['calls'] or 1
+        s['avg_ms'] = s['ms']/n
+        for k in ('nodes', 'cutoffs', 'path_len'):
+            if k in s:
+                s['avg_'+k] = s[k]/n
+        out[name] = s
+    return out
+
+def dump(path):
+    """Write the counters then the ring buffer (oldest first) as JSON lines."""
+    with open(path, "w") as f:
+        f.write(json.dumps({'kind': 'stats', 'stats': stats(), 'ring_size': _ring.maxlen}) + "\n")
+        for r in list(_ring):
+            f.write(json.dumps(r, default=list) + "\n")
+    return len(_ring)
+
+def summary():
+    lines = []
+    for name, s in sorted(stats().items()):
+        extra = "".join(f" {k[4:]} {s[k]:.1f}" for k in ('avg_nodes', 'avg_cutoffs', 'avg_path_len') if k in s)
+        lines.append(f"{name}: {s['calls']} calls, {s['avg_ms']:.3f} ms avg, {s['max_ms']:.2f} ms max{extra}")
+    return "\n".join(lines)
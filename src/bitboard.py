@@ -0,0 +1,170 @@
+# bitboard.py
+# The board as Python int bitmasks, for search-heavy code.
+#
+# Row x is an int with cell (x, y) at bit y+1. Bit 0 and bit n+1 are always
+# clear, and so are the two extra rows above and below the board, so a
+# neighbour test never needs a bounds check. The whole board is those rows
+# laid end to end, W = n+2 bits per row, in one int. Shifting it by 1 or W
+# moves every cell one step, and masking with `free` drops walls and padding.
+# Flood fills and reachability sets are therefore a few big-int operations
+# per BFS layer, whatever the board size.
+#
+# Kept current from Board listeners, like the other attached indexes.
+
+# grid row string -> "0"/"1" digits per cell, for int(..., 2) on a whole row at once
+_FREE = str.maketrans({"X": "0", ".": "1", "E": "1", "T": "1"})
+_WALL = str.maketrans({"X": "1", ".": "0", "E": "0", "T": "0"})
+_TRAP = str.maketrans({"X": "0", ".": "0", "E": "0", "T": "1"})
+_RES  = str.maketrans({"X": "0", ".": "0", "E": "1", "T": "0"})
+
+def _row_bits(row, table):
+    """Row as an int with cell y at bit y+1 (bits read right to left)."""
+    return int(row.translate(table)[::-1] + "0", 2)
+
+class Bitboard:
+    def __init__(self, board):
+        self.board = board
+        n = self.n = board.size
+        W = self.W = n + 2
+        self.rows = [0]*(n+2)          # free cells per row, padded; row x is rows[x+1]
+        self.free = self.walls = self.traps = self.resources = 0
+        for x, row in enumerate(board.grid):
+            row = "".join(row)
+            self.rows[x+1] = r = _row_bits(row, _FREE)
+            self.free |= r << (x*W)
+            if "X" in row: self.walls |= _row_bits(row, _WALL) << (x*W)
+            if "T" in row: self.traps |= _row_bits(row, _TRAP) << (x*W)
+            if "E" in row: self.resources |= _row_bits(row, _RES) << (x*W)
+
+    # ---------- Bits <-> cells ----------
+    def bit(self, pos):
+        return 1 << (pos[0]*self.W + pos[1] + 1)
+
+    def cells(self, mask):
+        """Cells of the set bits, in index order."""
+        W = self.W
+        while mask:
+            low = mask & -mask
+            i = low.bit_length() - 1
+            yield i // W, i % W - 1
+            mask ^= low
+
+    def count(self, mask):
+        return bin(mask).count("1")
+
+    # ---------- Move generation ----------
+    def walkable(self, pos):
+        x, y = pos
+        return 0 <= x < self.n and 0 <= y < self.n and self.rows[x+1] >> (y+1) & 1 == 1
+
+    def neighbors(self, pos):
+        """Walkable neighbours in DIRS order (same as ai_strategies._neighbors)."""
+        x, y = pos
+        rows = self.rows
+        b = y + 1
+        out = []
+        if rows[x+2] >> b & 1: out.append((x+1, y))
+        if rows[x] >> b & 1: out.append((x-1, y))
+        r = rows[x+1]
+        if r >> (b+1) & 1: out.append((x, y+1))
+        if r >> (b-1) & 1: out.append((x, y-1))
+        return out
+
+    def expand(self, mask):
+        """Walkable cells one step from any cell in mask."""
+        W = self.W
+        return ((mask << 1) | (mask >> 1) | (mask << W) | (mask >> W)) & self.free
+
+    # ---------- Bitwise BFS ----------
+    def layers(self, start, stop=0, limit=None):
+        """BFS frontiers from start (a cell or a mask) as masks; stops once a
+        frontier touches `stop`, after `limit` steps or when nothing is left."""
+        front = self.bit(start) if isinstance(start, tuple) else start
+        seen = front
+        out = [front]
+        while front and not front & stop and (limit is None or len(out) <= limit):
+            front = self.expand(front) & ~seen
+            if not front:
+                break
+            seen |= front
+            out.append(front)
+        return out
+
+    def flood(self, start):
+        """Every cell reachable from start (start itself included if walkable)."""
+        seen = front = self.bit(start) if isinstance(start, tuple) else start
+        while front:
+            front = self.expand(front) & ~seen
+            seen |= front
+        return seen
+
+    def reachable(self, a, b):
+        """Walkable path from a to b (False when either end is a wall)."""
+        goal = self.bit(b)
+        if not goal & self.free or not self.bit(a) & self.free:
+            return False
+        return bool(self.layers(a, goal)[-1] & goal)
+
+    def distance(self, a, b):
+        """Steps on the shortest walkable path, None if unreachable or either end is a wall."""
+        goal = self.bit(b)
+        if not goal & self.free or not self.bit(a) & self.free:
+            return None
+        ls = self.layers(a, goal)
+        return len(ls) - 1 if ls[-1] & goal else None
+
+    def nearest(self, start, mask):
+        """(cell, steps) of the closest cell in mask by walking distance, or None."""
+        ls = self.layers(start, mask)
+        hit = ls[-1] & mask
+        if not hit:
+            return None
+        return next(self.cells(hit & -hit)), len(ls) - 1
+
+    def path(self, start, goal):
+        """Shortest path like a_star (excluding start), [] if unreachable."""
+        gb = self.bit(goal)
+        ls = self.layers(start, gb)
+        if not ls[-1] & gb or start == goal:
+            return []
+        path = [goal]
+        cur = gb
+        W = self.W
+        for front in reversed(ls[1:-1]):
+            cur = ((cur << 1) | (cur >> 1) | (cur << W) | (cur >> W)) & front
+            cur &= -cur                      # any one predecessor on the layer
+            path.append(next(self.cells(cur)))
+        path.reverse()
+        return path
+
+    # ---------- Updates ----------
+    def _set(self, pos, on):
+        x, y = pos
+        b = self.bit(pos)
+        if on:
+            self.rows[x+1] |= 2 << y
+            self.free |= b
+        else:
+            self.rows[x+1] &= ~(2 << y)
+            self.free &= ~b
+
+    def on_board_change(self, kind, pos):
+        b = self.bit(pos)
+        if kind == 'obstacle_added':
+            self.walls |= b
+            self.traps &= ~b
+            self.resources &= ~b
+            self._set(pos, False)
+        elif kind == 'obstacle_removed':
+            self.walls &= ~b
+            self._set(pos, True)
+        elif kind == 'resource_removed':
+            self.resources &= ~b
+        elif kind == 'trap_removed':
+            self.traps &= ~b
+
+def attach_bitboard(board):
+    """Keep board.bits (a Bitboard) current with the board."""
+    board.bits = Bitboard(board)
+    board.add_listener(board.bits.on_board_change)
+    return board.bits
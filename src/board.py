@@ -1,13 +1,17 @@
 import random
 from config import GRID_WIDTH, GRID_HEIGHT, NUM_RESOURCES, NUM_TRAPS, NUM_OBSTACLES, RESOURCE_TYPES, TRAP_TYPES
+from bitboard import Bitboard
+
+LAYOUT_TRIES = 20   # re-rolls allowed when walls seal a start off from its goal
 
 class Board:
-    def __init__(self, size, num_resources=None, num_traps=None, num_obstacles=None):
+    def __init__(self, size, num_resources=None, num_traps=None, num_obstacles=None, populate=True, rng=None):
         self.size = size
-        self.grid = [["." for _ in range(size)] for _ in range(size)]
+        self.grid = [["."]*size for _ in range(size)]
         self.resources = {}  # (x,y): resource_type
         self.traps = {}      # (x,y): trap_type
         self.obstacles = set()
+        self.listeners = []  # callables fn(kind, pos), see _notify
 
         # End goals
         self.end_player = (self.size-1, self.size-1)
@@ -24,32 +28,85 @@ class Board:
         # Reserve goal cells so nothing spawns there
         self.reserved_cells = {self.end_player, self.end_ai, self.end_blue, self.end_red}
 
-        self.place_items()
+        if populate:  # snapshots and map files fill the board themselves
+            self.place_items(rng)
+
+    def place_items(self, rng=None):
+        """Random layout from rng (a random.Random; the module RNG by default)."""
+        rng = rng or random
+        for _ in range(LAYOUT_TRIES):
+            self._place_once(rng)
+            if self.goals_reachable():
+                return
+            self.grid = [["."]*self.size for _ in range(self.size)]
+            self.resources.clear(); self.traps.clear(); self.obstacles.clear()
+        self._place_once(rng)   # give up on sealed layouts rather than loop forever
+
+    def goals_reachable(self):
+        """Both corners (starts and goals) in one walkable component."""
+        bits = Bitboard(self)
+        return bits.walkable(self.end_ai) and bits.reachable(self.end_ai, self.end_player)
 
-    def place_items(self):
+    def _place_once(self, rng):
         # Place resources
         for _ in range(self.num_resources):
-            x,y = self._random_empty()
-            r_type = random.choice(list(RESOURCE_TYPES.keys()))
+            x,y = self._random_empty(rng)
+            r_type = rng.choice(list(RESOURCE_TYPES.keys()))
             self.grid[x][y] = "E"
             self.resources[(x,y)] = r_type
 
         # Place traps
         for _ in range(self.num_traps):
-            x,y = self._random_empty()
-            t_type = random.choice(list(TRAP_TYPES.keys()))
+            x,y = self._random_empty(rng)
+            t_type = rng.choice(list(TRAP_TYPES.keys()))
             self.grid[x][y] = "T"
             self.traps[(x,y)] = t_type
 
         # Place obstacles
         for _ in range(self.num_obstacles):
-            x,y = self._random_empty()
+            x,y = self._random_empty(rng)
             self.grid[x][y] = "X"
             self.obstacles.add((x,y))
 
-    def _random_empty(self):
+    # ---------- Changes during play ----------
+    def add_listener(self, fn):
+        self.listeners.append(fn)
+
+    def _notify(self, kind, pos):
+        for fn in self.listeners:
+            fn(kind, pos)
+
+    def add_obstacle(self, pos):
+        """Turn a cell into a wall (medium mode blocks collected cells)."""
+        x,y = pos
+        self.grid[x][y] = "X"
+        self.obstacles.add(pos)
+        self._notify('obstacle_added', pos)
+
+    def remove_obstacle(self, pos):
+        """Clear a wall (shield break)."""
+        x,y = pos
+        self.grid[x][y] = "."
+        self.obstacles.discard(pos)
+        self._notify('obstacle_removed', pos)
+
+    def take_resource(self, pos):
+        """Pick up the resource at pos; returns its type."""
+        r_type = self.resources.pop(pos)
+        self.grid[pos[0]][pos[1]] = "."
+        self._notify('resource_removed', pos)
+        return r_type
+
+    def take_trap(self, pos):
+        """Trigger (and clear) the trap at pos; returns its type."""
+        t_type = self.traps.pop(pos)
+        self.grid[pos[0]][pos[1]] = "."
+        self._notify('trap_removed', pos)
+        return t_type
+
+    def _random_empty(self, rng):
         while True:
-            x = random.randrange(self.size)
-            y = random.randrange(self.size)
+            x = rng.randrange(self.size)
+            y = rng.randrange(self.size)
             if self.grid[x][y] == "." and (x,y) not in self.reserved_cells:
                 return x,y
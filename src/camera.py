@@ -0,0 +1,58 @@
+# camera.py
+# Scrolling viewport over the board. Works in world pixels (col*cell, row*cell)
+# and only reports the cells that intersect the screen, so drawing cost depends
+# on the view size, not the board size.
+
+class Camera:
+    def __init__(self, view_w, view_h, cell_size, world_cells):
+        self.view_w = view_w        # px
+        self.view_h = view_h        # px
+        self.cell_size = cell_size
+        self.world_cells = world_cells
+        self.x = 0.0                # world px of the top-left corner
+        self.y = 0.0
+        self.target = 'player'      # 'player', 'ai' or None (free scroll)
+
+    def resize_world(self, world_cells):
+        self.world_cells = world_cells
+        self._clamp()
+
+    def _clamp(self):
+        world_px = self.world_cells*self.cell_size
+        self.x = max(0.0, min(self.x, world_px - self.view_w))
+        self.y = max(0.0, min(self.y, world_px - self.view_h))
+
+    def center_on(self, px, py):
+        """Center on a world pixel (top-left of a sprite)."""
+        self.x = px + self.cell_size/2 - self.view_w/2
+        self.y = py + self.cell_size/2 - self.view_h/2
+        self._clamp()
+
+    def scroll(self, dx, dy):
+        self.x += dx; self.y += dy
+        self._clamp()
+
+    def cycle_target(self):
+        order = ['player', 'ai', None]
+        self.target = order[(order.index(self.target)+1) % len(order)]
+
+    def visible_cells(self):
+        """(row0, row1, col0, col1) half-open range of cells on screen."""
+        cs = self.cell_size
+        c0 = int(self.x//cs); r0 = int(self.y//cs)
+        c1 = min(self.world_cells, int((self.x+self.view_w)//cs)+1)
+        r1 = min(self.world_cells, int((self.y+self.view_h)//cs)+1)
+        return r0, r1, c0, c1
+
+    def to_screen(self, px, py):
+        return px - self.x, py - self.y
+
+    def screen_to_cell(self, sx, sy):
+        """Screen pixel -> (row, col), or None if outside the board view."""
+        if not (0 <= sx < self.view_w and 0 <= sy < self.view_h):
+            return None
+        row = int((sy + self.y)//self.cell_size)
+        col = int((sx + self.x)//self.cell_size)
+        if 0 <= row < self.world_cells and 0 <= col < self.world_cells:
+            return row, col
+        return None
@@ -0,0 +1,160 @@
+# chase.py
+# Incremental planner for chasing a moving target (Moving-Target Adaptive A*).
+#
+# Between turns the planner keeps
+#   - the last path, which is repaired in place when the chaser took its first
+#     step and the target only moved a cell (no search at all), and
+#   - learned heuristic values h(s) from earlier searches. After each search
+#     h(s) = g(target) - g(s) for every expanded s, which is still admissible
+#     for the next search; when the target moves, all h-values are lowered by
+#     the distance it moved (lazily, via deltah). Later searches are therefore
+#     much more focused than plain A*.
+# New walls keep h admissible. A removed wall (shield break) may shorten paths,
+# so the learned values and the cached path are dropped.
+import heapq
+
+DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+REUSE_SLACK = 2     # accept a repaired path at most this much longer than the bound
+
+def _manhattan(a, b):
+    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+
+class ChasePlanner:
+    def __init__(self, board):
+        self.board = board
+        self.target = None
+        self.path = []
+        self.counter = 0
+        self.h = {}          # learned heuristic
+        self.seen = {}       # state -> counter when h was learned
+        self.deltah = [0]    # cumulative target-move correction per search
+        self.searches = 0    # stats
+        self.reused = 0
+        board.add_listener(self.on_board_change)
+
+    def __getstate__(self):
+        # pickled with its robot (server.py workers): the board stays behind
+        # and chase_step starts a new planner on whatever board it is given
+        return dict(self.__dict__, board=None, h={}, seen={}, path=[])
+
+    # ---------- Board changes ----------
+    def on_board_change(self, kind, pos):
+        if kind == 'obstacle_added':
+            if pos in self.path:
+                self.path = []
+        elif kind == 'obstacle_removed':
+            self.reset()
+
+    def reset(self):
+        self.path = []
+        self.h.clear(); self.seen.clear()
+        self.counter = 0; self.deltah = [0]
+
+    # ---------- Heuristic ----------
+    def _h(self, s, target):
+        if s in self.h:
+            c = self.seen[s]
+            if c != self.counter:
+                self.h[s] = max(_manhattan(s, target), self.h[s] - (self.deltah[self.counter] - self.deltah[c]))
+                self.seen[s] = self.counter
+            return self.h[s]
+        return _manhattan(s, target)
+
+    def _retarget(self, target):
+        if self.target is not None and target != self.target:
+            # learned distance of the new target to the old one
+            shift = self._h(target, self.target)
+            self.deltah.append(self.deltah[self.counter] + shift)
+            self.counter += 1
+        self.target = target
+
+    # ---------- Path repair ----------
+    def _free(self, p):
+        n = self.board.size
+        return 0 <= p[0] < n and 0 <= p[1] < n and self.board.grid[p[0]][p[1]] != "X"
+
+    def _repair(self, start, target):
+        path = self.path
+        if not path:
+            return None
+        if start in path:                       # chaser advanced along the path
+            path = path[path.index(start)+1:]
+        elif _manhattan(start, path[0]) != 1:
+            return None
+        if target in path:                      # target stepped onto our path
+            path = path[:path.index(target)+1]
+        elif path and _manhattan(path[-1], target) == 1 and self._free(target):
+            path = path + [target]              # target stepped off the end
+        elif not path and _manhattan(start, target) == 1:
+            path = [target]
+        else:
+            return None
+        if not path or len(path) > self._h(start, target) + REUSE_SLACK:
+            return None
+        return path
+
+    # ---------- Search ----------
+    def _search(self, start, target):
+        self.searches += 1
+        grid, n = self.board.grid, self.board.size
+        g = {start: 0}
+        came = {}
+        closed = []
+        heap = [(self._h(start, target), 0, start)]   # ties: prefer deeper nodes
+        found = False
+        while heap:
+            _, neg_g, cur = heapq.heappop(heap)
+            gs = -neg_g
+            if gs != g[cur]:
+                continue
+            if cur == target:
+                found = True
+                break
+            closed.append(cur)
+            for dx, dy in DIRS:
+                nx, ny = cur[0]+dx, cur[1]+dy
+                if 0 <= nx < n and 0 <= ny < n and grid[nx][ny] != "X":
+                    nb = (nx, ny)
+                    ng = gs + 1
+                    if ng < g.get(nb, 1 << 60):
+                        g[nb] = ng; came[nb] = cur
+                        heapq.heappush(heap, (ng + self._h(nb, target), -ng, nb))
+        if not found:
+            return []
+        # learn: h(s) = g(target) - g(s) for every expanded state
+        gt = g[target]
+        for s in closed:
+            self.h[s] = gt - g[s]
+            self.seen[s] = self.counter
+        path = [target]
+        while path[-1] in came and came[path[-1]] != start:
+            path.append(came[path[-1]])
+        path.reverse()
+        return path
+
+    def plan(self, start, target):
+        """Path from start to target (excluding start), [] if unreachable."""
+        if start == target:
+            return []
+        self._retarget(target)
+        path = self._repair(start, target)
+        if path is not None:
+            self.reused += 1
+        else:
+            path = self._search(start, target)
+        self.path = path
+        return path
+
+    def next_step(self, start, target):
+        path = self.plan(start, target)
+        return path[0] if path else None
+
+def chase_step(robot, target, board):
+    """Next cell for robot toward a moving target, keeping a planner on the robot."""
+    comps = getattr(board, 'components', None)
+    if comps is not None and not comps.reachable(robot.pos, target):
+        return None
+    planner = getattr(robot, '_chaser', None)
+    if planner is None or planner.board is not board:
+        planner = robot._chaser = ChasePlanner(board)
+    return planner.next_step(robot.pos, target)
@@ -33,3 +33,14 @@ TRAP_TYPES = {
 
 NUM_OBSTACLES = 18
 MAX_TURNS = 90
+
+# Simulation ticks per second (fixed timestep, independent of FPS)
+TICK_RATE = 60
+
+# Visible window in cells; bigger boards scroll with the camera
+VIEW_COLS = 12
+VIEW_ROWS = 12
+
+# Boards at least this big use hierarchical pathfinding (hpa.py)
+HPA_MIN_SIZE = 64
+HPA_CLUSTER_SIZE = 16
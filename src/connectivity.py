@@ -0,0 +1,152 @@
+# connectivity.py
+# Connected components of walkable cells, so "can I get there at all?" is O(1).
+#
+# Cells point to union-find nodes; the node's root is the component id.
+#   - a wall removed (shield break): the cell joins its neighbours -> unions.
+#   - a wall added: the component can only split around that cell. A lockstep
+#     BFS from its walkable neighbours stops as soon as all of them meet again;
+#     any side that runs out of cells first is a new component and gets a
+#     fresh node. Work is bounded by the smaller side, not the board.
+DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+
+class Connectivity:
+    def __init__(self, board):
+        self.board = board
+        self.n = board.size
+        n = self.n
+        self.parent = list(range(n*n))   # node -> parent node
+        self.node = list(range(n*n))     # cell -> node
+        grid = board.grid
+        for x in range(n):
+            row = grid[x]
+            for y in range(n):
+                if row[y] == "X":
+                    continue
+                if y+1 < n and row[y+1] != "X":
+                    self._union(x*n+y, x*n+y+1)
+                if x+1 < n and grid[x+1][y] != "X":
+                    self._union(x*n+y, (x+1)*n+y)
+
+    # ---------- Union-find ----------
+    def _find(self, a):
+        parent = self.parent
+        root = a
+        while parent[root] != root:
+            root = parent[root]
+        while parent[a] != root:          # path compression
+            parent[a], a = root, parent[a]
+        return root
+
+    def _union(self, a, b):
+        ra, rb = self._find(self.node[a]), self._find(self.node[b])
+        if ra != rb:
+            self.parent[rb] = ra
+
+    # ---------- Queries ----------
+    def _walkable(self, x, y):
+        return 0 <= x < self.n and 0 <= y < self.n and self.board.grid[x][y] != "X"
+
+    def component(self, pos):
+        """Component id of a walkable cell, None for walls / off-board."""
+        x, y = pos
+        if not self._walkable(x, y):
+            return None
+        return self._find(self.node[x*self.n+y])
+
+    def connected(self, a, b):
+        ca = self.component(a)
+        return ca is not None and ca == self.component(b)
+
+    def reachable(self, start, goal):
+        """Can a search from start get to goal? start may be a wall the robot
+        stands on (medium mode walls the cell it just collected)."""
+        cg = self.component(goal)
+        if cg is None:
+            return False
+        x, y = start
+        if self._walkable(x, y):
+            return self.component(start) == cg
+        return any(self.component((x+dx, y+dy)) == cg for dx, dy in DIRS)
+
+    # ---------- Updates ----------
+    def on_board_change(self, kind, pos):
+        if kind == 'obstacle_removed':
+            self._opened(pos)
+        elif kind == 'obstacle_added':
+            self._closed(pos)
+
+    def _opened(self, pos):
+        x, y = pos
+        n = self.n
+        c = x*n+y
+        self.node[c] = self._fresh()
+        for dx, dy in DIRS:
+            if self._walkable(x+dx, y+dy):
+                self._union(c, (x+dx)*n+y+dy)
+
+    def _fresh(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def _closed(self, pos):
+        x, y = pos
+        n = self.n
+        starts = [(x+dx, y+dy) for dx, dy in DIRS if self._walkable(x+dx, y+dy)]
+        if len(starts) < 2:
+            return   # a dead end or isolated cell: nothing can split
+        # lockstep BFS, one frontier per neighbour; `group` merges searches that meet
+        k = len(starts)
+        group = list(range(k))
+        def gfind(i):
+            while group[i] != i:
+                i = group[i]
+            return i
+        owner = {s: i for i, s in enumerate(starts)}
+        frontiers = [[s] for s in starts]
+        regions = [[s] for s in starts]
+        done = set()                      # group roots that ran out of cells
+        while True:
+            live = {gfind(i) for i in range(k)} - done
+            if len(live) <= 1:
+                break
+            for i in range(k):
+                if not frontiers[i] or gfind(i) in done:
+                    continue
+                nxt = []
+                for cx, cy in frontiers[i]:
+                    for dx, dy in DIRS:
+                        p = (cx+dx, cy+dy)
+                        if not self._walkable(*p):
+                            continue
+                        j = owner.get(p)
+                        if j is None:
+                            owner[p] = i
+                            nxt.append(p)
+                            regions[i].append(p)
+                        elif gfind(j) != gfind(i):
+                            group[gfind(j)] = gfind(i)
+                frontiers[i] = nxt
+            # a group whose searches all stalled is a closed region
+            roots = {}
+            for i in range(k):
+                roots.setdefault(gfind(i), []).append(i)
+            for r, members in roots.items():
+                if r not in done and all(not frontiers[i] for i in members):
+                    done.add(r)
+        live = {gfind(i) for i in range(k)} - done
+        # every finished group except one (if nothing is still growing) is split off
+        finished = sorted(done, key=lambda r: sum(len(regions[i]) for i in range(k) if gfind(i) == r))
+        if not live and finished:
+            finished = finished[:-1]      # the largest keeps the old id
+        for r in finished:
+            node = self._fresh()
+            for i in range(k):
+                if gfind(i) == r:
+                    for cx, cy in regions[i]:
+                        self.node[cx*n+cy] = node
+
+def attach_connectivity(board):
+    """Track walkable components of board and keep them current on wall changes."""
+    board.components = Connectivity(board)
+    board.add_listener(board.components.on_board_change)
+    return board.components
@@ -0,0 +1,165 @@
+# decision_cache.py
+# Optional LRU cache for strategy decisions, shared by every game in a process.
+#
+# Key: a Zobrist hash of the board (updated incrementally from Board
+# listeners) plus the exact state both strategies read from the two robots,
+# the level and the strategy parameters.
+# Value: what the decision did - the move()/attack() calls it made and the
+# final values of the bookkeeping attributes it set - so a hit replays the
+# effect without fuzzy scoring or path search.
+#
+# Decisions use the random module for tie-breaks. On a miss the decision runs
+# with the RNG seeded from the key (and the caller's RNG state is restored
+# afterwards), so a state always maps to the same decision whether it is
+# computed or replayed. Cached games are therefore reproducible per seed, but
+# do not replay move-for-move like uncached ones.
+#
+#   from decision_cache import cached
+#   play_match(..., blue_decide=cached(ai_vs_ai_decision))
+import random, zlib
+from collections import OrderedDict
+
+from ai_strategies import get_params
+
+MAX_ENTRIES = 200_000
+ZOBRIST_SEED = 0x5EED
+
+# Robot attributes the strategies read and write between turns
+STATE_ATTRS = ('ranged_cooldown', 'attack_cooldown', '_attack_cooldown', 'stunned_turns',
+               '_no_progress_turns', '_last_goal_dist', '_last_pos', 'last_pos', 'goal')
+WRITE_ATTRS = STATE_ATTRS + ('pending_ranged',)
+
+# ---------- Zobrist board hash ----------
+_zkeys = {}
+_zrng = random.Random(ZOBRIST_SEED)
+
+def _zkey(cell, token):
+    k = _zkeys.get((cell, token))
+    if k is None:
+        k = _zkeys[(cell, token)] = _zrng.getrandbits(64)
+    return k
+
+class BoardHash:
+    """64-bit hash of walls, resources and traps, kept current from board events."""
+    def __init__(self, board):
+        self.value = 0
+        self.items = {}   # pos -> token of hashed resources/traps (gone from the board on removal)
+        for x, row in enumerate(board.grid):
+            for y, c in enumerate(row):
+                if c == "X":
+                    self.value ^= _zkey((x, y), "X")
+                elif c in "ET":
+                    kinds = board.resources if c == "E" else board.traps
+                    self.items[(x, y)] = c + ":" + kinds.get((x, y), "")
+                    self.value ^= _zkey((x, y), self.items[(x, y)])
+
+    def on_board_change(self, kind, pos):
+        if kind in ('obstacle_added', 'obstacle_removed'):
+            self.value ^= _zkey(pos, "X")
+        elif kind in ('resource_removed', 'trap_removed') and pos in self.items:
+            self.value ^= _zkey(pos, self.items.pop(pos))
+
+def board_hash(board):
+    h = getattr(board, 'zobrist', None)
+    if h is None:
+        h = board.zobrist = BoardHash(board)
+        board.add_listener(h.on_board_change)
+    return h.value
+
+# ---------- Robot state ----------
+def _robot_key(r):
+    pr = getattr(r, 'pending_ranged', None)
+    return (r.pos, r.health, r.score, r.personality,
+            tuple(sorted(b for b in list(r.buffs) if r.has_buff(b))),
+            tuple(getattr(r, a, None) for a in STATE_ATTRS),
+            (tuple(pr['target_pos']), pr.get('turns')) if pr else None)
+
+_pkeys = {}   # id(params) -> (params, key); keeps params alive so ids aren't reused
+
+def _params_key(robot, level):
+    p = get_params(robot, level)
+    hit = _pkeys.get(id(p))
+    if hit is None or hit[0] is not p:
+        hit = _pkeys[id(p)] = (p, zlib.crc32(repr(sorted(p.items())).encode()))
+    return hit[1]
+
+# ---------- Cache ----------
+class DecisionCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, name, ai, other, board, level):
+        return (name, level, board.size, board_hash(board),
+                _robot_key(ai), _robot_key(other), _params_key(ai, level))
+
+    def decide(self, fn, ai, other, board, level):
+        key = self.key(fn.__name__, ai, other, board, level)
+        hit = self.entries.get(key)
+        if hit is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self._replay(hit, ai, other, board)
+            return
+        self.misses += 1
+        self.entries[key] = self._record(fn, key, ai, other, board, level)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _record(self, fn, key, ai, other, board, level):
+        calls = []
+        real_move, real_attack = ai.move, ai.attack
+        def move(dx, dy, b):
+            calls.append(('move', dx, dy))
+            real_move(dx, dy, b)
+        def attack(target):
+            calls.append(('attack',))
+            real_attack(target)
+        ai.move, ai.attack = move, attack
+        saved = random.getstate()
+        random.seed(repr(key))   # str seeds are stable across processes
+        try:
+            fn(ai, other, board, level=level)
+        finally:
+            random.setstate(saved)
+            del ai.move, ai.attack
+        attrs = {a: getattr(ai, a) for a in WRITE_ATTRS if hasattr(ai, a)}
+        if attrs.get('pending_ranged'):
+            attrs['pending_ranged'] = dict(attrs['pending_ranged'])
+        return tuple(calls), attrs
+
+    def _replay(self, entry, ai, other, board):
+        calls, attrs = entry
+        for c in calls:
+            if c[0] == 'move':
+                ai.move(c[1], c[2], board)
+            else:
+                ai.attack(other)
+        for a, v in attrs.items():
+            setattr(ai, a, dict(v) if isinstance(v, dict) else v)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits/total if total else 0.0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hit_rate}
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+CACHE = DecisionCache()   # per process, shared across games
+
+def cached(fn, cache=None):
+    """Wrap a decision function (ai, other, board, level=...) with the cache."""
+    def decide(ai, other, board, level='medium'):
+        (cache or CACHE).decide(fn, ai, other, board, level)
+    decide.__name__ = fn.__name__
+    return decide
@@ -0,0 +1,332 @@
+# hpa.py
+# Hierarchical pathfinding (HPA*) for big boards.
+#
+# The board is cut into square clusters. Where two neighbouring clusters touch,
+# each run of walkable cell pairs across the border becomes an entrance; the
+# entrance cells are the nodes of a small abstract graph. Inside a cluster the
+# nodes are joined by their BFS distance. A query searches the abstract graph
+# and only refines the legs it needs with a BFS limited to one cluster.
+#
+# When a cell changes (shield break, medium blocking) only its cluster is
+# rebuilt, plus the borders/neighbours it touches if the cell is on an edge.
+#
+# Cost, measured on 512x512 with 20% random walls (cluster size 16): build
+# ~1 s (~3.5 s on 1000x1000), a cold long-range query ~3 ms median with a
+# tail of ~20 ms on mazy routes (the abstract A* over ~16k entrances), and
+# each later next_step along the cached route ~0.03 ms. A wall change costs
+# ~3 ms.
+import heapq
+
+DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+LONG_ENTRANCE = 6   # runs longer than this get a node at each end
+_FREE = str.maketrans({"X": "0", ".": "1", "E": "1", "T": "1"})
+
+class HierarchicalPathfinder:
+    def __init__(self, board, cluster_size=16):
+        self.board = board
+        self.n = board.size
+        self.cs = cluster_size
+        self.nc = (self.n + cluster_size - 1)//cluster_size   # clusters per side
+        self.borders = {}      # (cidA, cidB) -> [(cellA, cellB)]
+        self.nodes = {}        # cid -> set of entrance cells in that cluster
+        self.intra = {}        # cell -> {cell: dist} within its cluster
+        self.inter = {}        # cell -> set of cells across a border
+        self.adj = {}          # cell -> ((cell, dist), ...): intra and border edges together
+        self.version = 0       # bumped on every cell update
+        self._masks = {}       # cid -> (free bits, row width, x0, y0), see _mask
+        self._legs = {}        # cid -> {(u, v): refined leg} for legs starting in cid
+        self._routes = {}      # (cluster, goal) -> (version, remaining abstract nodes)
+        for cx in range(self.nc):
+            for cy in range(self.nc):
+                if cx+1 < self.nc: self._build_border((cx,cy), (cx+1,cy))
+                if cy+1 < self.nc: self._build_border((cx,cy), (cx,cy+1))
+        for cx in range(self.nc):
+            for cy in range(self.nc):
+                self._build_intra((cx,cy))
+
+    # ---------- Geometry ----------
+    def cluster_of(self, pos):
+        return pos[0]//self.cs, pos[1]//self.cs
+
+    def _bounds(self, cid):
+        x0, y0 = cid[0]*self.cs, cid[1]*self.cs
+        return x0, min(self.n, x0+self.cs), y0, min(self.n, y0+self.cs)
+
+    def _free(self, x, y):
+        return self.board.grid[x][y] != "X"
+
+    # ---------- Cluster bitsets ----------
+    # Inside a cluster, BFS runs on one int: cell (x, y) is bit (x-x0)*w + y-y0+1
+    # with w = width+2, so every row has a clear bit on both sides and shifts
+    # by 1 or w never wrap into a neighbouring row (same layout as bitboard.py).
+    def _mask(self, cid):
+        m = self._masks.get(cid)
+        if m is None:
+            x0, x1, y0, y1 = self._bounds(cid)
+            w = y1 - y0 + 2
+            free = 0
+            for x in range(x0, x1):
+                row = "".join(self.board.grid[x][y0:y1]).translate(_FREE)
+                free |= int(row[::-1] + "0", 2) << ((x-x0)*w)
+            m = self._masks[cid] = (free, w, x0, y0)
+        return m
+
+    def _layers(self, src, cid, stop):
+        """BFS frontiers from src inside cid, until every bit of stop is seen."""
+        free, w, x0, y0 = self._mask(cid)
+        seen = front = 1 << ((src[0]-x0)*w + src[1]-y0+1)
+        out = [front]
+        while seen & stop != stop:
+            front = ((front << 1) | (front >> 1) | (front << w) | (front >> w)) & free & ~seen
+            if not front:
+                break
+            seen |= front
+            out.append(front)
+        return out
+
+    def _bits(self, cid, cells):
+        """{bit: cell} of cells in cid's layout."""
+        _, w, x0, y0 = self._mask(cid)
+        return {1 << ((x-x0)*w + y-y0+1): (x, y) for x, y in cells}
+
+    def _dists(self, layers, want):
+        """{cell: steps} for the cells of want ({bit: cell}) found in layers."""
+        mask = 0
+        for b in want: mask |= b
+        out = {}
+        for d, front in enumerate(layers):
+            hit = front & mask
+            while hit:
+                low = hit & -hit
+                out[want[low]] = d
+                hit ^= low
+        return out
+
+    def _walk_back(self, layers, cid, bit, d):
+        """Cells of a shortest path from the layers' source to bit (on layer d)."""
+        _, w, x0, y0 = self._mask(cid)
+        cells = []
+        for front in reversed(layers[1:d]):
+            i = bit.bit_length() - 1
+            cells.append((x0 + i//w, y0 + i % w - 1))
+            bit = ((bit << 1) | (bit >> 1) | (bit << w) | (bit >> w)) & front
+            bit &= -bit                      # any one predecessor on the layer
+        i = bit.bit_length() - 1
+        cells.append((x0 + i//w, y0 + i % w - 1))
+        cells.reverse()
+        return cells
+
+    # ---------- Build ----------
+    def _build_border(self, a, b):
+        """Entrances between cluster a and its lower (b below) or right neighbour."""
+        ax0, ax1, ay0, ay1 = self._bounds(a)
+        if b[0] != a[0]:   # b is below: border between rows ax1-1 and ax1
+            pairs = [((ax1-1, y), (ax1, y)) for y in range(ay0, ay1)]
+        else:              # b is right: border between cols ay1-1 and ay1
+            pairs = [((x, ay1-1), (x, ay1)) for x in range(ax0, ax1)]
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and self._free(*pair[0]) and self._free(*pair[1]):
+                run.append(pair)
+                continue
+            if run:
+                if len(run) > LONG_ENTRANCE:
+                    entrances += [run[0], run[-1]]
+                else:
+                    entrances.append(run[len(run)//2])
+                run = []
+        self.borders[(a, b)] = entrances
+        for pa, pb in entrances:
+            self.nodes.setdefault(a, set()).add(pa)
+            self.nodes.setdefault(b, set()).add(pb)
+            self.inter.setdefault(pa, set()).add(pb)
+            self.inter.setdefault(pb, set()).add(pa)
+
+    def _drop_border(self, a, b):
+        for pa, pb in self.borders.pop((a, b), []):
+            self.inter.get(pa, set()).discard(pb)
+            self.inter.get(pb, set()).discard(pa)
+
+    def _build_intra(self, cid):
+        nodes = self.nodes.get(cid, set())
+        want = self._bits(cid, nodes)
+        stop = sum(want)
+        for u in nodes:
+            dist = self._dists(self._layers(u, cid, stop), want)
+            del dist[u]
+            self.intra[u] = dist
+            self.adj[u] = tuple(dist.items()) + tuple((v, 1) for v in self.inter.get(u, ()))
+
+    def _refresh_nodes(self, cid):
+        """Recollect a cluster's node set from its four borders."""
+        cx, cy = cid
+        old = self.nodes.get(cid, set())
+        nodes = set()
+        for key in (((cx-1,cy), cid), ((cx,cy-1), cid)):
+            nodes.update(pb for _, pb in self.borders.get(key, []))
+        for key in ((cid, (cx+1,cy)), (cid, (cx,cy+1))):
+            nodes.update(pa for pa, _ in self.borders.get(key, []))
+        for u in old - nodes:
+            self.intra.pop(u, None)
+            self.inter.pop(u, None)
+            self.adj.pop(u, None)
+        self.nodes[cid] = nodes
+
+    # ---------- Incremental update ----------
+    def on_board_change(self, kind, pos):
+        if kind in ('obstacle_added', 'obstacle_removed'):
+            self.update_cell(pos)
+
+    def update_cell(self, pos):
+        self.version += 1
+        cid = self.cluster_of(pos)
+        self._masks.pop(cid, None)
+        x0, x1, y0, y1 = self._bounds(cid)
+        touched = {cid}
+        cx, cy = cid
+        # a cell on the cluster edge changes the entrances of that border
+        edges = []
+        if pos[0] == x0 and cx > 0: edges.append(((cx-1,cy), cid))
+        if pos[0] == x1-1 and cx+1 < self.nc: edges.append((cid, (cx+1,cy)))
+        if pos[1] == y0 and cy > 0: edges.append(((cx,cy-1), cid))
+        if pos[1] == y1-1 and cy+1 < self.nc: edges.append((cid, (cx,cy+1)))
+        for a, b in edges:
+            self._drop_border(a, b)
+            self._build_border(a, b)
+            touched.update((a, b))
+        for c in touched:
+            self._legs.pop(c, None)
+            self._refresh_nodes(c)
+            self._build_intra(c)
+
+    # ---------- Queries ----------
+    def _abstract(self, start, goal):
+        """Abstract path [start, node, ..., goal] or None, plus the start's BFS
+        layers (for the first step) when start is not itself a node."""
+        sc, gc = self.cluster_of(start), self.cluster_of(goal)
+        s_nodes = self._bits(sc, self.nodes.get(sc, ()))
+        if sc == gc:
+            s_nodes.update(self._bits(sc, [goal]))
+        s_layers = self._layers(start, sc, sum(s_nodes))
+        first = list(self._dists(s_layers, s_nodes).items())
+        first += [(v, 1) for v in self.inter.get(start, ())]
+        g_nodes = self._bits(gc, self.nodes.get(gc, ()))
+        to_goal = self._dists(self._layers(goal, gc, sum(g_nodes)), g_nodes)
+
+        adj = self.adj
+        gx, gy = goal
+        g = {start: 0}
+        came = {}
+        done = set()
+        heap = [(0, 0, start)]
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u == goal:
+                path = [u]
+                while u in came:
+                    u = came[u]; path.append(u)
+                path.reverse()
+                return path, s_layers
+            if u in done:
+                continue
+            done.add(u)
+            gu = g[u]
+            edges = first if u == start else adj.get(u, ())
+            if u in to_goal:
+                edges = tuple(edges) + ((goal, to_goal[u]),)
+            for v, d in edges:
+                nd = gu + d
+                if nd < g.get(v, 1 << 60):
+                    g[v] = nd; came[v] = u
+                    h = abs(v[0]-gx) + abs(v[1]-gy)
+                    heapq.heappush(heap, (nd + h, h, v))   # ties: closest to the goal first
+        return None, s_layers
+
+    def _local_path(self, u, v):
+        """Cells after u up to v inside u's cluster, [] if v can't be reached there."""
+        cid = self.cluster_of(u)
+        want = self._bits(cid, [v])
+        layers = self._layers(u, cid, sum(want))
+        (bit,) = want
+        if not layers[-1] & bit or u == v:
+            return []
+        return self._walk_back(layers, cid, bit, len(layers)-1)
+
+    def _refine_leg(self, u, v):
+        if v in self.inter.get(u, ()):
+            return [v]
+        if u not in self.intra:                   # the query's start: not worth keeping
+            return self._local_path(u, v)
+        cache = self._legs.setdefault(self.cluster_of(u), {})
+        leg = cache.get((u, v))
+        if leg is None:
+            leg = cache[(u, v)] = self._local_path(u, v)
+        return leg
+
+    def path(self, start, goal):
+        """Same contract as a_star: cells after start up to goal, [] if none."""
+        if start == goal:
+            return []
+        nodes, _ = self._abstract(start, goal)
+        if not nodes:
+            return []
+        out = []
+        for u, v in zip(nodes, nodes[1:]):
+            out += self._refine_leg(u, v)
+        return out
+
+    def next_step(self, start, goal):
+        """First cell of the path, refining only the first leg.
+
+        The abstract route is kept per (start cluster, goal), so repeated calls
+        while walking toward the same goal only cost one local BFS, and two
+        robots heading for the same goal don't overwrite each other's route.
+        """
+        if start == goal:
+            return None
+        step = self._follow_route(start, goal)
+        if step is not None:
+            return step
+        key = (self.cluster_of(start), goal)
+        nodes, s_layers = self._abstract(start, goal)
+        if not nodes:
+            self._routes.pop(key, None)
+            return None
+        if len(self._routes) > 256:
+            self._routes.clear()
+        self._routes[key] = (self.version, nodes[1:])
+        nxt = nodes[1]
+        if nxt in self.inter.get(start, ()):
+            return nxt
+        sc = key[0]
+        (bit, _), = self._bits(sc, [nxt]).items()
+        d = next(i for i, front in enumerate(s_layers) if front & bit)
+        return self._walk_back(s_layers, sc, bit, d)[0]
+
+    def _follow_route(self, start, goal):
+        cid = self.cluster_of(start)
+        route = self._routes.get((cid, goal))
+        if route is None or route[0] != self.version:
+            return None
+        rest = route[1]
+        if start in rest:
+            rest = rest[rest.index(start)+1:]   # waypoint reached
+        if not rest:
+            return None
+        nxt = rest[0]
+        self._routes[(cid, goal)] = (self.version, rest)
+        if abs(nxt[0]-start[0]) + abs(nxt[1]-start[1]) == 1:
+            if self.cluster_of(nxt) != cid:       # crossing: the route moves on with the robot
+                self._routes[(self.cluster_of(nxt), goal)] = self._routes.pop((cid, goal))
+            return nxt
+        if self.cluster_of(nxt) != cid:
+            return None
+        step = self._local_path(start, nxt)
+        return step[0] if step else None
+
+def attach_hpa(board, cluster_size=16):
+    """Build the hierarchy for board and keep it updated on wall changes."""
+    board.hpa = HierarchicalPathfinder(board, cluster_size)
+    board.add_listener(board.hpa.on_board_change)
+    return board.hpa
@@ -0,0 +1,58 @@
+# latency.py
+# Input-to-photon style measurement for the main loop: time from an input
+# event to the first presented frame that shows its effect.
+#
+# main.py calls frame_start() right after clock.tick() (before polling
+# events), input_applied(t) when an event changed the game and
+# frame_presented() right after pygame.display.flip(). Times are in ms on
+# pygame's clock (pygame.time.get_ticks).
+#
+# pygame 2 events carry no timestamp, so an input is timed from the start of
+# the frame that polled it: the samples are poll-to-present latency, a lower
+# bound that leaves out the time an event waited in SDL's queue during the
+# previous frame (up to one frame at FPS).
+import pygame
+
+HISTORY = 240   # samples kept for the stats
+
+class LatencyTracker:
+    def __init__(self, history=HISTORY):
+        self.history = history
+        self.samples = []
+        self._pending = []     # input times waiting for a frame
+        self._frame_t = None   # get_ticks() at the start of this frame
+
+    def frame_start(self):
+        self._frame_t = pygame.time.get_ticks()
+
+    def event_time(self, event):
+        """Event timestamp if the backend sets one, else the frame start (the
+        poll), else now."""
+        t = getattr(event, 'timestamp', None)
+        if t:
+            return t
+        return self._frame_t if self._frame_t is not None else pygame.time.get_ticks()
+
+    def input_applied(self, t_input):
+        self._pending.append(t_input)
+
+    def frame_presented(self):
+        if not self._pending:
+            return
+        now = pygame.time.get_ticks()
+        for t in self._pending:
+            self.samples.append(now - t)
+        self._pending = []
+        if len(self.samples) > self.history:
+            del self.samples[:len(self.samples)-self.history]
+
+    def stats(self):
+        """(count, mean, p95, max) in ms over the recent samples."""
+        if not self.samples:
+            return 0, 0.0, 0.0, 0.0
+        s = sorted(self.samples)
+        return len(s), sum(s)/len(s), s[min(len(s)-1, int(len(s)*0.95))], s[-1]
+
+    def summary(self):
+        n, mean, p95, mx = self.stats()
+        return f"poll-to-present latency: {mean:.1f} ms avg, {p95:.0f} ms p95, {mx:.0f} ms max ({n} inputs)"
@@ -0,0 +1,177 @@
+# line_of_sight.py
+# Which cells can see which, for ranged fire. Walls ("X") block a shot;
+# robots, resources and traps don't.
+#
+# A shot from a to b follows the cells of a DDA line (rounded to the nearest
+# cell) between them; it is blocked if any cell strictly between the two is a
+# wall. The ray for every offset within LOS_RADIUS is computed once (the same
+# for every board), with ray(-d) the mirror of ray(d), so visibility is
+# symmetric: a sees b exactly when b sees a.
+#
+# Per cell the table keeps one int bitset over the (2R+1)x(2R+1) window
+# around it: bit (dx+R)*(2R+1) + (dy+R) is set when the cell at that offset
+# is on the board and visible. Rows are built lazily, the first time a cell
+# is asked about. A wall added or removed at c can only change lines of
+# length <= R passing through c, so only the rows of cells within R of c are
+# dropped; everything else stays cached. Beyond R, shots are cast directly.
+#
+# Kept current from Board listeners, like the other attached indexes.
+
+LOS_RADIUS = 8
+
+_rays = {}   # radius -> {(dx, dy): cells strictly between, as offsets}
+
+def _line(dx, dy):
+    """Offsets strictly between (0, 0) and (dx, dy) on the rounded DDA line."""
+    steps = max(abs(dx), abs(dy))
+    out = []
+    for i in range(1, steps):
+        t = i/steps
+        out.append((int(dx*t + 0.5) if dx >= 0 else -int(-dx*t + 0.5),
+                    int(dy*t + 0.5) if dy >= 0 else -int(-dy*t + 0.5)))
+    return tuple(out)
+
+def _ray(dx, dy):
+    """_line, always drawn from the same end of the segment (so -d mirrors d)."""
+    if (dx, dy) >= (0, 0):
+        return _line(dx, dy)
+    return tuple((px + dx, py + dy) for px, py in reversed(_line(-dx, -dy)))
+
+def rays(radius=LOS_RADIUS):
+    table = _rays.get(radius)
+    if table is None:
+        table = _rays[radius] = {(dx, dy): _ray(dx, dy) for dx in range(-radius, radius+1)
+                                 for dy in range(-radius, radius+1)}
+    return table
+
+def cast(board, a, b):
+    """First wall strictly between a and b, or None when the shot is clear."""
+    grid = board.grid
+    for px, py in _ray(b[0]-a[0], b[1]-a[1]):
+        x, y = a[0]+px, a[1]+py
+        if grid[x][y] == "X":
+            return x, y
+    return None
+
+class LineOfSight:
+    def __init__(self, board, radius=LOS_RADIUS):
+        self.board = board
+        self.R = radius
+        self.side = 2*radius + 1
+        self.rays = rays(radius)
+        self.table = {}       # cell -> visibility bitset over its window
+        self.builds = 0
+
+    def _index(self, dx, dy):
+        return (dx + self.R)*self.side + dy + self.R
+
+    def _build(self, pos):
+        grid, n, R = self.board.grid, self.board.size, self.R
+        x0, y0 = pos
+        mask = 0
+        for (dx, dy), ray in self.rays.items():
+            x, y = x0+dx, y0+dy
+            if not (0 <= x < n and 0 <= y < n):
+                continue
+            for px, py in ray:
+                if grid[x0+px][y0+py] == "X":
+                    break
+            else:
+                mask |= 1 << ((dx + R)*self.side + dy + R)
+        self.builds += 1
+        return mask
+
+    def mask(self, pos):
+        """Visibility bitset of pos (window bits, see the module comment)."""
+        m = self.table.get(pos)
+        if m is None:
+            m = self.table[pos] = self._build(pos)
+        return m
+
+    # ---------- Queries ----------
+    def visible(self, a, b):
+        dx, dy = b[0]-a[0], b[1]-a[1]
+        if abs(dx) > self.R or abs(dy) > self.R:
+            return cast(self.board, a, b) is None
+        return bool(self.mask(a) >> self._index(dx, dy) & 1)
+
+    def first_block(self, a, b):
+        """First wall on the shot a -> b (None if clear), on the cached rays."""
+        dx, dy = b[0]-a[0], b[1]-a[1]
+        if abs(dx) > self.R or abs(dy) > self.R:
+            return cast(self.board, a, b)
+        if self.mask(a) >> self._index(dx, dy) & 1:
+            return None
+        grid = self.board.grid
+        for px, py in self.rays[(dx, dy)]:
+            if grid[a[0]+px][a[1]+py] == "X":
+                return a[0]+px, a[1]+py
+        return None
+
+    def visible_cells(self, pos, lo=0, hi=None):
+        """Cells visible from pos at walking (Manhattan) distance lo..hi (hi <= R)."""
+        hi = self.R if hi is None else min(hi, self.R)
+        m = self.mask(pos)
+        x0, y0 = pos
+        out = []
+        for dx in range(-hi, hi+1):
+            span = hi - abs(dx)
+            for dy in range(-span, span+1):
+                if abs(dx) + abs(dy) >= lo and m >> self._index(dx, dy) & 1:
+                    out.append((x0+dx, y0+dy))
+        return out
+
+    # ---------- Updates ----------
+    def on_board_change(self, kind, pos):
+        if kind not in ('obstacle_added', 'obstacle_removed'):
+            return
+        R = self.R
+        cx, cy = pos
+        if len(self.table) < (2*R+1)**2:
+            stale = [c for c in self.table if abs(c[0]-cx) <= R and abs(c[1]-cy) <= R]
+        else:
+            n = self.board.size
+            stale = [(x, y) for x in range(max(0, cx-R), min(n, cx+R+1))
+                     for y in range(max(0, cy-R), min(n, cy+R+1)) if (x, y) in self.table]
+        for c in stale:
+            del self.table[c]
+
+def attach_los(board, radius=LOS_RADIUS):
+    """Keep board.los (a LineOfSight) current with the board."""
+    board.los = LineOfSight(board, radius)
+    board.add_listener(board.los.on_board_change)
+    return board.los
+
+# ---------- Shots ----------
+def has_los(board, a, b):
+    los = getattr(board, 'los', None)
+    if los is not None:
+        return los.visible(a, b)
+    return cast(board, a, b) is None
+
+def clip_shot(board, src, dst):
+    """Where a shot from src toward dst lands: dst, or the first wall in the way."""
+    los = getattr(board, 'los', None)
+    block = los.first_block(src, dst) if los is not None else cast(board, src, dst)
+    return dst if block is None else block
+
+def firing_position(ai, target, board, lo, hi, max_steps=3):
+    """First step toward the nearest cell (within max_steps) that has a clear
+    shot at target from lo..hi cells away, or None."""
+    los = getattr(board, 'los', None)
+    bits = getattr(board, 'bits', None)
+    if los is None or bits is None:
+        return None
+    mask = 0
+    for c in los.visible_cells(target, lo, hi):
+        mask |= bits.bit(c)
+    mask &= bits.free
+    if not mask:
+        return None
+    ls = bits.layers(ai.pos, mask, max_steps)
+    hit = ls[-1] & mask
+    if not hit or len(ls) < 2:
+        return None
+    goal = next(bits.cells(hit & -hit))
+    path = bits.path(ai.pos, goal)
+    return path[0] if path else None
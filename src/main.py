@@ -1,10 +1,17 @@
 import pygame, sys, random, math, time
-from board import Board
-from robot import Robot
-from ai_strategies import ai_decision, ai_vs_ai_decision, predict_next_move
-
-from config import GRID_WIDTH, GRID_HEIGHT, MAX_TURNS, NUM_RESOURCES, NUM_TRAPS, NUM_OBSTACLES, RESOURCE_TYPES, TRAP_TYPES
-from utils import init_assets, start_music, get_image, play_sfx
+from ai_strategies import ai_decision, ai_vs_ai_decision, ranged_target, load_profiles
+from neural_policy import neural_decision
+from simulation import get_ai_interval, setup_level
+
+from config import GRID_WIDTH, GRID_HEIGHT, MAX_TURNS, TICK_RATE, VIEW_COLS, VIEW_ROWS
+from utils import init_assets, start_music, get_image, get_atlas, play_sfx
+from projectiles import ProjectileSystem, ARROW_FLIGHT_TICKS
+from scheduler import FixedTimestep, seconds_to_ticks
+from camera import Camera
+from latency import LatencyTracker
+import render
+import ai_trace
+from line_of_sight import clip_shot, has_los
 
 # ---------- State Manager ----------
 class GameState:
@@ -19,24 +26,19 @@ game_state = GameState()
 
 # ---------- Constants ----------
 CELL_SIZE = 64       # slightly larger for nicer sprites
-HUD_HEIGHT = 140
+ZOOM_SIZES = [32, 48, 64, 96]   # cell sizes for +/- zoom (atlases cached per size)
+HUD_HEIGHT = render.HUD_HEIGHT
 FPS = 60
 AI_LEVEL = 'easy'
+AI_POLICY = None     # 'neural': the red AI is neural_policy.py's MLP (played with hard rules)
 RANGED_ATTACK_DELAY_TURNS = 1
 
 
-def get_ai_interval(level):
-    if level == "easy":
-        return 0.5   # slower, more relaxed
-    elif level == "medium":
-        return 0.3   # moderate speed
-    else:  # hard
-        return 0.15  # very fast & challenging
-
-
 pygame.init()
-SCREEN_W = GRID_WIDTH*CELL_SIZE
-SCREEN_H = GRID_HEIGHT*CELL_SIZE + HUD_HEIGHT
+VIEW_W = min(GRID_WIDTH, VIEW_COLS)*CELL_SIZE    # board viewport (px)
+VIEW_H = min(GRID_HEIGHT, VIEW_ROWS)*CELL_SIZE
+SCREEN_W = VIEW_W
+SCREEN_H = VIEW_H + HUD_HEIGHT
 screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
 pygame.display.set_caption("Robo Rescue")
 clock = pygame.time.Clock()
@@ -50,26 +52,21 @@ small_font = pygame.font.SysFont(None, 18)
 init_assets(CELL_SIZE, (SCREEN_W, SCREEN_H-HUD_HEIGHT))
 start_music(loop=True)
 
-ARROW_SPEED = 2.5
-FX_ARROWS = []
+# Ranged arrows (hard): owner 0 = player/blue, 1 = ai/red
+PROJECTILES = ProjectileSystem()
 
-def level_counts(level):
-    if level=='easy':
-        return int(NUM_RESOURCES*1.4), int(NUM_TRAPS*0.6), int(NUM_OBSTACLES*0.7)
-    if level=='medium':
-        return NUM_RESOURCES, NUM_TRAPS, NUM_OBSTACLES
-    return int(NUM_RESOURCES*0.7), int(NUM_TRAPS*1.4), int(NUM_OBSTACLES*1.2)
+# Logic runs at TICK_RATE no matter how fast frames are drawn
+SCHEDULER = FixedTimestep(TICK_RATE)
+TICK_DT = 1.0/TICK_RATE
 
-def setup_level(level):
-    nr, nt, no = level_counts(level)
-    b = Board(GRID_WIDTH, num_resources=nr, num_traps=nt, num_obstacles=no)
-    p = Robot("Player", (0,0))
-    a = Robot("AI", (GRID_WIDTH-1, GRID_HEIGHT-1), random.choice(["Aggressive","Defensive","Balanced"]))
-    return b, p, a
+# Tuned difficulty profiles (tuner.py), if present
+load_profiles()
 
 board, player, ai = setup_level(AI_LEVEL)
+camera = Camera(VIEW_W, VIEW_H, CELL_SIZE, board.size)
+CAMERA_SCROLL_SPEED = CELL_SIZE*8  # px/s when free scrolling (WASD)
 turn = 0
-high_scores = {'easy':0, 'medium':0, 'hard':0}
+high_scores = {'easy':0, 'medium':0, 'hard':0, 'neural':0}   # Neural plays hard rules but keeps its own
 last_round_new_high = False
 round_result = ""
 display_player_score = 0.0
@@ -79,7 +76,12 @@ recent_block = None
 MODE = 'pve'  # or 'pvp_ai'
 AI_TURN_INTERVAL = get_ai_interval(AI_LEVEL)
 
-ai_turn_accum = 0.0
+ai_turn_accum = 0   # ticks since last AI vs AI turn
+
+# Poll -> presented frame latency of inputs (F3 shows it in the HUD)
+LATENCY = LatencyTracker()
+SHOW_LATENCY = False
+TRACE_FILE = "trace.jsonl"   # F4 toggles tracing, F5 dumps it
 ai_paused = False
 
 # Buttons (gameover)
@@ -90,16 +92,50 @@ QUIT_BTN_RECT = pygame.Rect(SCREEN_W//2+40, 230, 180, 48)
 def tile_to_px(pos):  # (row,col) -> (px,py)
     return pos[1]*CELL_SIZE, pos[0]*CELL_SIZE
 
-player_px, player_py = tile_to_px(player.pos)
-ai_px, ai_py = tile_to_px(ai.pos)
 MOVE_SPEED = CELL_SIZE*6  # px/s
 
+def reset_render_positions():
+    global player_px, player_py, ai_px, ai_py, player_prev, ai_prev
+    player_px, player_py = tile_to_px(player.pos)
+    ai_px, ai_py = tile_to_px(ai.pos)
+    player_prev = (player_px, player_py)
+    ai_prev = (ai_px, ai_py)
+    camera.resize_world(board.size)
+    camera.center_on(player_px, player_py)
+
+def set_cell_size(size):
+    """Zoom: switch cell size, keeping render positions and the camera view."""
+    global CELL_SIZE, MOVE_SPEED, CAMERA_SCROLL_SPEED
+    global player_px, player_py, ai_px, ai_py, player_prev, ai_prev
+    k = size/CELL_SIZE
+    cx, cy = camera.x + camera.view_w/2, camera.y + camera.view_h/2
+    CELL_SIZE = size
+    MOVE_SPEED = CELL_SIZE*6
+    CAMERA_SCROLL_SPEED = CELL_SIZE*8
+    player_px, player_py, ai_px, ai_py = player_px*k, player_py*k, ai_px*k, ai_py*k
+    player_prev = (player_prev[0]*k, player_prev[1]*k)
+    ai_prev = (ai_prev[0]*k, ai_prev[1]*k)
+    camera.cell_size = size
+    camera.center_on(cx*k - size/2, cy*k - size/2)
+    get_atlas(size)
+
+def zoom(step):
+    i = max(0, min(len(ZOOM_SIZES)-1, ZOOM_SIZES.index(CELL_SIZE)+step))
+    if ZOOM_SIZES[i] != CELL_SIZE:
+        set_cell_size(ZOOM_SIZES[i])
+
+def lerp_pos(prev, x, y):
+    a = SCHEDULER.alpha
+    return prev[0] + (x-prev[0])*a, prev[1] + (y-prev[1])*a
+
+reset_render_positions()
+
 # ----------- Visual juice -----------
 # Particles (ambient sparks)
 particles = []
 def spawn_particle():
     x = random.randint(0, SCREEN_W-1)
-    y = random.randint(0, GRID_HEIGHT*CELL_SIZE - 1)
+    y = random.randint(0, VIEW_H - 1)
     vx = random.uniform(-10, 10)
     vy = -random.uniform(20, 60)
     life = random.uniform(0.6, 1.4)
@@ -122,98 +158,35 @@ def draw_particles():
 
 # ----------- Drawing -----------
 def draw_board():
-    # Background (no grid look)
-    bg = get_image("background")
-    screen.blit(bg, (0,0))
-
-    # Recent blocked highlight
-    if recent_block and recent_block[1] > 0:
-        (rbx,rby),_ = recent_block
-        rx,ry = rby*CELL_SIZE, rbx*CELL_SIZE
-        s = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-        s.fill((120,120,200,80))
-        screen.blit(s, (rx, ry))
-
-    # World elements as images
-    for i in range(GRID_HEIGHT):
-        for j in range(GRID_WIDTH):
-            cell = board.grid[i][j]
-            px, py = j*CELL_SIZE, i*CELL_SIZE
-            if cell == "X":
-                screen.blit(get_image("obstacle"), (px, py))
-            elif cell == "T":
-                screen.blit(get_image("trap"), (px, py))
-            elif cell == "E":
-                # choose sprite by resource type
-                r_type = board.resources.get((i,j))
-                if r_type in ('health','heart'):
-                    screen.blit(get_image("heart"), (px, py))
-                elif r_type in ('coin','gold','score'):
-                    screen.blit(get_image("coin"), (px, py))
-                else:
-                    # other bonuses, e.g. speed/shield
-                    screen.blit(get_image("bonus"), (px, py))
-
-    # Entities
-    screen.blit(get_image("robot_blue"), (int(player_px), int(player_py)))
-    screen.blit(get_image("robot_red"),  (int(ai_px),     int(ai_py)))
-
-    # Health bars (thin)
-    def draw_health_bar(px, py, health, color):
-        bw = CELL_SIZE
-        bh = 6
-        x = int(px); y = int(py + CELL_SIZE - 8)
-        pygame.draw.rect(screen, (0,0,0), (x, y, bw, bh), border_radius=3)
-        hw = int(bw * max(0, min(1, health/100)))
-        pygame.draw.rect(screen, color, (x, y, hw, bh), border_radius=3)
-    draw_health_bar(player_px, player_py, player.health, (80,200,80))
-    draw_health_bar(ai_px, ai_py, ai.health, (200,80,80))
-
-    # Animated arrows (hard)
-    if AI_LEVEL=='hard':
-        for fx in FX_ARROWS:
-            sx,sy = fx['start']; ex,ey = fx['end']; t = fx['t']
-            cx = sx + (ex - sx)*t; cy = sy + (ey - sy)*t
-            col = fx['color']
-            pygame.draw.line(screen, col, (sx,sy), (cx,cy), 3)
-            pygame.draw.circle(screen, col, (int(cx),int(cy)), 4)
-
+    # Camera follows the chosen robot (interpolated between the last two logic ticks)
+    ppx, ppy = lerp_pos(player_prev, player_px, player_py)
+    apx, apy = lerp_pos(ai_prev, ai_px, ai_py)
+    if camera.target == 'player': camera.center_on(ppx, ppy)
+    elif camera.target == 'ai':   camera.center_on(apx, apy)
+    arrows = PROJECTILES.visible(SCHEDULER.alpha) if AI_LEVEL=='hard' else ()
+    render.draw_board(screen, board, camera, CELL_SIZE, player, ai, (ppx, ppy), (apx, apy),
+                      arrows, recent_block)
     # Particles on top
     draw_particles()
 
 def draw_stats():
-    pygame.draw.rect(screen, (16,18,24), (0, GRID_HEIGHT*CELL_SIZE, SCREEN_W, HUD_HEIGHT))
-    pygame.draw.line(screen, (40,48,60), (0, GRID_HEIGHT*CELL_SIZE), (SCREEN_W, GRID_HEIGHT*CELL_SIZE), 2)
-
     global display_player_score, display_ai_score
     display_player_score += (player.score - display_player_score)*0.2
     display_ai_score += (ai.score - display_ai_score)*0.2
-
-    base_y = GRID_HEIGHT*CELL_SIZE
-    left_x = 12
-
-    blue_text = font.render(f"Blue: {player.health}   Score: {int(display_player_score)}", True, (120,170,255))
-    red_text  = font.render(f"Red : {ai.health}   Score: {int(display_ai_score)}", True, (255,120,120))
-    screen.blit(blue_text, (left_x, base_y+12))
-    screen.blit(red_text,  (left_x, base_y+40))
-
-    # Add ESC hint inside HUD bar
-    esc_surface = small_font.render("ESC: Menu", True, (160,170,190))
-    right_x = SCREEN_W - 12
-    screen.blit(esc_surface, (right_x - esc_surface.get_width(), base_y+12))
+    render.draw_stats(screen, player, ai, display_player_score, display_ai_score, VIEW_H, HUD_HEIGHT)
 
 
 def draw_esc_hint():
     esc_surface = small_font.render("ESC: Menu", True, (160,170,190))
     right_x = SCREEN_W - 12
-    base_y = GRID_HEIGHT * CELL_SIZE 
+    base_y = VIEW_H
     # place at the bottom of HUD area
     screen.blit(esc_surface, (right_x - esc_surface.get_width(), base_y + 10))
 
 def draw_eesc_hint():
     esc_surface = small_font.render("ESC: Quit", True, (160,170,190))
     right_x = SCREEN_W - 12
-    base_y = GRID_HEIGHT * CELL_SIZE 
+    base_y = VIEW_H
     # place at the bottom of HUD area
     screen.blit(esc_surface, (right_x - esc_surface.get_width(), base_y + 10))
 
@@ -232,10 +205,70 @@ class Button:
         surf.blit(text, (self.rect.centerx - text.get_width()//2, self.rect.centery - text.get_height()//2))
     def is_hover(self, pos):
         return self.rect.collidepoint(pos)
-    # ---------- Main Loop ----------
+
+# ---------- Simulation tick ----------
+def ai_vs_ai_turn():
+    global turn, recent_block
+    ai_trace.turn = turn
+    if turn % 2 == 0:
+        ai.last_pos = ai.pos
+        ai_vs_ai_decision(player, ai, board, level=AI_LEVEL)
+        if AI_LEVEL=='medium' and getattr(player,'last_collected',None) is not None:
+            x,y = player.last_collected
+            if board.grid[x][y]==".": board.add_obstacle((x,y)); recent_block=((x,y),50)
+            player.last_collected = None
+        if AI_LEVEL=='hard' and hasattr(player,'pending_ranged') and player.pending_ranged:
+            PROJECTILES.spawn(player.pos, clip_shot(board, player.pos, player.pending_ranged['target_pos']), owner=0)
+            player.pending_ranged = None
+    else:
+        ai.last_pos = ai.pos
+        red_decide = neural_decision if AI_POLICY == 'neural' else ai_vs_ai_decision
+        red_decide(ai, player, board, level=AI_LEVEL)
+        if AI_LEVEL=='medium' and getattr(ai,'last_collected',None) is not None:
+            x,y = ai.last_collected
+            if board.grid[x][y]==".": board.add_obstacle((x,y)); recent_block=((x,y),50)
+            ai.last_collected = None
+        if AI_LEVEL=='hard' and hasattr(ai,'pending_ranged') and ai.pending_ranged:
+            PROJECTILES.spawn(ai.pos, clip_shot(board, ai.pos, ai.pending_ranged['target_pos']), owner=1)
+            ai.pending_ranged = None
+    turn += 1
+
+def approach(curr, target):
+    if curr < target: curr = min(target, curr + MOVE_SPEED*TICK_DT)
+    elif curr > target: curr = max(target, curr - MOVE_SPEED*TICK_DT)
+    return curr
+
+def sim_tick(current_state):
+    global ai_turn_accum, recent_block
+    global player_px, player_py, ai_px, ai_py, player_prev, ai_prev
+    if current_state == 'playing':
+        if MODE=='pvp_ai' and not ai_paused:
+            ai_turn_accum += 1
+            if ai_turn_accum >= seconds_to_ticks(AI_TURN_INTERVAL):
+                ai_turn_accum = 0
+                ai_vs_ai_turn()
+        for _ in PROJECTILES.advance(1, [player, ai]):
+            play_sfx("attack")
+
+    # Smooth approach to target tiles
+    player_prev = (player_px, player_py)
+    ai_prev = (ai_px, ai_py)
+    tpx, tpy = tile_to_px(player.pos)
+    apx, apy = tile_to_px(ai.pos)
+    player_px = approach(player_px, tpx); player_py = approach(player_py, tpy)
+    ai_px = approach(ai_px, apx);       ai_py = approach(ai_py, apy)
+
+    # recent block fade
+    if recent_block:
+        (rbx,rby),frames = recent_block
+        frames -= 1
+        recent_block = None if frames<=0 else ((rbx,rby), frames)
+
+# ---------- Main Loop ----------
 running = True
 while running:
     dt = clock.tick(FPS)/1000.0
+    LATENCY.frame_start()
     current_state = game_state.get_state()
 
     # occasional ambient particles
@@ -247,98 +280,13 @@ while running:
         player.update_buffs()
         ai.update_buffs()
 
-    # DRAW
-    if current_state == 'welcome':
-        # cinematic background
-        screen.blit(get_image("background"), (0,0))
-        title = title_font.render("Robo Rescue", True, (240,245,255))
-        # subtitle = subtitle_font.render("Futuristic Arena", True, (200,220,245))
-        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 70))
-        # screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 130))
-
-        start_btn = Button((SCREEN_W//2-100, 220, 200, 52), 'Start')
-        mx,my = pygame.mouse.get_pos()
-        start_btn.draw(screen, start_btn.is_hover((mx,my)))
-        draw_eesc_hint() 
-
-    elif current_state == 'select':
-        # Clear the whole screen (covers HUD too)
-        screen.fill((0,0,0))  
-        # Then draw background
-        screen.blit(get_image("background"), (0,0))
-        title = title_font.render("Select Difficulty", True, (240,245,255))
-        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
-        btns = [
-            Button((SCREEN_W//2-220, 180, 140, 48), 'Easy'),
-            Button((SCREEN_W//2-70,  180, 140, 48), 'Medium'),
-            Button((SCREEN_W//2+80,  180, 140, 48), 'Hard'),
-        ]
-        mx,my = pygame.mouse.get_pos()
-        for b in btns:
-            b.draw(screen, b.is_hover((mx,my)))
-        draw_eesc_hint()   # ESC = Quit
-
-
-    elif current_state == 'mode':
-        screen.fill((0,0,0)) 
-        screen.blit(get_image("background"), (0,0))
-        title = title_font.render("Choose Mode", True, (240,245,255))
-        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
-        btns = [
-            Button((SCREEN_W//2-220, 180, 180, 48), 'AI vs Player'),
-            Button((SCREEN_W//2+40,  180, 180, 48), 'AI vs AI'),
-        ]
-        mx,my = pygame.mouse.get_pos()
-        for b in btns: b.draw(screen, b.is_hover((mx,my)))
-        draw_esc_hint() 
-
-    elif current_state == 'playing':
-        draw_board()
-        draw_stats()
-
-        # Right side turn indicator (AI vs AI)
-        if MODE == 'pvp_ai':
-            current_ai = 'Blue' if turn % 2 == 0 else 'Red'
-            turn_text = f"Turn {turn + 1}: {current_ai}"
-            if ai_paused: turn_text += " (PAUSED)"
-            right_x = SCREEN_W - 12
-            base_y = GRID_HEIGHT*CELL_SIZE
-            turn_surface = font.render(turn_text, True, (210,220,255))
-            screen.blit(turn_surface, (right_x - turn_surface.get_width(), base_y+10))
-            pause_surface = small_font.render("SPACE: Pause/Resume", True, (160,170,190))
-            screen.blit(pause_surface, (right_x - pause_surface.get_width(), base_y+35))
-            esc_surface = small_font.render("ESC: Menu", True, (160,170,190))
-            screen.blit(esc_surface, (right_x - esc_surface.get_width(), base_y+55))
-        
-    elif current_state == 'gameover':
-        
-        pygame.draw.rect(screen, (16,18,24), (0,0,SCREEN_W, SCREEN_H))
-        result = round_result or "Draw!"
-        title = title_font.render("Game Over", True, (220,230,255))
-        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 64))
-        rs = subtitle_font.render(result, True, (220,230,255))
-        screen.blit(rs, (SCREEN_W//2 - rs.get_width()//2, 130))
-
-        current_level = AI_LEVEL if AI_LEVEL else "Unknown"
-        level_hs = high_scores.get(current_level, 0)
-        level_name = current_level.title()
-        msg = f"High Score ({level_name}): {level_hs}"
-        hs = subtitle_font.render(msg, True, (180,190,220))
-        screen.blit(hs, (SCREEN_W//2 - hs.get_width()//2, 170))
-
-        mx,my = pygame.mouse.get_pos()
-        play_btn = Button(PLAY_BTN_RECT, 'Play Again')
-        quit_btn = Button(QUIT_BTN_RECT, 'Main Menu')
-        play_btn.draw(screen, play_btn.is_hover((mx,my)))
-        quit_btn.draw(screen, quit_btn.is_hover((mx,my)))
-
-    pygame.display.flip()
-
-    # EVENTS
+    # INPUT
     moved=False
+    input_t=None
     events = pygame.event.get()
     for event in events:
         if event.type == pygame.QUIT:
+            if LATENCY.samples: print(LATENCY.summary())
             pygame.quit(); sys.exit()
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             if current_state == 'welcome':
@@ -364,16 +312,21 @@ while running:
                 easy = Button((SCREEN_W//2-220, 180, 140, 48), 'Easy')
                 medium = Button((SCREEN_W//2-70,  180, 140, 48), 'Medium')
                 hard = Button((SCREEN_W//2+80,  180, 140, 48), 'Hard')
+                neural = Button((SCREEN_W//2-70,  240, 140, 48), 'Neural')
                 if easy.is_hover(event.pos):
-                    AI_LEVEL='easy'
+                    AI_LEVEL='easy'; AI_POLICY=None
                     AI_TURN_INTERVAL = get_ai_interval(AI_LEVEL)
                     game_state.set_state('mode')
                 elif medium.is_hover(event.pos):
-                    AI_LEVEL='medium'
+                    AI_LEVEL='medium'; AI_POLICY=None
                     AI_TURN_INTERVAL = get_ai_interval(AI_LEVEL)
                     game_state.set_state('mode')
                 elif hard.is_hover(event.pos):
-                    AI_LEVEL='hard'
+                    AI_LEVEL='hard'; AI_POLICY=None
+                    AI_TURN_INTERVAL = get_ai_interval(AI_LEVEL)
+                    game_state.set_state('mode')
+                elif neural.is_hover(event.pos):
+                    AI_LEVEL='hard'; AI_POLICY='neural'
                     AI_TURN_INTERVAL = get_ai_interval(AI_LEVEL)
                     game_state.set_state('mode')
 
@@ -384,25 +337,22 @@ while running:
                 if ai_player.is_hover(event.pos):
                     MODE='pve'
                     board, player, ai = setup_level(AI_LEVEL)
-                    player_px, player_py = tile_to_px(player.pos)
-                    ai_px, ai_py = tile_to_px(ai.pos)
-                    turn=0; ai_turn_accum=0.0
+                    reset_render_positions()
+                    turn=0; ai_turn_accum=0; PROJECTILES.clear()
                     game_state.set_state('playing')
                 elif ai_ai.is_hover(event.pos):
                     MODE='pvp_ai'
                     board, player, ai = setup_level(AI_LEVEL)
-                    player_px, player_py = tile_to_px(player.pos)
-                    ai_px, ai_py = tile_to_px(ai.pos)
-                    turn=0; ai_turn_accum=0.0
+                    reset_render_positions()
+                    turn=0; ai_turn_accum=0; PROJECTILES.clear()
                     game_state.set_state('playing')
 
         elif current_state == 'gameover':
             if event.type==pygame.MOUSEBUTTONDOWN and event.button==1:
                 if PLAY_BTN_RECT.collidepoint(event.pos):
                     board, player, ai = setup_level(AI_LEVEL)
-                    player_px, player_py = tile_to_px(player.pos)
-                    ai_px, ai_py = tile_to_px(ai.pos)
-                    turn = 0
+                    reset_render_positions()
+                    turn=0; ai_turn_accum=0; PROJECTILES.clear()
                     game_state.set_state('playing')
                 elif QUIT_BTN_RECT.collidepoint(event.pos):
                     game_state.set_state('welcome')
@@ -429,117 +379,72 @@ while running:
                         moved=True
                 elif event.key==pygame.K_SPACE and MODE=='pvp_ai':
                     ai_paused = not ai_paused
+                elif event.key==pygame.K_TAB:
+                    camera.cycle_target()   # follow player -> ai -> free (WASD)
+                elif event.key==pygame.K_F3:
+                    SHOW_LATENCY = not SHOW_LATENCY
+                elif event.key==pygame.K_F4:
+                    ai_trace.enable(not ai_trace.ENABLED)   # AI decision/search trace
+                    print("AI trace", "on" if ai_trace.ENABLED else "off")
+                elif event.key==pygame.K_F5:
+                    print(f"AI trace: {ai_trace.dump(TRACE_FILE)} records -> {TRACE_FILE}")
+                    print(ai_trace.summary())
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    zoom(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    zoom(-1)
             if event.type==pygame.MOUSEBUTTONDOWN and event.button==1:
                 if AI_LEVEL=='hard' and MODE=='pve':
-                    gx, gy = event.pos[0]//CELL_SIZE, event.pos[1]//CELL_SIZE
-                    if 0<=gy<GRID_HEIGHT and 0<=gx<GRID_WIDTH and event.pos[1] < GRID_HEIGHT*CELL_SIZE:
-                        start = (int(player_px+CELL_SIZE/2), int(player_py+CELL_SIZE/2))
-                        end = (gx*CELL_SIZE+CELL_SIZE//2, gy*CELL_SIZE+CELL_SIZE//2)
-                        FX_ARROWS.append({'start':start,'end':end,'t':0.0,'color':(60,140,255),'damage':20,'owner':'player','grid_target':(gy,gx)})
+                    cell = camera.screen_to_cell(*event.pos)
+                    if cell is not None:
+                        PROJECTILES.spawn(player.pos, clip_shot(board, player.pos, cell), owner=0)
                         moved=True
+            if moved and input_t is None:
+                input_t = LATENCY.event_time(event)
 
-    # GAME LOGIC
-    if current_state == 'playing' and MODE=='pvp_ai' and not ai_paused:
-        ai_turn_accum += dt
-        if ai_turn_accum >= AI_TURN_INTERVAL:
-            ai_turn_accum = 0.0
-            if turn % 2 == 0:
-                ai.last_pos = ai.pos
-                ai_vs_ai_decision(player, ai, board, level=AI_LEVEL)
-                if AI_LEVEL=='medium' and getattr(player,'last_collected',None) is not None:
-                    x,y = player.last_collected
-                    if board.grid[x][y]==".": board.grid[x][y] = "X"; board.obstacles.add((x,y)); recent_block=((x,y),50)
-                    player.last_collected = None
-                if AI_LEVEL=='hard' and hasattr(player,'pending_ranged') and player.pending_ranged:
-                    start = (int(player_px+CELL_SIZE/2), int(player_py+CELL_SIZE/2))
-                    tgt = player.pending_ranged['target_pos']
-                    end = (tgt[1]*CELL_SIZE+CELL_SIZE//2, tgt[0]*CELL_SIZE+CELL_SIZE//2)
-                    FX_ARROWS.append({'start':start,'end':end,'t':0.0,'color':(60,140,255),'damage':20,'owner':'player','grid_target':tgt})
-                    player.pending_ranged = None
-            else:
-                ai.last_pos = ai.pos
-                ai_vs_ai_decision(ai, player, board, level=AI_LEVEL)
-                if AI_LEVEL=='medium' and getattr(ai,'last_collected',None) is not None:
-                    x,y = ai.last_collected
-                    if board.grid[x][y]==".": board.grid[x][y] = "X"; board.obstacles.add((x,y)); recent_block=((x,y),50)
-                    ai.last_collected = None
-                if AI_LEVEL=='hard' and hasattr(ai,'pending_ranged') and ai.pending_ranged:
-                    start = (int(ai_px+CELL_SIZE/2), int(ai_py+CELL_SIZE/2))
-                    tgt = ai.pending_ranged['target_pos']
-                    end = (tgt[1]*CELL_SIZE+CELL_SIZE//2, tgt[0]*CELL_SIZE+CELL_SIZE//2)
-                    FX_ARROWS.append({'start':start,'end':end,'t':0.0,'color':(255,90,90),'damage':20,'owner':'ai','grid_target':tgt})
-                    ai.pending_ranged = None
-            turn += 1
-
-    elif current_state == 'playing' and moved:
+    # GAME LOGIC (player turn, event driven)
+    if moved:
+        LATENCY.input_applied(input_t)
+    if current_state == 'playing' and moved and MODE=='pve':
         ai.last_pos = ai.pos
-        ai_decision(ai, player, board, level=AI_LEVEL)
+        ai_trace.turn = turn
+        (neural_decision if AI_POLICY == 'neural' else ai_decision)(ai, player, board, level=AI_LEVEL)
         if AI_LEVEL=='medium' and getattr(ai,'last_collected',None) is not None:
             x,y = ai.last_collected
-            if board.grid[x][y]==".": board.grid[x][y] = "X"; board.obstacles.add((x,y)); recent_block=((x,y),50)
+            if board.grid[x][y]==".": board.add_obstacle((x,y)); recent_block=((x,y),50)
             ai.last_collected = None
         if AI_LEVEL=='hard':
-            predicted = predict_next_move(player, board)
-            start = (int(ai_px+CELL_SIZE/2), int(ai_py+CELL_SIZE/2))
-            end = (predicted[1]*CELL_SIZE+CELL_SIZE//2, predicted[0]*CELL_SIZE+CELL_SIZE//2)
-            FX_ARROWS.append({
-                'start': start,
-                'end': end,
-                't': 0.4,
-                'color': (255,90,90),
-                'damage': 20,
-                'owner': 'ai',
-                'grid_target': predicted
-            })
+            predicted = ranged_target(ai, player, board, AI_LEVEL)
+            # AI arrows start 40% into their flight (as before)
+            PROJECTILES.spawn(ai.pos, clip_shot(board, ai.pos, predicted), owner=1, elapsed=int(ARROW_FLIGHT_TICKS*0.4))
 
         if AI_LEVEL!='hard' and hasattr(player,'pending_ranged') and player.pending_ranged:
             player.pending_ranged['turns'] -= 1
             if player.pending_ranged['turns'] <= 0:
                 target_pos = player.pending_ranged['target_pos']
-                if ai.pos == target_pos:
+                if ai.pos == target_pos and has_los(board, player.pos, target_pos):
                     ai.health -= 20
                 player.pending_ranged = None
         turn += 1
 
         # high-score
         total_score = player.score
-        if total_score > high_scores.get(AI_LEVEL,0):
-            high_scores[AI_LEVEL] = total_score
+        hs_key = 'neural' if AI_POLICY == 'neural' else AI_LEVEL
+        if total_score > high_scores.get(hs_key,0):
+            high_scores[hs_key] = total_score
             last_round_new_high = True
         else:
             last_round_new_high = False
 
-    # Smooth approach to target tiles
-    def approach(curr, target):
-        if curr < target: curr = min(target, curr + MOVE_SPEED*dt)
-        elif curr > target: curr = max(target, curr - MOVE_SPEED*dt)
-        return curr
-    tpx, tpy = tile_to_px(player.pos)
-    apx, apy = tile_to_px(ai.pos)
-    player_px = approach(player_px, tpx); player_py = approach(player_py, tpy)
-    ai_px = approach(ai_px, apx);       ai_py = approach(ai_py, apy)
+    # Free camera scrolling
+    if current_state == 'playing' and camera.target is None:
+        keys = pygame.key.get_pressed()
+        step = CAMERA_SCROLL_SPEED*dt
+        camera.scroll((keys[pygame.K_d]-keys[pygame.K_a])*step, (keys[pygame.K_s]-keys[pygame.K_w])*step)
 
-    # Update arrows + recent block fade
-    if AI_LEVEL=='hard' and FX_ARROWS:
-        remain=[]
-        for fx in FX_ARROWS:
-            fx['t'] += ARROW_SPEED*dt
-            if fx['t'] >= 1.0:
-                if fx['owner']=='player':
-                    if ai.pos == fx['grid_target']: 
-                        ai.health -= fx['damage']
-                        play_sfx("attack") 
-                else:
-                    if player.pos == fx['grid_target']: 
-                        player.health -= fx['damage']
-                        play_sfx("attack")
-            else:
-                remain.append(fx)
-        FX_ARROWS = remain
-    if recent_block:
-        (rbx,rby),frames = recent_block
-        frames -= 1
-        recent_block = None if frames<=0 else ((rbx,rby), frames)
+    # Fixed-timestep simulation (AI vs AI turns, arrows, movement)
+    for _ in range(SCHEDULER.advance(dt)):
+        sim_tick(current_state)
 
     # Win conditions
     if current_state == 'playing':
@@ -570,5 +475,98 @@ while running:
                 round_result = 'Draw!'
             game_state.set_state('gameover')
 
+    # RENDER (after input and logic, so this frame already shows their result)
+    current_state = game_state.get_state()
+    if current_state == 'welcome':
+        # cinematic background
+        screen.blit(get_image("background"), (0,0))
+        title = title_font.render("Robo Rescue", True, (240,245,255))
+        # subtitle = subtitle_font.render("Futuristic Arena", True, (200,220,245))
+        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 70))
+        # screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 130))
+
+        start_btn = Button((SCREEN_W//2-100, 220, 200, 52), 'Start')
+        mx,my = pygame.mouse.get_pos()
+        start_btn.draw(screen, start_btn.is_hover((mx,my)))
+        draw_eesc_hint() 
+
+    elif current_state == 'select':
+        # Clear the whole screen (covers HUD too)
+        screen.fill((0,0,0))  
+        # Then draw background
+        screen.blit(get_image("background"), (0,0))
+        title = title_font.render("Select Difficulty", True, (240,245,255))
+        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
+        btns = [
+            Button((SCREEN_W//2-220, 180, 140, 48), 'Easy'),
+            Button((SCREEN_W//2-70,  180, 140, 48), 'Medium'),
+            Button((SCREEN_W//2+80,  180, 140, 48), 'Hard'),
+            Button((SCREEN_W//2-70,  240, 140, 48), 'Neural'),
+        ]
+        mx,my = pygame.mouse.get_pos()
+        for b in btns:
+            b.draw(screen, b.is_hover((mx,my)))
+        draw_eesc_hint()   # ESC = Quit
+
+
+    elif current_state == 'mode':
+        screen.fill((0,0,0)) 
+        screen.blit(get_image("background"), (0,0))
+        title = title_font.render("Choose Mode", True, (240,245,255))
+        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
+        btns = [
+            Button((SCREEN_W//2-220, 180, 180, 48), 'AI vs Player'),
+            Button((SCREEN_W//2+40,  180, 180, 48), 'AI vs AI'),
+        ]
+        mx,my = pygame.mouse.get_pos()
+        for b in btns: b.draw(screen, b.is_hover((mx,my)))
+        draw_esc_hint() 
+
+    elif current_state == 'playing':
+        draw_board()
+        draw_stats()
+
+        # Right side turn indicator (AI vs AI)
+        if MODE == 'pvp_ai':
+            current_ai = 'Blue' if turn % 2 == 0 else 'Red'
+            turn_text = f"Turn {turn + 1}: {current_ai}"
+            if ai_paused: turn_text += " (PAUSED)"
+            right_x = SCREEN_W - 12
+            base_y = VIEW_H
+            turn_surface = font.render(turn_text, True, (210,220,255))
+            screen.blit(turn_surface, (right_x - turn_surface.get_width(), base_y+10))
+            pause_surface = small_font.render("SPACE: Pause/Resume", True, (160,170,190))
+            screen.blit(pause_surface, (right_x - pause_surface.get_width(), base_y+35))
+            esc_surface = small_font.render("ESC: Menu", True, (160,170,190))
+            screen.blit(esc_surface, (right_x - esc_surface.get_width(), base_y+55))
+        if SHOW_LATENCY:
+            lat = small_font.render(LATENCY.summary(), True, (160,170,190))
+            screen.blit(lat, (12, VIEW_H + 70))
+        
+    elif current_state == 'gameover':
+        
+        pygame.draw.rect(screen, (16,18,24), (0,0,SCREEN_W, SCREEN_H))
+        result = round_result or "Draw!"
+        title = title_font.render("Game Over", True, (220,230,255))
+        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 64))
+        rs = subtitle_font.render(result, True, (220,230,255))
+        screen.blit(rs, (SCREEN_W//2 - rs.get_width()//2, 130))
+
+        current_level = 'neural' if AI_POLICY == 'neural' else (AI_LEVEL or "Unknown")
+        level_hs = high_scores.get(current_level, 0)
+        level_name = current_level.title()
+        msg = f"High Score ({level_name}): {level_hs}"
+        hs = subtitle_font.render(msg, True, (180,190,220))
+        screen.blit(hs, (SCREEN_W//2 - hs.get_width()//2, 170))
+
+        mx,my = pygame.mouse.get_pos()
+        play_btn = Button(PLAY_BTN_RECT, 'Play Again')
+        quit_btn = Button(QUIT_BTN_RECT, 'Main Menu')
+        play_btn.draw(screen, play_btn.is_hover((mx,my)))
+        quit_btn.draw(screen, quit_btn.is_hover((mx,my)))
+
+    pygame.display.flip()
+    LATENCY.frame_presented()
+
 pygame.quit()
 print("=== Game Over ===")
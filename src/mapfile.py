@@ -0,0 +1,194 @@
+# mapfile.py
+# Fixed board layouts as plain-text map files, for benchmarks and regression
+# games.
+#
+#   robo-map 1
+#   size 12
+#   goals end_player=11,11 end_ai=0,0 end_blue=11,11 end_red=0,0
+#   starts blue=0,0 red=11,11
+#   legend c=resource:coin h=resource:health s=resource:shield F=trap:fire S=trap:spike
+#   grid
+#   ..c....X....
+#   ...          (size rows of size characters)
+#
+# "." is empty and "X" a wall; every other character is a resource or trap
+# per the legend (the exporter writes one; without it the default legend
+# from config applies). Header lines may come in any order; "#" starts a
+# comment line.
+#
+# The grid is fixed-width, so the loader memory-maps the file and reads it
+# as a numpy array: cell codes are translated with a lookup table, rows
+# become board rows with one bytes->list conversion each, and the item dicts
+# are filled from np.nonzero per type. No Python code runs per cell.
+import mmap
+from itertools import repeat
+
+import numpy as np
+
+from board import Board
+from robot import Robot
+from config import RESOURCE_TYPES, TRAP_TYPES
+
+MAGIC = "robo-map"
+VERSION = 1
+GOAL_NAMES = ('end_player', 'end_ai', 'end_blue', 'end_red')
+
+def default_legend():
+    """{char: ('resource'|'trap', type)}: resources lower case, traps upper case."""
+    legend, used = {}, {".", "X", "E", "T", "#"}
+    for kind, types, case in (('resource', RESOURCE_TYPES, str.lower), ('trap', TRAP_TYPES, str.upper)):
+        for t in sorted(types):
+            ch = next((case(c) for c in t + "abcdefghijklmnopqrstuvwyz"
+                       if c.isalpha() and case(c) not in used), None)
+            if ch is None:
+                raise ValueError(f"no map character left for {kind} {t!r}")
+            used.add(ch)
+            legend[ch] = (kind, t)
+    return legend
+
+def _pos(text):
+    x, y = text.split(",")
+    return int(x), int(y)
+
+# ---------- Loading ----------
+def _read_header(mm):
+    """Parse header lines; returns (fields, offset of the first grid byte)."""
+    fields = {}
+    off = 0
+    while True:
+        end = mm.find(b"\n", off)
+        if end < 0:
+            raise ValueError("map file has no grid section")
+        line = mm[off:end].decode("utf-8").strip()
+        off = end + 1
+        if not line or line.startswith("#"):
+            continue
+        if line == "grid":
+            return fields, off
+        key, _, rest = line.partition(" ")
+        fields[key] = rest.strip()
+
+def load_board(path):
+    """Read a map file -> (Board, {'blue': start, 'red': start})."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        fields, off = _read_header(mm)
+        magic = fields.get(MAGIC)
+        if magic is None or int(magic) > VERSION:
+            raise ValueError(f"not a {MAGIC} v{VERSION} file")
+        n = int(fields["size"])
+        if len(mm) - off < n*(n+1) - 1:
+            raise ValueError("map grid is truncated")
+        raw = np.frombuffer(mm, dtype=np.uint8, count=n*(n+1) - 1, offset=off)
+        cells = np.append(raw, np.uint8(10)).reshape(n, n+1)   # a copy, so the mmap can close
+        del raw
+        if (cells[:, n] != 10).any():
+            raise ValueError(f"map rows must be exactly {n} characters")
+        cells = cells[:, :n]
+
+    legend = default_legend()
+    if "legend" in fields:
+        legend = {}
+        for item in fields["legend"].split():
+            ch, _, spec = item.partition("=")
+            kind, _, t = spec.partition(":")
+            legend[ch] = (kind, t)
+
+    # board character per file character
+    lut = np.zeros(256, dtype=np.uint8)
+    lut[ord(".")] = ord("."); lut[ord("X")] = ord("X")
+    for ch, (kind, t) in legend.items():
+        lut[ord(ch)] = ord("E") if kind == 'resource' else ord("T")
+    grid = lut[cells]
+    if not grid.all():
+        bad = chr(int(cells[grid == 0][0]))
+        raise ValueError(f"unknown map character {bad!r}")
+
+    b = Board(n, populate=False)
+    b.grid = [list(row.tobytes().decode("ascii")) for row in grid]
+    xs, ys = np.nonzero(cells == ord("X"))
+    b.obstacles = set(zip(xs.tolist(), ys.tolist()))
+    for ch, (kind, t) in legend.items():
+        xs, ys = np.nonzero(cells == ord(ch))
+        if len(xs):
+            items = b.resources if kind == 'resource' else b.traps
+            items.update(zip(zip(xs.tolist(), ys.tolist()), repeat(t)))
+    b.num_resources, b.num_traps, b.num_obstacles = len(b.resources), len(b.traps), len(b.obstacles)
+
+    for item in fields.get("goals", "").split():
+        name, _, p = item.partition("=")
+        if name in GOAL_NAMES:
+            setattr(b, name, _pos(p))
+    b.reserved_cells = {b.end_player, b.end_ai, b.end_blue, b.end_red}
+    starts = {'blue': (0, 0), 'red': (n-1, n-1)}
+    for item in fields.get("starts", "").split():
+        name, _, p = item.partition("=")
+        starts[name] = _pos(p)
+    return b, starts
+
+def copy_board(board):
+    """Fresh Board with the same layout (grid and item dicts copied, nothing attached)."""
+    b = Board(board.size, populate=False)
+    b.grid = [row[:] for row in board.grid]
+    b.obstacles = set(board.obstacles)
+    b.resources = dict(board.resources)
+    b.traps = dict(board.traps)
+    b.num_resources, b.num_traps, b.num_obstacles = board.num_resources, board.num_traps, board.num_obstacles
+    for g in GOAL_NAMES:
+        setattr(b, g, getattr(board, g))
+    b.reserved_cells = set(board.reserved_cells)
+    return b
+
+def _level(b, starts, blue_personality, red_personality, policy=None):
+    from simulation import prepare_board
+    p = Robot("Player", starts['blue'], blue_personality)
+    a = Robot("AI", starts['red'], red_personality)
+    prepare_board(b, p, a, policy)
+    return b, p, a
+
+def load_level(path, blue_personality='Balanced', red_personality='Balanced', policy=None):
+    """(board, blue, red) from a map file, ready to play like simulation.setup_level.
+    policy: a policy_table .npy solved for this map."""
+    b, starts = load_board(path)
+    return _level(b, starts, blue_personality, red_personality, policy)
+
+def map_setup(path, blue_personality='Balanced', red_personality='Balanced', policy=None):
+    """setup= callable for simulation.play_match that plays on a fixed map
+    (with a policy_table .npy solved for it, if given).
+
+    The file is parsed once; each match plays on a copy of that board. The
+    helpers prepare_board attaches are still built per match, and on big
+    maps they dominate: ~4 s at 1000x1000, mostly the HPA and connectivity
+    builds, against ~0.2 s to parse the file."""
+    board, starts = load_board(path)
+    return lambda level: _level(copy_board(board), starts, blue_personality, red_personality, policy)
+
+# ---------- Export ----------
+def save_board(board, path, starts=None):
+    """Write board (and robot starts, default the corners) as a map file."""
+    n = board.size
+    legend = default_legend()
+    code = {v: ch for ch, v in legend.items()}
+    for kind, items in (('resource', board.resources), ('trap', board.traps)):
+        for t in set(items.values()) - {t for k, t in legend.values() if k == kind}:
+            raise ValueError(f"{kind} type {t!r} has no map character")
+    cells = np.frombuffer("".join("".join(r) for r in board.grid).encode("ascii"), dtype=np.uint8)
+    cells = cells.reshape(n, n).copy()
+    for kind, items in (('resource', board.resources), ('trap', board.traps)):
+        by_type = {}
+        for pos, t in items.items():
+            by_type.setdefault(t, []).append(pos)
+        for t, cs in by_type.items():
+            xs, ys = zip(*cs)
+            cells[list(xs), list(ys)] = ord(code[(kind, t)])
+    cells = np.concatenate([cells, np.full((n, 1), 10, dtype=np.uint8)], axis=1)
+    starts = dict({'blue': (0, 0), 'red': (n-1, n-1)}, **(starts or {}))
+    goals = " ".join(f"{g}={getattr(board, g)[0]},{getattr(board, g)[1]}" for g in GOAL_NAMES)
+    with open(path, "w", newline="\n") as f:
+        f.write(f"{MAGIC} {VERSION}\nsize {n}\ngoals {goals}\n")
+        f.write("starts " + " ".join(f"{k}={p[0]},{p[1]}" for k, p in starts.items()) + "\n")
+        f.write("legend " + " ".join(f"{ch}={k}:{t}" for ch, (k, t) in legend.items()) + "\n")
+        f.write("grid\n")
+        f.write(cells.tobytes().decode("ascii"))
+
+def save_level(board, blue, red, path):
+    save_board(board, path, {'blue': blue.pos, 'red': red.pos})
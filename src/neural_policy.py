@@ -0,0 +1,356 @@
+# neural_policy.py
+# A small numpy MLP as an alternative decision function (neural_decision has
+# the same signature as ai_decision / ai_vs_ai_decision).
+#
+# Input: the (2*VIEW+1)^2 cells around the robot as one plane per feature
+# (walls incl. off-board, each resource type, traps, the opponent) plus a few
+# squashed scalars (health, offsets to goal and opponent, cooldown, shield).
+# The planes are float32 arrays padded by VIEW, kept current from Board
+# listeners, so encoding a robot is one slice copy per plane. Output: logits
+# over ACTIONS; illegal actions are masked and the best one is played.
+#
+# Inference is batched: NeuralPolicy.act takes any number of (robot, opponent,
+# board) triples, encodes them into a preallocated input buffer and runs one
+# matmul per layer for the whole batch (play_batch uses this for many games
+# in lockstep). Weights live in a flat float32 file read through np.memmap.
+#
+# The shipped weights are behaviour-cloned from ai_decision at hard level:
+#
+#   python neural_policy.py train [games]   # collect, fit, write WEIGHTS_FILE
+#   python neural_policy.py bench [games]   # cost per decision, batched games
+import json, os, sys, time
+
+import numpy as np
+
+import ai_trace
+from config import RESOURCE_TYPES
+from ai_strategies import ai_decision, ai_vs_ai_decision, ranged_target, get_params
+from line_of_sight import has_los
+from forecast import robot_goal
+
+VIEW = 4
+SIDE = 2*VIEW + 1
+PLANES = ('wall',) + tuple(sorted(RESOURCE_TYPES)) + ('trap', 'opponent')
+N_SCALARS = 10
+INPUTS = len(PLANES)*SIDE*SIDE + N_SCALARS
+ACTIONS = ('stay', (1,0), (-1,0), (0,1), (0,-1), 'melee', 'ranged')
+HIDDEN = (64, 64)
+WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "neural_policy.bin")
+MAGIC = b"NPOL1\n"
+ALIGN = 64
+
+def _sq(d, scale=4.0):
+    """Signed distance squashed to (-1, 1), the same on any board size."""
+    return d/(abs(d) + scale)
+
+# ---------- Board planes ----------
+class Planes:
+    """The board as float32 planes (PLANES minus the opponent), padded by VIEW."""
+    def __init__(self, board):
+        n = self.n = board.size
+        self.a = np.zeros((len(PLANES) - 1, n + 2*VIEW, n + 2*VIEW), dtype=np.float32)
+        self.a[0] = 1.0                                  # off-board counts as wall
+        cells = np.frombuffer("".join("".join(r) for r in board.grid).encode("ascii"), dtype=np.uint8)
+        inner = (slice(VIEW, VIEW + n), slice(VIEW, VIEW + n))
+        self.a[0][inner] = cells.reshape(n, n) == ord("X")
+        self.a[PLANES.index('trap')][inner] = cells.reshape(n, n) == ord("T")
+        for pos, t in board.resources.items():
+            self.a[PLANES.index(t), pos[0] + VIEW, pos[1] + VIEW] = 1.0
+
+    def window(self, pos):
+        x, y = pos
+        return self.a[:, x:x + SIDE, y:y + SIDE]
+
+    def on_board_change(self, kind, pos):
+        x, y = pos[0] + VIEW, pos[1] + VIEW
+        if kind == 'obstacle_added':
+            self.a[:, x, y] = 0.0
+            self.a[0, x, y] = 1.0
+        elif kind == 'obstacle_removed':
+            self.a[0, x, y] = 0.0
+        elif kind == 'resource_removed':
+            self.a[1:PLANES.index('trap'), x, y] = 0.0
+        elif kind == 'trap_removed':
+            self.a[PLANES.index('trap'), x, y] = 0.0
+
+def attach_planes(board):
+    """Keep board.planes (Planes) current with the board."""
+    board.planes = Planes(board)
+    board.add_listener(board.planes.on_board_change)
+    return board.planes
+
+def encode(row, robot, opponent, board):
+    """Write the features of robot (vs opponent) into row, a float32 vector of INPUTS."""
+    planes = getattr(board, 'planes', None) or attach_planes(board)
+    k = len(PLANES) - 1
+    cut = k*SIDE*SIDE
+    row[:cut] = planes.window(robot.pos).reshape(-1)
+    opp = row[cut:cut + SIDE*SIDE]
+    opp[:] = 0.0
+    dx, dy = opponent.pos[0] - robot.pos[0], opponent.pos[1] - robot.pos[1]
+    if abs(dx) <= VIEW and abs(dy) <= VIEW:
+        opp[(dx + VIEW)*SIDE + dy + VIEW] = 1.0
+    gx, gy = robot_goal(robot, board)
+    gx, gy = gx - robot.pos[0], gy - robot.pos[1]
+    row[cut + SIDE*SIDE:] = (
+        robot.health/100, opponent.health/100,
+        _sq(gx), _sq(gy), _sq(abs(gx) + abs(gy), 8.0),
+        _sq(dx), _sq(dy), _sq(abs(dx) + abs(dy), 8.0),
+        getattr(robot, 'ranged_cooldown', 0)/3, float(robot.has_buff("shield")),
+    )
+
+def legal(robot, opponent, board):
+    """Bool per ACTIONS entry."""
+    n = board.size
+    shield = robot.has_buff("shield")
+    out = [True]
+    for dx, dy in ACTIONS[1:5]:
+        x, y = robot.pos[0] + dx, robot.pos[1] + dy
+        out.append(0 <= x < n and 0 <= y < n and (shield or board.grid[x][y] != "X"))
+    dist = robot.distance(opponent)
+    out.append(dist <= 2)
+    out.append(dist > 2 and getattr(robot, 'ranged_cooldown', 0) == 0 and has_los(board, robot.pos, opponent.pos))
+    return out
+
+# ---------- Weights file ----------
+# MAGIC, one JSON header line, zero padding to ALIGN, then float32 W0, b0, W1, b1, ...
+def save_weights(layers, path=WEIGHTS_FILE, meta=None):
+    header = dict(meta or {}, view=VIEW, planes=list(PLANES), actions=[str(a) for a in ACTIONS],
+                  scalars=N_SCALARS, shapes=[list(W.shape) for W, _ in layers])
+    head = MAGIC + json.dumps(header).encode() + b"\n"
+    pad = -len(head) % ALIGN
+    with open(path, "wb") as f:
+        f.write(head + b"\0"*pad)
+        for W, b in layers:
+            f.write(np.ascontiguousarray(W, dtype=np.float32).tobytes())
+            f.write(np.ascontiguousarray(b, dtype=np.float32).tobytes())
+
+def load_weights(path=WEIGHTS_FILE):
+    """[(W, b)] as read-only views of one np.memmap of the file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a neural policy weights file")
+        line = f.readline()
+    header = json.loads(line)
+    if header['planes'] != list(PLANES) or header['actions'] != [str(a) for a in ACTIONS] \
+            or header['view'] != VIEW or header['scalars'] != N_SCALARS:
+        raise ValueError("weights were trained for different inputs; retrain (python neural_policy.py train)")
+    off = len(MAGIC) + len(line)
+    off += -off % ALIGN
+    flat = np.memmap(path, dtype=np.float32, mode='r', offset=off)
+    layers, i = [], 0
+    for n_in, n_out in header['shapes']:
+        W = flat[i:i + n_in*n_out].reshape(n_in, n_out); i += n_in*n_out
+        b = flat[i:i + n_out]; i += n_out
+        layers.append((W, b))
+    if i != len(flat):
+        raise ValueError("weights file size does not match its header")
+    return layers
+
+# ---------- Batched inference ----------
+class NeuralPolicy:
+    def __init__(self, layers, capacity=16):
+        self.layers = layers
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros((capacity, INPUTS), dtype=np.float32)
+        self.h = [np.empty((capacity, W.shape[1]), dtype=np.float32) for W, _ in self.layers]
+        self.mask = np.zeros((capacity, len(ACTIONS)), dtype=bool)
+
+    def forward(self, k):
+        """Logits for the first k rows of the input buffer."""
+        a = self.x[:k]
+        last = len(self.layers) - 1
+        for i, (W, b) in enumerate(self.layers):
+            out = self.h[i][:k]
+            np.matmul(a, W, out=out)
+            out += b
+            if i < last:
+                np.maximum(out, 0.0, out=out)
+            a = out
+        return a
+
+    def act(self, items):
+        """Best legal action (an ACTIONS entry) for each (robot, opponent, board)."""
+        k = len(items)
+        if k > self.capacity:
+            self._alloc(max(k, 2*self.capacity))
+        for i, (robot, opponent, board) in enumerate(items):
+            encode(self.x[i], robot, opponent, board)
+            self.mask[i] = legal(robot, opponent, board)
+        logits = np.where(self.mask[:k], self.forward(k), -np.inf)
+        return [ACTIONS[j] for j in np.argmax(logits, axis=1)]
+
+_policy = None
+
+def get_policy():
+    """The shared policy, weights memory-mapped from WEIGHTS_FILE on first use."""
+    global _policy
+    if _policy is None:
+        _policy = NeuralPolicy(load_weights())
+    return _policy
+
+def apply_action(ai, opponent, board, action, level):
+    if action == 'melee':
+        ai.attack(opponent)
+    elif action == 'ranged':
+        target = ranged_target(ai, opponent, board, level) if level == 'hard' else opponent.pos
+        ai.pending_ranged = {'target_pos': target, 'turns': 1}
+        ai.ranged_cooldown = get_params(ai, level)['hard_ranged_cooldown']
+        return
+    elif action != 'stay':
+        ai.move(action[0], action[1], board)
+    if getattr(ai, 'ranged_cooldown', 0) > 0:
+        ai.ranged_cooldown -= 1
+
+@ai_trace.traced
+def neural_decision(ai, opponent, board, level='hard'):
+    """Decision function driven by the MLP (same signature as ai_decision)."""
+    if getattr(ai, 'stunned_turns', 0):
+        ai.stunned_turns -= 1
+        ai_trace.branch('stunned')
+        return
+    action = get_policy().act([(ai, opponent, board)])[0]
+    ai_trace.branch('neural', action=str(action))
+    apply_action(ai, opponent, board, action, level)
+
+# ---------- Many games at once ----------
+def play_batch(seeds, level='hard', opponent=ai_vs_ai_decision, red_personality='Balanced', policy=None):
+    """Play one game per seed, neural (red) vs opponent (blue), in lockstep:
+    every red turn is one batched forward pass over all running games.
+    Boards match play_match's for the same seeds; the games themselves share
+    one random stream. Returns the winners ('blue' / 'red' / 'draw')."""
+    import random
+    from projectiles import ProjectileSystem
+    from scheduler import seconds_to_ticks
+    from simulation import setup_level, get_ai_interval, apply_turn_effects, match_winner
+    policy = policy or get_policy()
+    games = []
+    for seed in seeds:
+        random.seed(seed)
+        board, blue, red = setup_level(level, red_personality=red_personality)
+        games.append([board, blue, red, ProjectileSystem(), None])
+    ticks = seconds_to_ticks(get_ai_interval(level))
+    turn = 0
+    while any(g[4] is None for g in games):
+        live = [g for g in games if g[4] is None]
+        side = turn % 2
+        for g in live:
+            g[1 + side].last_pos = g[1 + side].pos
+        if side == 0:
+            for board, blue, red, _, _ in live:
+                opponent(blue, red, board, level=level)
+        else:
+            acting = [g for g in live if not getattr(g[2], 'stunned_turns', 0)]
+            for g in live:
+                if getattr(g[2], 'stunned_turns', 0):
+                    g[2].stunned_turns -= 1
+            for g, action in zip(acting, policy.act([(g[2], g[1], g[0]) for g in acting])):
+                apply_action(g[2], g[1], g[0], action, level)
+        turn += 1
+        for g in live:
+            board, blue, red, projectiles, _ = g
+            apply_turn_effects(g[1 + side], board, level, projectiles, side)
+            projectiles.advance(ticks, [blue, red])
+            g[4] = match_winner(board, blue, red, turn)
+    return [g[4] for g in games]
+
+# ---------- Behaviour cloning ----------
+def collect(games, level='hard', first_seed=0, teacher=ai_decision, opponent=ai_vs_ai_decision):
+    """(X, y): encoded states and teacher action indexes from teacher-played games (red side)."""
+    from simulation import play_match
+    X, y = [], []
+    def record(ai, other, board, level=level):
+        row = np.zeros(INPUTS, dtype=np.float32)
+        encode(row, ai, other, board)
+        pos, health, pending = ai.pos, other.health, getattr(ai, 'pending_ranged', None)
+        teacher(ai, other, board, level=level)
+        if other.health < health:
+            a = 'melee'
+        elif getattr(ai, 'pending_ranged', None) and ai.pending_ranged is not pending:
+            a = 'ranged'
+        elif ai.pos != pos:
+            a = (ai.pos[0] - pos[0], ai.pos[1] - pos[1])
+        else:
+            a = 'stay'
+        if a in ACTIONS:
+            X.append(row)
+            y.append(ACTIONS.index(a))
+    for seed in range(first_seed, first_seed + games):
+        play_match(level, seed=seed, blue_decide=opponent, red_decide=record)
+    return np.array(X), np.array(y)
+
+def train(X, y, hidden=HIDDEN, epochs=30, lr=1e-3, batch=256, seed=0, log=print):
+    """Fit an MLP (ReLU hidden layers, softmax output) with Adam; returns [(W, b)]."""
+    rng = np.random.default_rng(seed)
+    sizes = (X.shape[1],) + tuple(hidden) + (len(ACTIONS),)
+    params = []
+    for n_in, n_out in zip(sizes, sizes[1:]):
+        params += [rng.normal(0, np.sqrt(2/n_in), (n_in, n_out)).astype(np.float32),
+                   np.zeros(n_out, dtype=np.float32)]
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    b1, b2, eps = 0.9, 0.999, 1e-8
+    step = 0
+    for epoch in range(epochs):
+        order = rng.permutation(len(X))
+        loss_sum = 0.0
+        for s in range(0, len(X), batch):
+            idx = order[s:s + batch]
+            xb, yb = X[idx], y[idx]
+            acts = [xb]
+            for i in range(0, len(params), 2):
+                z = acts[-1] @ params[i] + params[i+1]
+                acts.append(np.maximum(z, 0) if i + 2 < len(params) else z)
+            z = acts[-1] - acts[-1].max(axis=1, keepdims=True)
+            p = np.exp(z)
+            p /= p.sum(axis=1, keepdims=True)
+            loss_sum += -np.log(p[np.arange(len(yb)), yb] + 1e-12).sum()
+            d = p
+            d[np.arange(len(yb)), yb] -= 1
+            d /= len(yb)
+            grads = [None]*len(params)
+            for i in range(len(params) - 2, -1, -2):
+                grads[i] = acts[i//2].T @ d
+                grads[i+1] = d.sum(axis=0)
+                if i:
+                    d = (d @ params[i].T)*(acts[i//2] > 0)
+            step += 1
+            for i, g in enumerate(grads):
+                m[i] = b1*m[i] + (1-b1)*g
+                v[i] = b2*v[i] + (1-b2)*g*g
+                params[i] -= (lr*(m[i]/(1-b1**step))/(np.sqrt(v[i]/(1-b2**step)) + eps)).astype(np.float32)
+        if log:
+            log(f"epoch {epoch+1}/{epochs}  loss {loss_sum/len(X):.3f}")
+    return [(params[i], params[i+1]) for i in range(0, len(params), 2)]
+
+def accuracy(layers, X, y):
+    pol = NeuralPolicy(layers, capacity=len(X))
+    pol.x[:len(X)] = X
+    return float((np.argmax(pol.forward(len(X)), axis=1) == y).mean())
+
+if __name__ == "__main__":
+    import robot
+    robot.VERBOSE = False
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "bench"
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else (3000 if cmd == "train" else 200)
+    if cmd == "train":
+        t0 = time.time()
+        X, y = collect(games)
+        print(f"{len(X)} samples from {games} games in {time.time()-t0:.0f}s;",
+              "actions", np.bincount(y, minlength=len(ACTIONS)).tolist())
+        cut = len(X)*9//10
+        layers = train(X[:cut], y[:cut])
+        print(f"held-out accuracy {accuracy(layers, X[cut:], y[cut:]):.3f}")
+        save_weights(layers, meta={'teacher': 'ai_decision', 'level': 'hard', 'games': games})
+        print("->", WEIGHTS_FILE)
+    else:
+        from simulation import play_match
+        for name, decide in (("neural", neural_decision), ("ai_decision", ai_decision)):
+            ms = [play_match('hard', seed=s, red_decide=decide)['red_ms_mean'] for s in range(games)]
+            print(f"{name}: {sum(ms)/len(ms):.3f} ms per decision")
+        t0 = time.time()
+        winners = play_batch(range(games))
+        print(f"play_batch: {games} games in {time.time()-t0:.1f}s, red won {winners.count('red')}")
@@ -0,0 +1,171 @@
+# parallel_search.py
+# Root-parallel hard-mode search.
+#
+# The root actions of _minimax (stay / moves / melee / shoot) are handed to a
+# persistent process pool. Each worker deepens its own subtree (iterative
+# deepening) until the per-move deadline and reports the value per finished
+# depth; the main process picks the best action at the deepest depth every
+# root action finished.
+#
+# The grid lives in a multiprocessing.shared_memory block (one byte per cell),
+# so tasks only carry a few ints. Workers rebuild their grid view only when the
+# block's version changes (a wall added or removed, an item taken). When the
+# board carries a forecast, the view gets its own Forecaster from the same
+# cells, so shoot nodes score the same bonus as in the serial search.
+#
+# Opt-in: set PARALLEL_SEARCH = True (ai_decision checks it in hard mode).
+import atexit, os, time
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import ai_strategies
+from forecast import Forecaster
+
+PARALLEL_SEARCH = False
+SEARCH_WORKERS = os.cpu_count() or 2
+SEARCH_BUDGET = 0.12     # s per move, under the hard AI_TURN_INTERVAL (0.15 s)
+MAX_DEPTH = 20
+BRANCHING = 3            # rough growth per extra ply, to avoid starting a depth we can't finish
+
+_pool = None
+_shm = None
+_shm_board = None        # board currently mirrored into _shm
+_version = 0
+_dirty = True
+
+# ---------- Shared board (main process) ----------
+def _watch(board):
+    """One listener per board (board._shm_watch); it only marks the block
+    stale while board is the one mirrored."""
+    def on_board_change(kind, pos):
+        global _dirty
+        if board is _shm_board and kind in ('obstacle_added', 'obstacle_removed', 'resource_removed', 'trap_removed'):
+            _dirty = True
+    board.add_listener(on_board_change)
+    board._shm_watch = True
+
+def _sync_board(board):
+    """Mirror board cells into shared memory; returns (name, version)."""
+    global _shm, _shm_board, _version, _dirty
+    n = board.size
+    if _shm_board is not board:
+        if _shm is None or _shm.size < n*n:
+            _release()
+            _shm = shared_memory.SharedMemory(create=True, size=n*n)
+        if not getattr(board, '_shm_watch', False):
+            _watch(board)
+        _shm_board = board
+        _dirty = True
+    if _dirty:
+        _shm.buf[:n*n] = "".join("".join(row) for row in board.grid).encode("ascii")
+        _version += 1
+        _dirty = False
+    return _shm.name, _version
+
+def _release():
+    global _shm, _shm_board
+    if _shm is not None:
+        _shm.close()
+        _shm.unlink()
+        _shm = None
+        _shm_board = None
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+    _release()
+
+atexit.register(shutdown)
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=SEARCH_WORKERS)
+    return _pool
+
+# ---------- Worker side ----------
+class _GridView:
+    """Just what _minimax needs from a Board: size and grid[x][y], plus the
+    forecast inputs for _shoot_bonus when the real board has a forecast."""
+    def __init__(self, size, rows):
+        self.size = size
+        self.grid = rows
+        self.forecast = None
+        self.end_player = None
+
+_views = {}   # shm name -> (version, _GridView, SharedMemory)
+
+def _view(name, version, size, goal=None):
+    """Grid view of the shared block; with a goal (the player's end cell) it
+    also carries a Forecaster, like a board with attach_forecast."""
+    hit = _views.get(name)
+    if hit is not None and hit[0] == version:
+        view = hit[1]
+    else:
+        shm = hit[2] if hit is not None else shared_memory.SharedMemory(name=name)
+        flat = bytes(shm.buf[:size*size]).decode("ascii")
+        view = _GridView(size, [flat[i*size:(i+1)*size] for i in range(size)])
+        _views[name] = (version, view, shm)
+    if goal is not None and view.forecast is None:
+        view.forecast = Forecaster(view)
+    view.end_player = goal
+    return view
+
+def _search_root(name, version, size, goal, state, deadline, max_depth):
+    """Deepen one root child until the deadline; {depth: value}."""
+    board = _view(name, version, size, goal)
+    ai_pos, ai_health, pl_pos, pl_health = state
+    out = {}
+    for depth in range(1, max_depth+1):
+        t0 = time.time()
+        val, _ = ai_strategies._minimax(ai_pos, ai_health, pl_pos, pl_health, board,
+                                        depth-1, -10**9, 10**9, False)
+        out[depth] = val
+        if time.time() + (time.time()-t0)*BRANCHING > deadline:
+            break
+    return out
+
+# ---------- Root split (main process) ----------
+def _root_actions(ai_pos, ai_health, player_pos, player_health, board):
+    """Same root moves and child states as _minimax's maximizing branch."""
+    acts = [("stay", ai_pos)]
+    acts += [("move", n) for n in ai_strategies._neighbors(ai_pos, board)]
+    if abs(ai_pos[0]-player_pos[0])+abs(ai_pos[1]-player_pos[1]) <= 2:
+        acts.append(("melee", ai_pos))
+    acts.append(("shoot", ai_pos))
+    out = []
+    for atype, npos in acts:
+        child = (npos if atype == "move" else ai_pos, ai_health, player_pos,
+                 max(0, player_health-10) if atype == "melee" else player_health)
+        bonus = ai_strategies._shoot_bonus(ai_pos, player_pos, board) if atype == "shoot" else 0
+        out.append(((atype, npos), child, bonus))
+    return out
+
+def parallel_minimax(ai_pos, ai_health, player_pos, player_health, board, budget=None, max_depth=MAX_DEPTH):
+    """(value, action, depth) like _minimax's root, searched as deep as the budget allows."""
+    budget = SEARCH_BUDGET if budget is None else budget
+    deadline = time.time() + budget
+    name, version = _sync_board(board)
+    pool = _get_pool()
+    roots = _root_actions(ai_pos, ai_health, player_pos, player_health, board)
+    goal = getattr(board, 'end_player', None) if getattr(board, 'forecast', None) is not None else None
+    futs = [pool.submit(_search_root, name, version, board.size, goal, child, deadline, max_depth)
+            for _, child, _ in roots]
+    done, _ = wait(futs, timeout=max(0.0, deadline - time.time()) + budget*0.25)
+    results = [f.result() if f in done else {} for f in futs]
+    for f in futs:
+        f.cancel()
+    depth = min((max(r) if r else 0) for r in results)
+    if depth == 0:
+        # a worker missed the deadline entirely: fall back to the serial search
+        val, best = ai_strategies._minimax(ai_pos, ai_health, player_pos, player_health, board,
+                                           2, -10**9, 10**9, True)
+        return val, best, 2
+    best, best_action = -10**9, None
+    for (action, child, bonus), r in zip(roots, results):
+        val = r[depth] + bonus
+        if val > best:
+            best, best_action = val, action
+    return best, best_action, depth
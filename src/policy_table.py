@@ -0,0 +1,182 @@
+# policy_table.py
+# Offline value iteration for AI vs AI on a fixed board.
+#
+# State (from the point of view of the robot about to move):
+#   side        0 = blue (goal end_blue), 1 = red (goal end_red)
+#   own, opp    cell index x*size+y
+#   hown, hopp  health bucket, ceil(health/HEALTH_STEP), 0 = dead
+#
+# The game is solved as an alternating zero-sum game (negamax form), so one
+# value table covers both robots. Only the static layout is modelled: walls,
+# goals and melee. Traps/resources are ignored because they disappear during
+# play. The resulting action table is saved as .npy (+ .json sidecar) and is
+# loaded with mmap so a lookup is a single array read.
+#
+#   python policy_table.py OUT.npy [MAP | seed]
+#
+# solves a map file (mapfile.py), or a random board, whose layout is then
+# written next to the table as OUT.map so games can be played on it:
+#   simulation.play_match(..., setup=mapfile.map_setup("OUT.map", policy="OUT.npy"))
+import json, math, os, random, sys
+import numpy as np
+
+from config import GRID_WIDTH
+
+HEALTH_STEP = 15            # Robot.attack damage, one melee hit = one bucket
+MAX_HEALTH = 100
+MELEE_RANGE = 2
+GAMMA = 0.97
+
+# Action ids (moves use the same order as a_star's dirs)
+STAY, MELEE = 0, 5
+MOVES = [(1,0),(-1,0),(0,1),(0,-1)]
+NUM_ACTIONS = 6
+
+def health_bucket(health):
+    return max(0, min(num_buckets()-1, math.ceil(health/HEALTH_STEP)))
+
+def num_buckets():
+    return math.ceil(MAX_HEALTH/HEALTH_STEP) + 1
+
+def board_goals(board):
+    return [board.end_blue, board.end_red]
+
+# ---------- Solver ----------
+def _move_tables(board):
+    """nxt[a][p] = cell reached from p with action a (blocked moves stay put)."""
+    n = board.size
+    N = n*n
+    nxt = np.tile(np.arange(N), (5, 1))
+    for p in range(N):
+        x, y = divmod(p, n)
+        for a, (dx, dy) in enumerate(MOVES, start=1):
+            nx, ny = x+dx, y+dy
+            if 0 <= nx < n and 0 <= ny < n and board.grid[nx][ny] != "X":
+                nxt[a][p] = nx*n + ny
+    return nxt
+
+def solve_policy(board, gamma=GAMMA, max_iters=200, tol=1e-4):
+    """Run vectorized value iteration; returns (actions, values)."""
+    n = board.size
+    N = n*n
+    H = num_buckets()
+    goals = [g[0]*n + g[1] for g in board_goals(board)]
+
+    nxt = _move_tables(board)
+    xs, ys = np.divmod(np.arange(N), n)
+    in_melee = (np.abs(xs[:,None]-xs[None,:]) + np.abs(ys[:,None]-ys[None,:])) <= MELEE_RANGE
+
+    # Terminal masks (mover perspective)
+    shape = (2, N, N, H, H)
+    lost = np.zeros(shape, dtype=bool)
+    won = np.zeros(shape, dtype=bool)
+    lost[:, :, :, 0, :] = True
+    won[:, :, :, 1:, 0] = True
+    for s in range(2):
+        lost[s, :, goals[1-s]] = True        # opponent already on its goal
+        won[s, goals[s]] = True
+    won &= ~lost
+
+    V = np.zeros(shape, dtype=np.float32)
+    Q = np.empty((NUM_ACTIONS,) + shape, dtype=np.float32)
+    melee_ok = np.broadcast_to(in_melee[None, :, :, None, None], shape)
+    for _ in range(max_iters):
+        # Vs[s, own, opp, ho, hp] = V[1-s, opp, own, hp, ho]
+        Vs = V[::-1].transpose(0, 2, 1, 4, 3)
+        for a in range(5):
+            Q[a] = -gamma * Vs[:, nxt[a]]
+            for s in range(2):
+                Q[a, s, nxt[a] == goals[s]] = 1.0
+        Q[MELEE, :, :, :, :, 0] = -np.inf
+        Q[MELEE, :, :, :, :, 1] = 1.0
+        Q[MELEE, :, :, :, :, 2:] = -gamma * Vs[:, :, :, :, 1:-1]
+        Q[MELEE][~melee_ok] = -np.inf
+
+        newV = Q.max(axis=0)
+        newV[won] = 1.0
+        newV[lost] = -1.0
+        delta = float(np.abs(newV - V).max())
+        V = newV
+        if delta < tol:
+            break
+    actions = Q.argmax(axis=0).astype(np.int8)
+    return actions, V
+
+# ---------- Save / load ----------
+def save_policy(path, board, actions):
+    np.save(path, actions)
+    meta = {
+        'size': board.size,
+        'health_step': HEALTH_STEP,
+        'goals': [list(g) for g in board_goals(board)],
+        'obstacles': sorted([list(o) for o in board.obstacles]),
+    }
+    with open(_meta_path(path), 'w') as f:
+        json.dump(meta, f)
+
+def _meta_path(path):
+    return path[:-4] + '.json' if path.endswith('.npy') else path + '.json'
+
+class PolicyTable:
+    def __init__(self, actions, size, goals, obstacles):
+        self.actions = actions
+        self.size = size
+        self.goals = [tuple(g) for g in goals]
+        self.obstacles = {tuple(o) for o in obstacles}
+
+    @classmethod
+    def load(cls, path):
+        if not path.endswith('.npy'):
+            path += '.npy'
+        actions = np.load(path, mmap_mode='r')
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+        return cls(actions, meta['size'], meta['goals'], meta['obstacles'])
+
+    def lookup(self, ai, opponent, board):
+        """Action for ai: 'stay', 'melee', or (dx,dy). None if the table does not apply."""
+        if board.size != self.size or board.obstacles != self.obstacles:
+            return None  # layout changed (shield break / medium blocking)
+        goal = getattr(ai, 'goal', None)
+        if goal not in self.goals:
+            return None
+        side = self.goals.index(goal)
+        n = self.size
+        a = int(self.actions[side,
+                             ai.pos[0]*n + ai.pos[1],
+                             opponent.pos[0]*n + opponent.pos[1],
+                             health_bucket(ai.health),
+                             health_bucket(opponent.health)])
+        if a == STAY: return 'stay'
+        if a == MELEE: return 'melee'
+        return MOVES[a-1]
+
+def attach_policy(board, path):
+    """Load a solved table and let ai_vs_ai_decision use it on this board
+    (simulation.prepare_board(..., policy=path) does this)."""
+    board.policy = PolicyTable.load(path)
+    return board.policy
+
+def layout_path(path):
+    """Map file saved next to a table: OUT.npy -> OUT.map."""
+    return (path[:-4] if path.endswith('.npy') else path) + '.map'
+
+# ---------- CLI ----------
+if __name__ == "__main__":
+    from board import Board
+    import mapfile
+    if len(sys.argv) < 2:
+        print("usage: python policy_table.py OUT.npy [MAP | seed]")
+        sys.exit(1)
+    out = sys.argv[1]
+    src = sys.argv[2] if len(sys.argv) > 2 else None
+    if src is not None and os.path.exists(src):
+        b, starts = mapfile.load_board(src)
+    else:
+        if src is not None:
+            random.seed(int(src))
+        b, starts = Board(GRID_WIDTH), None
+    actions, _ = solve_policy(b)
+    save_policy(out, b, actions)
+    mapfile.save_board(b, layout_path(out), starts)
+    print(f"Saved policy for {b.size}x{b.size} board to {out} (layout: {layout_path(out)})")
@@ -0,0 +1,99 @@
+# projectiles.py
+# Array-backed ranged projectiles measured in simulation ticks.
+#
+# Each projectile flies from a source cell to a target cell in a fixed number
+# of ticks and resolves against whatever robot stands on the target cell when
+# it lands. Logic never looks at pixels or frame time, so results are the same
+# at any FPS (and headless); the renderer only asks for interpolated positions.
+import numpy as np
+from config import TICK_RATE
+
+ARROW_FLIGHT_TICKS = round(0.4*TICK_RATE)  # same as the old ARROW_SPEED=2.5
+ARROW_DAMAGE = 20
+
+class ProjectileSystem:
+    def __init__(self, capacity=64):
+        self._alloc(capacity)
+        self.count = 0        # high-water mark of used slots
+
+    def _alloc(self, capacity):
+        self.src = np.zeros((capacity, 2), dtype=np.int32)
+        self.dst = np.zeros((capacity, 2), dtype=np.int32)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.flight = np.ones(capacity, dtype=np.int32)
+        self.damage = np.zeros(capacity, dtype=np.int16)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        old = (self.src, self.dst, self.age, self.flight, self.damage, self.owner, self.active)
+        self._alloc(len(self.active)*2)
+        for new, arr in zip((self.src, self.dst, self.age, self.flight, self.damage, self.owner, self.active), old):
+            new[:len(arr)] = arr
+
+    def clear(self):
+        self.active[:] = False
+        self.count = 0
+
+    def __len__(self):
+        return int(self.active[:self.count].sum())
+
+    def spawn(self, src, dst, owner, damage=ARROW_DAMAGE, flight_ticks=ARROW_FLIGHT_TICKS, elapsed=0):
+        """Fire from cell src to cell dst. owner is an index into the robots list."""
+        free = np.flatnonzero(~self.active[:self.count])
+        if len(free):
+            i = int(free[0])
+        else:
+            if self.count == len(self.active):
+                self._grow()
+            i = self.count
+            self.count += 1
+        self.src[i] = src
+        self.dst[i] = dst
+        self.age[i] = elapsed
+        self.flight[i] = max(1, flight_ticks)
+        self.damage[i] = damage
+        self.owner[i] = owner
+        self.active[i] = True
+        return i
+
+    def advance(self, ticks, robots):
+        """Step all projectiles by `ticks` and apply damage on landing.
+
+        robots: list indexed by owner id. Returns [(owner, target_robot, damage)].
+        """
+        if ticks <= 0 or self.count == 0:
+            return []
+        n = self.count
+        act = self.active[:n]
+        self.age[:n][act] += ticks
+        landed = np.flatnonzero(act & (self.age[:n] >= self.flight[:n]))
+        if not len(landed):
+            return []
+
+        # grid lookup: cell -> robots standing there
+        occupied = {}
+        for idx, r in enumerate(robots):
+            occupied.setdefault(r.pos, []).append(idx)
+
+        hits = []
+        for i in landed:
+            self.active[i] = False
+            owner = int(self.owner[i])
+            for idx in occupied.get((int(self.dst[i][0]), int(self.dst[i][1])), ()):
+                if idx == owner:
+                    continue
+                target = robots[idx]
+                target.health -= int(self.damage[i])
+                hits.append((owner, target, int(self.damage[i])))
+        while self.count and not self.active[self.count-1]:
+            self.count -= 1
+        return hits
+
+    def visible(self, alpha=0.0):
+        """Yield (src, dst, t, owner) for drawing; alpha is the fraction of the next tick."""
+        n = self.count
+        idx = np.flatnonzero(self.active[:n])
+        t = np.minimum(1.0, (self.age[idx] + alpha) / self.flight[idx])
+        for k, i in enumerate(idx):
+            yield (tuple(self.src[i]), tuple(self.dst[i]), float(t[k]), int(self.owner[i]))
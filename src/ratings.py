@@ -0,0 +1,287 @@
+# ratings.py
+# Elo ratings and early-stopping A/B tests for strategy variants, on top of
+# headless AI vs AI play (simulation.play_match).
+#
+# A player is a decision function, or (decision function, params) to play a
+# parameter vector (see ai_strategies.get_params). Games are played in pairs:
+# same seed, level and personalities, sides swapped, which removes most of the
+# board/side luck from a comparison.
+#
+#   sprt(new, old)       stop as soon as "new is >= elo1 better" or "new is
+#                        not better than elo0" is decided (GSPRT on the
+#                        trinomial win/draw/loss score)
+#   tournament(players)  Elo with confidence intervals for any number of
+#                        variants; each batch goes to the pairs whose
+#                        ratings are least certain and closest
+#
+#   python ratings.py [max_games]   # ai_vs_ai_decision vs ai_decision
+import math, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import robot
+from ai_strategies import ai_vs_ai_decision, ai_decision
+from simulation import play_match, setup_level, LEVELS, PERSONALITIES
+
+ELO_K = 400/math.log(10)     # Elo points per logistic unit
+Z95 = 1.96
+BATCH = 24                   # games between SPRT checks / pairing decisions
+PSEUDO = 0.5                 # added to each of W/D/L in the LLR, so one-sided results still decide
+
+# ---------- Elo math ----------
+def expected_score(elo):
+    return 1/(1 + 10**(-elo/400))
+
+def elo_from_score(score):
+    score = min(1-1e-6, max(1e-6, score))
+    return -400*math.log10(1/score - 1)
+
+def score_stats(wins, draws, losses):
+    """(mean score, variance of one game's score)."""
+    n = wins + draws + losses
+    if not n:
+        return 0.5, 0.25
+    mean = (wins + 0.5*draws)/n
+    var = (wins*(1-mean)**2 + draws*(0.5-mean)**2 + losses*mean**2)/n
+    return mean, var
+
+def elo_interval(wins, draws, losses, z=Z95):
+    """(elo, low, high) of the first side from a W/D/L count."""
+    n = wins + draws + losses
+    mean, var = score_stats(wins, draws, losses)
+    se = math.sqrt(var/n) if n else 0.5
+    return elo_from_score(mean), elo_from_score(mean - z*se), elo_from_score(mean + z*se)
+
+# ---------- SPRT ----------
+def llr(wins, draws, losses, elo0, elo1):
+    """Log-likelihood ratio of H1 (elo1) vs H0 (elo0), normal approximation
+    of the trinomial score (as used by engine testing frameworks). The
+    counts are regularised with PSEUDO games each, so all wins or all losses
+    give a finite variance instead of no evidence at all."""
+    n = wins + draws + losses
+    if not n:
+        return 0.0
+    mean, var = score_stats(wins + PSEUDO, draws + PSEUDO, losses + PSEUDO)
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return n*(s1 - s0)*(2*mean - s0 - s1)/(2*var)
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+    return math.log(beta/(1-alpha)), math.log((1-beta)/alpha)
+
+# ---------- Playing games ----------
+def _quiet():
+    robot.VERBOSE = False
+
+def _unpack(player):
+    return player if isinstance(player, tuple) else (player, None)
+
+def _setup(level, blue_params, red_params, bp, rp):
+    board, blue, red = setup_level(level, bp, rp)
+    if blue_params is not None: blue.params = blue_params
+    if red_params is not None: red.params = red_params
+    return board, blue, red
+
+def play_game(a, b, level, seed, a_side, bp, rp):
+    """Score of player a (1 win, 0.5 draw, 0 loss) in one match; a_side 0 = blue."""
+    (fa, pa), (fb, pb) = _unpack(a), _unpack(b)
+    blue, red = ((fa, pa), (fb, pb)) if a_side == 0 else ((fb, pb), (fa, pa))
+    rec = play_match(level, seed=seed, blue_decide=blue[0], red_decide=red[0],
+                     setup=partial(_setup, blue_params=blue[1], red_params=red[1], bp=bp, rp=rp))
+    if rec['winner'] == 'draw':
+        return 0.5
+    return 1.0 if rec['winner'] == ('blue', 'red')[a_side] else 0.0
+
+def _play(job):
+    return play_game(*job)
+
+class Schedule:
+    """Game conditions cycling levels x personality pairs; each seed is played
+    twice with the sides swapped."""
+    def __init__(self, levels=LEVELS, personalities=PERSONALITIES, first_seed=0):
+        self.conds = [(lv, bp, rp) for lv in levels for bp in personalities for rp in personalities]
+        self.i = 0
+        self.first_seed = first_seed
+
+    def take(self, n):
+        out = []
+        while len(out) < n:
+            k = self.i // 2
+            lv, bp, rp = self.conds[k % len(self.conds)]
+            out.append((lv, self.first_seed + k, self.i % 2, bp, rp))
+            self.i += 1
+        return out
+
+class _Runner:
+    """Plays job lists in-process or on a pool."""
+    def __init__(self, workers):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_quiet)
+        else:
+            _quiet()
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def run(self, jobs):
+        if self.pool is None:
+            return [_play(j) for j in jobs]
+        return list(self.pool.map(_play, jobs, chunksize=max(1, len(jobs)//(4*self.workers))))
+
+# ---------- Results ----------
+class Results:
+    """Per-game scores with their conditions, for overall and broken-down Elo."""
+    def __init__(self):
+        self.games = []     # (a, b, score of a, level, blue personality, red personality)
+
+    def add(self, a, b, score, level, bp, rp):
+        self.games.append((a, b, score, level, bp, rp))
+
+    def wdl(self, a, b, where=None):
+        """(wins, draws, losses) of a against b, optionally filtered by where(game)."""
+        w = d = l = 0
+        for g in self.games:
+            if where is not None and not where(g):
+                continue
+            if (g[0], g[1]) == (a, b):
+                s = g[2]
+            elif (g[0], g[1]) == (b, a):
+                s = 1 - g[2]
+            else:
+                continue
+            if s == 1: w += 1
+            elif s == 0: l += 1
+            else: d += 1
+        return w, d, l
+
+    def breakdown(self, a, b, by='level'):
+        """{level or personality: (elo, low, high, games)} of a vs b."""
+        col = {'level': 3, 'blue': 4, 'red': 5}[by]
+        out = {}
+        for key in sorted({g[col] for g in self.games}):
+            w, d, l = self.wdl(a, b, lambda g: g[col] == key)
+            if w + d + l:
+                out[key] = elo_interval(w, d, l) + (w + d + l,)
+        return out
+
+    def ratings(self, anchor=None, iters=200):
+        """{player: (elo, ci95 half-width, games)} by Bradley-Terry maximum
+        likelihood (draws count half); anchor (default: first player) is 0."""
+        players = []
+        for g in self.games:
+            for p in g[:2]:
+                if p not in players: players.append(p)
+        if not players:
+            return {}
+        score = {p: 0.0 for p in players}
+        n = {}
+        for a, b, s, *_ in self.games:
+            score[a] += s; score[b] += 1 - s
+            n[(a, b)] = n.get((a, b), 0) + 1
+            n[(b, a)] = n.get((b, a), 0) + 1
+        strength = {p: 1.0 for p in players}
+        for _ in range(iters):   # MM updates (Hunter 2004)
+            new = {}
+            for p in players:
+                den = sum(c/(strength[p] + strength[q]) for (pp, q), c in n.items() if pp == p)
+                new[p] = max(score[p], 0.5)/den if den else 1.0
+            strength = new
+        anchor = anchor or players[0]
+        base = math.log(strength[anchor])
+        out = {}
+        for p in players:
+            r = math.log(strength[p]) - base
+            info = 0.0
+            for (pp, q), c in n.items():
+                if pp == p:
+                    e = 1/(1 + strength[q]/strength[p])
+                    info += c*e*(1-e)
+            half = Z95*ELO_K/math.sqrt(info) if info else float('inf')
+            out[p] = (r*ELO_K, 0.0 if p == anchor else half, sum(c for (pp, _), c in n.items() if pp == p))
+        return out
+
+# ---------- SPRT A/B test ----------
+def sprt(new, old, elo0=0.0, elo1=10.0, alpha=0.05, beta=0.05, max_games=20000,
+         levels=LEVELS, workers=None, batch=BATCH, first_seed=0, log=print):
+    """Play new vs old until the GSPRT decides. Returns a dict with 'result'
+    ('H1': new is better by ~elo1, 'H0': not better than elo0, or
+    'inconclusive' at max_games), the games, LLR, Elo interval and results."""
+    lo, hi = sprt_bounds(alpha, beta)
+    sched = Schedule(levels, first_seed=first_seed)
+    res = Results()
+    verdict, value = 'inconclusive', 0.0
+    with _Runner(workers) as runner:
+        while len(res.games) < max_games:
+            jobs = sched.take(min(batch + batch % 2, max_games - len(res.games)))
+            for (lv, seed, side, bp, rp), s in zip(jobs, runner.run([(new, old) + j for j in jobs])):
+                res.add('new', 'old', s, lv, bp, rp)
+            w, d, l = res.wdl('new', 'old')
+            value = llr(w, d, l, elo0, elo1)
+            if log:
+                elo, elo_lo, elo_hi = elo_interval(w, d, l)
+                log(f"{w+d+l} games  W{w} D{d} L{l}  elo {elo:+.1f} [{elo_lo:+.1f}, {elo_hi:+.1f}]  "
+                    f"LLR {value:.2f} ({lo:.2f}, {hi:.2f})")
+            if value >= hi:
+                verdict = 'H1'; break
+            if value <= lo:
+                verdict = 'H0'; break
+    w, d, l = res.wdl('new', 'old')
+    return {'result': verdict, 'games': w+d+l, 'wdl': (w, d, l), 'llr': value,
+            'bounds': (lo, hi), 'elo': elo_interval(w, d, l), 'results': res}
+
+# ---------- Tournament with adaptive pairing ----------
+def _pick_pair(names, res, ratings):
+    """Pair whose result is most informative: uncertain ratings, close strength,
+    few games so far (unplayed pairs first)."""
+    best, best_v = None, -1.0
+    for i, a in enumerate(names):
+        for b in names[i+1:]:
+            w, d, l = res.wdl(a, b)
+            n = w + d + l
+            if n == 0:
+                return a, b
+            ra, ca, _ = ratings.get(a, (0.0, 400.0, 0))
+            rb, cb, _ = ratings.get(b, (0.0, 400.0, 0))
+            e = expected_score(ra - rb)
+            v = e*(1-e)*(min(ca, 400.0) + min(cb, 400.0))/math.sqrt(n)
+            if v > best_v:
+                best, best_v = (a, b), v
+    return best
+
+def tournament(players, games=600, levels=LEVELS, workers=None, batch=BATCH,
+               target_ci=None, first_seed=0, log=print):
+    """Rate players ({name: decide or (decide, params)}). Each batch goes to
+    the most informative pair; stops after `games` or once every CI half-width
+    is below target_ci. Returns (ratings, Results)."""
+    names = list(players)
+    res = Results()
+    scheds = {}
+    ratings = {}
+    with _Runner(workers) as runner:
+        while len(res.games) < games:
+            a, b = _pick_pair(names, res, ratings)
+            sched = scheds.setdefault((a, b), Schedule(levels, first_seed=first_seed))
+            jobs = sched.take(batch + batch % 2)
+            for (lv, seed, side, bp, rp), s in zip(jobs, runner.run([(players[a], players[b]) + j for j in jobs])):
+                res.add(a, b, s, lv, bp, rp)
+            ratings = res.ratings(anchor=names[0])
+            if log:
+                log(f"{len(res.games)} games, last {a} vs {b}: " +
+                    ", ".join(f"{p} {r:+.0f}±{c:.0f}" for p, (r, c, _) in ratings.items()))
+            if target_ci and len(ratings) == len(names) and \
+                    all(c <= target_ci for p, (_, c, _) in ratings.items() if p != names[0]):
+                break
+    return ratings, res
+
+if __name__ == "__main__":
+    max_games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    t0 = time.time()
+    out = sprt(ai_vs_ai_decision, ai_decision, max_games=max_games)
+    print(f"{out['result']} after {out['games']} games in {time.time()-t0:.0f}s")
+    for lv, (elo, lo, hi, n) in out['results'].breakdown('new', 'old').items():
+        print(f"  {lv}: {elo:+.0f} [{lo:+.0f}, {hi:+.0f}] over {n} games")
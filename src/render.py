@@ -0,0 +1,101 @@
+# render.py
+# Board and HUD drawing, shared by the game (main.py) and the offline replay
+# renderer (replay.py). Everything a frame needs is passed in; the only state
+# here is the font cache.
+import pygame
+from utils import get_image, get_atlas
+
+ARROW_COLORS = {0: (60,140,255), 1: (255,90,90)}
+CELL_SPRITE = {"X": "obstacle", "T": "trap"}
+HUD_HEIGHT = 140
+
+_fonts = {}
+def get_font(size):
+    f = _fonts.get(size)
+    if f is None:
+        f = _fonts[size] = pygame.font.SysFont(None, size)
+    return f
+
+def resource_sprite(r_type):
+    if r_type in ('health','heart'): return "heart"
+    if r_type in ('coin','gold','score'): return "coin"
+    return "bonus"  # other bonuses, e.g. speed/shield
+
+def draw_health_bar(screen, px, py, health, color, cell_size):
+    bw = cell_size
+    bh = 6
+    x = int(px); y = int(py + cell_size - 8)
+    pygame.draw.rect(screen, (0,0,0), (x, y, bw, bh), border_radius=3)
+    hw = int(bw * max(0, min(1, health/100)))
+    pygame.draw.rect(screen, color, (x, y, hw, bh), border_radius=3)
+
+def draw_board(screen, board, camera, cell_size, blue, red, blue_px, red_px, arrows=(), recent_block=None):
+    """Background, visible cells, both robots at world pixels blue_px/red_px
+    (camera already placed), health bars and arrows.
+    arrows: (src, dst, t, owner) as yielded by ProjectileSystem.visible()."""
+    # Background (no grid look)
+    bg = get_image("background")
+    screen.blit(bg, (0,0))
+    ox, oy = camera.x, camera.y
+
+    # Recent blocked highlight
+    if recent_block and recent_block[1] > 0:
+        (rbx,rby),_ = recent_block
+        rx,ry = rby*cell_size - ox, rbx*cell_size - oy
+        s = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+        s.fill((120,120,200,80))
+        screen.blit(s, (rx, ry))
+
+    # World elements (visible cells only), all from one atlas in a single blits() call
+    atlas, rects = get_atlas(cell_size)
+    batch = []
+    r0, r1, c0, c1 = camera.visible_cells()
+    for i in range(r0, r1):
+        row = board.grid[i]
+        py = i*cell_size - oy
+        for j in range(c0, c1):
+            cell = row[j]
+            if cell == ".": continue
+            key = CELL_SPRITE.get(cell) or resource_sprite(board.resources.get((i,j)))
+            batch.append((atlas, (j*cell_size - ox, py), rects[key]))
+
+    # Entities
+    ppx, ppy = blue_px[0] - ox, blue_px[1] - oy
+    apx, apy = red_px[0] - ox, red_px[1] - oy
+    batch.append((atlas, (int(ppx), int(ppy)), rects["robot_blue"]))
+    batch.append((atlas, (int(apx), int(apy)), rects["robot_red"]))
+    screen.blits(batch, doreturn=False)
+
+    # Health bars (thin)
+    draw_health_bar(screen, ppx, ppy, blue.health, (80,200,80), cell_size)
+    draw_health_bar(screen, apx, apy, red.health, (200,80,80), cell_size)
+
+    # Animated arrows (hard)
+    half = cell_size//2
+    for src, dst, t, owner in arrows:
+        sx,sy = src[1]*cell_size+half - ox, src[0]*cell_size+half - oy
+        ex,ey = dst[1]*cell_size+half - ox, dst[0]*cell_size+half - oy
+        cx = sx + (ex - sx)*t; cy = sy + (ey - sy)*t
+        col = ARROW_COLORS[owner]
+        pygame.draw.line(screen, col, (sx,sy), (cx,cy), 3)
+        pygame.draw.circle(screen, col, (int(cx),int(cy)), 4)
+
+def draw_stats(screen, blue, red, blue_score, red_score, view_h, hud_height=HUD_HEIGHT, hint="ESC: Menu"):
+    """HUD bar under the board; scores are the (smoothed) values to show."""
+    screen_w = screen.get_width()
+    pygame.draw.rect(screen, (16,18,24), (0, view_h, screen_w, hud_height))
+    pygame.draw.line(screen, (40,48,60), (0, view_h), (screen_w, view_h), 2)
+
+    base_y = view_h
+    left_x = 12
+    font, small_font = get_font(24), get_font(18)
+
+    blue_text = font.render(f"Blue: {blue.health}   Score: {int(blue_score)}", True, (120,170,255))
+    red_text  = font.render(f"Red : {red.health}   Score: {int(red_score)}", True, (255,120,120))
+    screen.blit(blue_text, (left_x, base_y+12))
+    screen.blit(red_text,  (left_x, base_y+40))
+
+    # Add ESC hint inside HUD bar
+    esc_surface = small_font.render(hint, True, (160,170,190))
+    right_x = screen_w - 12
+    screen.blit(esc_surface, (right_x - esc_surface.get_width(), base_y+12))
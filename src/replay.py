@@ -0,0 +1,213 @@
+# replay.py
+# Record headless matches and render them offline to PNG frame sequences.
+#
+# A Recording is the game state (snapshot.GameSnapshot) after every turn plus
+# the tick spacing of the level. Frames are one per simulation tick, exactly
+# what the live game shows at TICK_RATE: robots glide toward their cells with
+# main.py's approach(), arrows fly tick by tick and resolve on the robots.
+#
+# Rendering is split into contiguous turn ranges over a process pool. Each
+# worker starts from the snapshot of its first turn (the keyframe) and first
+# fast-forwards the few bits of per-frame render state (robot pixel
+# positions, smoothed scores, wall highlight) from the lightweight per-turn
+# track, so every chunk produces the same pixels it would in one long run.
+# Ambient particles are random decoration and are left out.
+#
+#   python replay.py out_dir [level] [seed] [workers]
+import os, struct, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from snapshot import GameSnapshot
+from simulation import play_match, get_ai_interval
+from scheduler import seconds_to_ticks
+from projectiles import ProjectileSystem, ARROW_FLIGHT_TICKS
+from config import TICK_RATE, VIEW_COLS, VIEW_ROWS
+
+MAGIC = b"RRR1"
+CELL_SIZE = 64
+MOVE_CELLS_PER_SEC = 6       # main.py: MOVE_SPEED = CELL_SIZE*6 px/s
+BLOCK_FADE_TICKS = 50        # main.py: recent_block=((x,y),50)
+TAIL_TICKS = ARROW_FLIGHT_TICKS   # frames after the last turn so its arrows land
+
+# ---------- Recording ----------
+class Recording:
+    def __init__(self, level, ticks_per_turn, snapshots, winner=None):
+        self.level = level
+        self.ticks_per_turn = ticks_per_turn
+        self.snapshots = snapshots        # bytes; [0] = start, [k] = after k turns
+        self.winner = winner
+
+    @property
+    def turns(self):
+        return len(self.snapshots) - 1
+
+    @property
+    def frames(self):
+        return (self.turns + 1)*self.ticks_per_turn + TAIL_TICKS
+
+    def track(self):
+        """Per snapshot: (blue_pos, red_pos, blue_score, red_score, new_wall)."""
+        out = []
+        prev = None
+        for raw in self.snapshots:
+            s = GameSnapshot.from_bytes(raw)
+            blue, red = s.robots[0], s.robots[1]
+            wall = None
+            if prev is not None:
+                for x, (a, b) in enumerate(zip(prev, s.rows)):
+                    if a != b:
+                        y = next((y for y in range(len(b)) if b[y] == "X" and a[y] != "X"), None)
+                        if y is not None:
+                            wall = (x, y)
+            out.append((blue.pos, red.pos, blue.score, red.score, wall))
+            prev = s.rows
+        return out
+
+    def save(self, path):
+        level, winner = self.level.encode(), (self.winner or "").encode()
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<HI", self.ticks_per_turn, len(self.snapshots)))
+            for text in (level, winner):
+                f.write(struct.pack("<B", len(text)) + text)
+            for raw in self.snapshots:
+                f.write(struct.pack("<I", len(raw)) + raw)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            buf = f.read()
+        if buf[:4] != MAGIC:
+            raise ValueError("not a replay recording")
+        ticks, n = struct.unpack_from("<HI", buf, 4)
+        off = 10
+        texts = []
+        for _ in range(2):
+            ln = buf[off]
+            texts.append(buf[off+1:off+1+ln].decode())
+            off += 1 + ln
+        snaps = []
+        for _ in range(n):
+            (ln,) = struct.unpack_from("<I", buf, off)
+            snaps.append(buf[off+4:off+4+ln])
+            off += 4 + ln
+        return cls(texts[0], ticks, snaps, texts[1] or None)
+
+def record_match(level='medium', seed=None, **kw):
+    """Play a headless match (simulation.play_match arguments) -> (Recording, result)."""
+    snaps = []
+    def on_turn(turn, board, robots, projectiles):
+        snaps.append(GameSnapshot.capture(board, robots, turn, projectiles, rng=False).to_bytes())
+    result = play_match(level, seed=seed, on_turn=on_turn, **kw)
+    rec = Recording(level, seconds_to_ticks(get_ai_interval(level)), snaps, result['winner'])
+    return rec, result
+
+# ---------- Per-frame render state ----------
+def _approach(curr, target, step):
+    if curr < target: return min(target, curr + step)
+    if curr > target: return max(target, curr - step)
+    return curr
+
+class _View:
+    """Everything a frame shows besides the snapshot: pixel positions, HUD scores, wall highlight."""
+    def __init__(self, track, cell_size):
+        self.cell = cell_size
+        self.step = cell_size*MOVE_CELLS_PER_SEC/TICK_RATE
+        blue, red = track[0][0], track[0][1]
+        self.px = [blue[1]*cell_size, blue[0]*cell_size, red[1]*cell_size, red[0]*cell_size]
+        self.scores = [0.0, 0.0]
+        self.block = None
+
+    def tick(self, entry, new_turn):
+        """One simulation tick with the robots at track entry (main.sim_tick + draw_stats)."""
+        blue, red, bs, rs, wall = entry
+        if new_turn and wall is not None:
+            self.block = (wall, BLOCK_FADE_TICKS)
+        c, px = self.cell, self.px
+        for i, pos in ((0, blue), (2, red)):
+            px[i] = _approach(px[i], pos[1]*c, self.step)
+            px[i+1] = _approach(px[i+1], pos[0]*c, self.step)
+        if self.block:
+            cell, left = self.block
+            self.block = None if left <= 1 else (cell, left-1)
+        self.scores[0] += (bs - self.scores[0])*0.2
+        self.scores[1] += (rs - self.scores[1])*0.2
+
+# ---------- Workers ----------
+_screen = None
+
+def _init_worker(cell_size, view_w, view_h, hud_h):
+    global _screen
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from utils import init_assets
+    pygame.init()
+    _screen = pygame.display.set_mode((view_w, view_h + hud_h))
+    init_assets(cell_size, (view_w, view_h))
+
+def _render_range(job):
+    """Render turns [first, last) of a recording; returns the frame count."""
+    import pygame, render
+    from camera import Camera
+    level, ticks, track, first, snaps, out_dir, cell_size, view_h = job
+    last = len(track) - 1
+    view = _View(track, cell_size)
+    # fast-forward the render state to the first frame of the range (no drawing)
+    for f in range(first*ticks):
+        view.tick(track[f//ticks], f % ticks == 0)
+    projectiles = ProjectileSystem()
+    camera = None
+    count = 0
+    for k, raw in enumerate(snaps, first):
+        snap = GameSnapshot.from_bytes(raw)
+        board, robots = snap.restore(projectiles, rng=False)
+        if camera is None:
+            camera = Camera(_screen.get_width(), view_h, cell_size, board.size)
+        entry = track[k]
+        for j in range(ticks + (TAIL_TICKS if k == last else 0)):
+            f = k*ticks + j
+            if j:
+                projectiles.advance(1, robots)
+            view.tick(entry, j == 0)
+            bx, by, rx, ry = view.px
+            camera.center_on(bx, by)
+            arrows = projectiles.visible(0.0) if level == 'hard' else ()
+            render.draw_board(_screen, board, camera, cell_size, robots[0], robots[1],
+                              (bx, by), (rx, ry), arrows, view.block)
+            render.draw_stats(_screen, robots[0], robots[1], view.scores[0], view.scores[1], view_h,
+                              hint=f"Turn {k}  frame {f}")
+            pygame.image.save(_screen, os.path.join(out_dir, f"frame_{f:06d}.png"))
+            count += 1
+    return count
+
+# ---------- Driver ----------
+def render_recording(rec, out_dir, workers=None, cell_size=CELL_SIZE, chunk_turns=None):
+    """Render every frame of rec to out_dir/frame_NNNNNN.png; returns the frame count."""
+    import render
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    track = rec.track()
+    size = GameSnapshot.from_bytes(rec.snapshots[0]).size
+    view_w, view_h = min(size, VIEW_COLS)*cell_size, min(size, VIEW_ROWS)*cell_size
+    snaps = rec.snapshots
+    n = len(snaps)
+    chunk = chunk_turns or max(1, -(-n // (workers*2)))   # a couple of ranges per worker
+    jobs = [(rec.level, rec.ticks_per_turn, track, k, snaps[k:k+chunk], out_dir,
+             cell_size, view_h) for k in range(0, n, chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cell_size, view_w, view_h, render.HUD_HEIGHT)) as pool:
+        return sum(pool.map(_render_range, jobs))
+
+if __name__ == "__main__":
+    import robot
+    robot.VERBOSE = False
+    out = sys.argv[1] if len(sys.argv) > 1 else "replay_frames"
+    level = sys.argv[2] if len(sys.argv) > 2 else "hard"
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    rec, result = record_match(level, seed=seed)
+    os.makedirs(out, exist_ok=True)
+    rec.save(os.path.join(out, "match.rrr"))
+    t0 = time.time()
+    frames = render_recording(rec, out, workers)
+    print(f"{result['winner']} in {rec.turns} turns: {frames} frames in {time.time()-t0:.1f}s -> {out}")
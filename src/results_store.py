@@ -0,0 +1,131 @@
+# results_store.py
+# Streaming sink for match records (simulation.play_match) in a local SQLite
+# file. Records are buffered and written in batched transactions, so memory
+# stays flat however many games are recorded; queries aggregate inside SQLite.
+import sqlite3
+
+COLUMNS = [
+    ('level', 'TEXT'), ('seed', 'INTEGER'), ('board_size', 'INTEGER'),
+    ('blue_personality', 'TEXT'), ('red_personality', 'TEXT'),
+    ('winner', 'TEXT'), ('turns', 'INTEGER'),
+    ('blue_health', 'INTEGER'), ('red_health', 'INTEGER'),
+    ('blue_score', 'INTEGER'), ('red_score', 'INTEGER'),
+    ('blue_ms_mean', 'REAL'), ('blue_ms_p95', 'REAL'), ('blue_ms_max', 'REAL'),
+    ('red_ms_mean', 'REAL'), ('red_ms_p95', 'REAL'), ('red_ms_max', 'REAL'),
+    ('tag', 'TEXT'),   # free label, e.g. strategy variant or tuning run
+]
+COLUMN_NAMES = [c for c, _ in COLUMNS]
+INDEXES = [
+    ('level',),
+    ('blue_personality', 'red_personality'),
+    ('winner',),
+    ('tag', 'level'),
+    ('seed',),
+]
+# name -> SQL expression usable in aggregate(metrics=...)
+METRICS = {
+    'games': 'COUNT(*)',
+    'blue_wins': "SUM(winner='blue')",
+    'red_wins': "SUM(winner='red')",
+    'draws': "SUM(winner='draw')",
+    'avg_turns': 'AVG(turns)',
+    'avg_blue_score': 'AVG(blue_score)',
+    'avg_red_score': 'AVG(red_score)',
+    'avg_blue_health': 'AVG(blue_health)',
+    'avg_red_health': 'AVG(red_health)',
+    'avg_blue_ms': 'AVG(blue_ms_mean)',
+    'avg_red_ms': 'AVG(red_ms_mean)',
+    'max_blue_ms': 'MAX(blue_ms_max)',
+    'max_red_ms': 'MAX(red_ms_max)',
+}
+
+class ResultStore:
+    def __init__(self, path="results.db", batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._buf = []
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        cols = ", ".join(f"{c} {t}" for c, t in COLUMNS)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS matches (id INTEGER PRIMARY KEY, {cols})")
+        for idx in INDEXES:
+            name = "idx_" + "_".join(idx)
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON matches ({', '.join(idx)})")
+        self.conn.commit()
+        self._insert = (f"INSERT INTO matches ({', '.join(COLUMN_NAMES)}) "
+                        f"VALUES ({', '.join('?' for _ in COLUMN_NAMES)})")
+
+    # ---------- Writing ----------
+    def add(self, record, tag=None):
+        row = [record.get(c) for c in COLUMN_NAMES]
+        if tag is not None:
+            row[-1] = tag
+        self._buf.append(row)
+        if len(self._buf) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buf:
+            return
+        with self.conn:   # one transaction per batch
+            self.conn.executemany(self._insert, self._buf)
+        self._buf = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- Queries ----------
+    @staticmethod
+    def _where(where):
+        if not where:
+            return "", []
+        parts, args = [], []
+        for col, val in where.items():
+            if col not in COLUMN_NAMES:
+                raise ValueError(f"unknown column: {col}")
+            if isinstance(val, (list, tuple, set)):
+                parts.append(f"{col} IN ({', '.join('?' for _ in val)})")
+                args += list(val)
+            else:
+                parts.append(f"{col} = ?")
+                args.append(val)
+        return " WHERE " + " AND ".join(parts), args
+
+    def count(self, where=None):
+        self.flush()
+        sql, args = self._where(where)
+        return self.conn.execute("SELECT COUNT(*) FROM matches" + sql, args).fetchone()[0]
+
+    def aggregate(self, group_by=(), where=None, metrics=None):
+        """Yield one dict per group, e.g. aggregate(('level','red_personality'), {'tag': 'v2'})."""
+        self.flush()
+        for col in group_by:
+            if col not in COLUMN_NAMES:
+                raise ValueError(f"unknown column: {col}")
+        metrics = metrics or list(METRICS)
+        select = list(group_by) + [f"{METRICS[m]} AS {m}" for m in metrics]
+        sql = f"SELECT {', '.join(select)} FROM matches"
+        wsql, args = self._where(where)
+        sql += wsql
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+        cur = self.conn.execute(sql, args)
+        names = [d[0] for d in cur.description]
+        for row in cur:
+            yield dict(zip(names, row))
+
+    def iter_matches(self, where=None):
+        """Stream raw records without loading them all."""
+        self.flush()
+        sql, args = self._where(where)
+        cur = self.conn.execute(f"SELECT {', '.join(COLUMN_NAMES)} FROM matches" + sql, args)
+        for row in cur:
+            yield dict(zip(COLUMN_NAMES, row))
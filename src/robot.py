@@ -3,6 +3,12 @@ import time
 from config import RESOURCE_TYPES, TRAP_TYPES
 from utils import play_sfx
 
+VERBOSE = True  # headless batch runs switch the event prints off
+
+def _log(msg):
+    if VERBOSE:
+        print(msg)
+
 class Robot:
     def __init__(self, name, pos, personality='Balanced'):
         self.name = name
@@ -38,10 +44,8 @@ class Robot:
             if board.grid[newx][newy] == "X":  
                 # obstacle handling
                 if self.has_buff("shield"):
-                    board.grid[newx][newy] = "."  # break obstacle
-                    if (newx, newy) in board.obstacles:
-                        board.obstacles.remove((newx, newy))
-                    print(f"{self.name} used SHIELD to break obstacle at {(newx,newy)}!")
+                    board.remove_obstacle((newx, newy))  # break obstacle
+                    _log(f"{self.name} used SHIELD to break obstacle at {(newx,newy)}!")
                     del self.buffs["shield"]  # consume shield immediately
                     self.pos = (newx, newy)
                 else:
@@ -49,10 +53,13 @@ class Robot:
             else:
                 self.pos = (newx, newy)
                 self.check_cell(board)
+            index = getattr(board, 'index', None)
+            if index is not None:
+                index.move_robot(self)
 
     def check_cell(self, board):
         if self.pos in board.resources:
-            r_type = board.resources.pop(self.pos)
+            r_type = board.take_resource(self.pos)
             props = RESOURCE_TYPES[r_type]
             self.last_pickup_type = r_type
             if 'score' in props:
@@ -63,10 +70,9 @@ class Robot:
                 buff_name = props['buff']
                 if buff_name == "shield":
                     self.buffs["shield"] = time.time() + 5  # 5 seconds
-                    print(f"{self.name} gained SHIELD for 5s!")
+                    _log(f"{self.name} gained SHIELD for 5s!")
                 else:
                     self.buffs[buff_name] = time.time() + 5  # generic buff, default 5s
-            board.grid[self.pos[0]][self.pos[1]] = "."
             self.last_collected = self.pos
 
             # --- Sounds by resource type
@@ -76,22 +82,21 @@ class Robot:
                 play_sfx('health')
             else:
                 play_sfx('bonus')  # includes shield
-            print(f"{self.name} collected {r_type}!")
+            _log(f"{self.name} collected {r_type}!")
 
         elif self.pos in board.traps:
-            t_type = board.traps.pop(self.pos)
+            t_type = board.take_trap(self.pos)
             damage = TRAP_TYPES[t_type]['damage']
             self.health -= damage
-            board.grid[self.pos[0]][self.pos[1]] = "."
             play_sfx('trap')
-            print(f"{self.name} stepped on {t_type}! -{damage} health")
+            _log(f"{self.name} stepped on {t_type}! -{damage} health")
 
     def attack(self, other):
         if self.distance(other) <= 2:
             other.health -= 15
             play_sfx('attack')
             setattr(self, 'last_attacked', True)
-            print(f"{self.name} attacked {other.name}! -15 health")
+            _log(f"{self.name} attacked {other.name}! -15 health")
 
     def distance(self, other):
         return abs(self.pos[0] - other.pos[0]) + abs(self.pos[1] - other.pos[1])
@@ -0,0 +1,250 @@
+# route_planner.py
+# Visiting order over the board's resources for the gather behaviour.
+#
+# Instead of walking to whichever resource is nearest right now (and asking
+# again every turn), a robot plans one route over the remaining resources and
+# follows it. A route is scored by value-weighted arrival time: every item
+# costs (its weight) x (steps until it is picked up), so valuable items come
+# early and cheap ones are picked up on the way. With a goal the route ends
+# there, and the last leg counts with GOAL_WEIGHT.
+#
+# Orders are exact (Held-Karp DP over subsets) up to EXACT_MAX items, and
+# greedy + 2-opt above that; at most PLAN_MAX items (the closest ones) are
+# planned at a time. Walking distances come from bitboard BFS rows that are
+# cached per source cell until a wall changes.
+#
+# The plan lives on the robot (robot.route) and is repaired, not recomputed:
+# a picked-up item is dropped from the order, an unreachable one is skipped,
+# and a new plan is made only once the current one runs out.
+from collections import deque
+
+from config import RESOURCE_TYPES
+
+EXACT_MAX = 8        # Held-Karp up to this many items (2^k * k^2 work)
+PLAN_MAX = 16        # items per plan
+GOAL_WEIGHT = 1.0
+
+def resource_value(r_type):
+    """Worth of one pickup, from RESOURCE_TYPES (score, heal, buffs)."""
+    info = RESOURCE_TYPES.get(r_type, {})
+    return info.get('score', 0) + info.get('heal', 0)*0.5 + (10 if 'buff' in info else 0)
+
+def _weight(r_type):
+    return 1.0 + resource_value(r_type)/10
+
+# ---------- Ordering ----------
+def route_cost(order, dist, weights, goal_weight=0.0):
+    """Weighted arrival time of visiting order (indexes into dist/weights; 0
+    is the start, the last row/column of dist is the goal if goal_weight)."""
+    t = cost = 0
+    cur = 0
+    for j in order:
+        t += dist[cur][j]
+        cost += weights[j]*t
+        cur = j
+    if goal_weight:
+        t += dist[cur][len(dist)-1]
+        cost += goal_weight*t
+    return cost
+
+def held_karp(dist, weights, items, goal_weight=0.0):
+    """Best order of items (indexes, start is 0) by DP over subsets.
+    Arrival-time cost is charged per edge: stepping d cells delays everything
+    not visited yet, so an edge costs d x (weight still to collect)."""
+    k = len(items)
+    total = sum(weights[i] for i in items) + goal_weight
+    inf = float('inf')
+    full = (1 << k) - 1
+    left = [total]*(1 << k)          # weight not yet collected after visiting mask
+    for mask in range(1, 1 << k):
+        low = (mask & -mask).bit_length() - 1
+        left[mask] = left[mask & (mask-1)] - weights[items[low]]
+    dp = [[inf]*k for _ in range(1 << k)]
+    parent = [[-1]*k for _ in range(1 << k)]
+    for j in range(k):
+        dp[1 << j][j] = dist[0][items[j]]*total
+    for mask in range(1, 1 << k):
+        row = dp[mask]
+        rem = left[mask]
+        for i in range(k):
+            c = row[i]
+            if c == inf:
+                continue
+            di = dist[items[i]]
+            for j in range(k):
+                if mask >> j & 1:
+                    continue
+                nm = mask | (1 << j)
+                v = c + di[items[j]]*rem
+                if v < dp[nm][j]:
+                    dp[nm][j] = v
+                    parent[nm][j] = i
+    g = len(dist) - 1
+    last = min(range(k), key=lambda j: dp[full][j] + (dist[items[j]][g]*goal_weight if goal_weight else 0))
+    order = []
+    mask = full
+    while last != -1:
+        order.append(items[last])
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    order.reverse()
+    return order
+
+def greedy_2opt(dist, weights, items, goal_weight=0.0, passes=3):
+    """Greedy order (best weight per step next), improved by 2-opt reversals."""
+    todo = set(items)
+    order = []
+    cur = 0
+    while todo:
+        j = max(todo, key=lambda j: (weights[j]/(dist[cur][j] or 0.5), -j))
+        order.append(j)
+        todo.discard(j)
+        cur = j
+    best = route_cost(order, dist, weights, goal_weight)
+    for _ in range(passes):
+        improved = False
+        for a in range(len(order) - 1):
+            for b in range(a + 1, len(order)):
+                cand = order[:a] + order[a:b+1][::-1] + order[b+1:]
+                c = route_cost(cand, dist, weights, goal_weight)
+                if c < best:
+                    order, best, improved = cand, c, True
+        if not improved:
+            break
+    return order
+
+# ---------- Distances ----------
+def _bfs_row(board, src, targets):
+    """{target: walking steps from src} for the reachable targets."""
+    bits = getattr(board, 'bits', None)
+    out = {}
+    if bits is not None:
+        want = {bits.bit(t): t for t in targets}
+        rest = 0
+        for b in want: rest |= b
+        seen = front = bits.bit(src)
+        steps = 0
+        while front and rest:
+            hit = front & rest
+            while hit:
+                low = hit & -hit
+                out[want[low]] = steps
+                hit ^= low
+            rest &= ~front
+            front = bits.expand(front) & ~seen
+            seen |= front
+            steps += 1
+        return out
+    # plain BFS on the grid
+    grid, n = board.grid, board.size
+    want = set(targets)
+    seen = {src: 0}
+    q = deque([src])
+    while q and len(out) < len(want):
+        c = q.popleft()
+        if c in want:
+            out[c] = seen[c]
+        for dx, dy in ((1,0),(-1,0),(0,1),(0,-1)):
+            x, y = c[0]+dx, c[1]+dy
+            if 0 <= x < n and 0 <= y < n and grid[x][y] != "X" and (x, y) not in seen:
+                seen[(x, y)] = seen[c] + 1
+                q.append((x, y))
+    return out
+
+# ---------- Planner ----------
+class RoutePlanner:
+    def __init__(self, board, goal=None):
+        self.board = board
+        self.goal = goal
+        self.plan = []
+        self.stale = True      # plan again once the current plan runs out
+        self._rows = {}        # source cell -> ({cell: steps}, cells asked for); dropped on wall changes
+        self.replans = 0
+
+    def _row(self, src, cells):
+        row, asked = self._rows.get(src, ({}, set()))
+        missing = [c for c in cells if c not in asked]
+        if missing:
+            row.update(_bfs_row(self.board, src, missing))
+            asked.update(missing)
+            self._rows[src] = row, asked
+        return row
+
+    def _reachable(self, a, b):
+        comps = getattr(self.board, 'components', None)
+        return comps is None or comps.reachable(a, b)
+
+    def replan(self, start):
+        res = self.board.resources
+        goal = [self.goal] if self.goal else []
+        cells = sorted(res, key=lambda p: (abs(p[0]-start[0]) + abs(p[1]-start[1]), p))[:PLAN_MAX]
+        start_row = self._row(start, cells + goal)
+        cells = [c for c in cells if c in start_row]
+        self.replans += 1
+        self.stale = False
+        self.plan = []
+        if not cells:
+            return self.plan
+        nodes = [start] + cells + goal
+        big = 4*self.board.size**2     # legs that can't be walked (goal walled off)
+        dist = []
+        for a in nodes:
+            row = self._row(a, nodes)
+            dist.append([0 if b == a else row.get(b, big) for b in nodes])
+        weights = [0.0] + [_weight(res[c]) for c in cells] + [0.0]*len(goal)
+        items = list(range(1, len(cells) + 1))
+        gw = GOAL_WEIGHT if goal else 0.0
+        if len(items) <= EXACT_MAX:
+            order = held_karp(dist, weights, items, gw)
+        else:
+            order = greedy_2opt(dist, weights, items, gw)
+        self.plan = [nodes[i] for i in order]
+        return self.plan
+
+    def next_target(self, start):
+        """Next planned item that can still be reached, or None."""
+        while self.plan and not self._reachable(start, self.plan[0]):
+            self.plan.pop(0)
+            self.stale = True
+        if not self.plan and self.stale:
+            self.replan(start)
+        return self.plan[0] if self.plan else None
+
+    def __getstate__(self):
+        # sent to a worker with its robot (server.py): the board and its
+        # distances stay behind, route_target binds the planner again
+        return dict(self.__dict__, board=None, _rows={})
+
+    def rebind(self, board):
+        """Follow board from now on, dropping planned items it no longer has."""
+        self.board = board
+        board.add_listener(self.on_board_change)
+        self.plan = [c for c in self.plan if c in board.resources]
+        self.stale = True
+
+    def set_goal(self, goal):
+        """New end of the route: plan again, keeping the cached distances."""
+        if goal != self.goal:
+            self.goal = goal
+            self.plan = []
+            self.stale = True
+
+    def on_board_change(self, kind, pos):
+        if kind in ('obstacle_added', 'obstacle_removed'):
+            self._rows.clear()    # the order stays; distances are recomputed on the next replan
+            self.stale = True
+        elif kind == 'resource_removed':
+            if pos in self.plan:
+                self.plan.remove(pos)
+            self.stale = True
+
+def route_target(robot, board, goal=None):
+    """Next resource on robot's planned route (robot.route: one planner, and
+    one board listener, per robot and board)."""
+    planner = getattr(robot, 'route', None)
+    if planner is not None and planner.board is None:
+        planner.rebind(board)      # unpickled with its robot
+    if planner is None or planner.board is not board:
+        planner = robot.route = RoutePlanner(board, goal)
+        board.add_listener(planner.on_board_change)
+    planner.set_goal(goal)
+    return planner.next_target(robot.pos)
@@ -0,0 +1,35 @@
+# scheduler.py
+# Fixed-timestep scheduler: logic runs in whole ticks of 1/TICK_RATE seconds,
+# rendering interpolates between the last two ticks using `alpha`.
+from config import TICK_RATE
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, max_steps=8):
+        self.tick_dt = 1.0/tick_rate
+        self.max_steps = max_steps   # catch-up bound after a hitch
+        self.accum = 0.0
+        self.ticks = 0               # total ticks run
+
+    def advance(self, frame_dt):
+        """Add real frame time; return how many logic ticks to run now."""
+        self.accum += frame_dt
+        steps = int(self.accum/self.tick_dt)
+        if steps > self.max_steps:
+            # too far behind (debugger, window drag...): run max_steps, drop the rest
+            steps = self.max_steps
+            self.accum = 0.0
+        else:
+            self.accum -= steps*self.tick_dt
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of the next tick already elapsed, in [0,1)."""
+        return min(1.0, self.accum/self.tick_dt)
+
+    def reset(self):
+        self.accum = 0.0
+
+def seconds_to_ticks(seconds, tick_rate=TICK_RATE):
+    return max(1, round(seconds*tick_rate))
@@ -0,0 +1,275 @@
+# server.py
+# Headless game server: many independent matches in one asyncio process.
+#
+# Protocol: one JSON object per line over TCP.
+#   {"op":"new", "mode":"bot"|"human", "level":"medium", "seed":1}  -> {"ok":true, "session":id}
+#                                  (seed fixes the board layout and red's personality)
+#   {"op":"move", "session":id, "action":"up|down|left|right|attack|ranged"}   (human sessions)
+#   {"op":"state", "session":id, "full":false}
+#   {"op":"watch", "session":id}      subscribe to per-turn events
+#   {"op":"close", "session":id}
+#   {"op":"list"}
+# Events pushed to subscribers: {"event":"turn", ...state} and {"event":"end", ...state};
+# a turn that raises ends the session with {"event":"error", "winner":"error", "error":...}.
+#
+# A single scheduler task drives every session at its level's turn interval.
+# AI decisions run in a process pool, so one slow search never blocks the loop
+# or the other sessions. A decision ships only the cells and items (a
+# GameSnapshot without robots) and the two robots; the worker rebuilds the
+# board helpers (prepare_board) and sends back the cells, which the session
+# applies to its own board through the Board API so its helpers stay current.
+# Rebuilding is cheap on the default board, but would include the HPA build
+# on boards of HPA_MIN_SIZE and up.
+import asyncio, itertools, json, random, sys, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import robot
+from ai_strategies import ai_decision, ai_vs_ai_decision
+from projectiles import ProjectileSystem
+from scheduler import seconds_to_ticks
+from line_of_sight import has_los
+from snapshot import GameSnapshot
+from simulation import setup_level, prepare_board, get_ai_interval, apply_turn_effects, match_winner, LEVELS
+
+HOST = "127.0.0.1"
+PORT = 8765
+SCHEDULER_PERIOD = 0.01   # s
+HUMAN_ACTIONS = {'up': (-1,0), 'down': (1,0), 'left': (0,-1), 'right': (0,1)}
+DECIDERS = {'ai_decision': ai_decision, 'ai_vs_ai_decision': ai_vs_ai_decision}
+
+def _quiet():
+    robot.VERBOSE = False
+
+def _decide(name, cells, me, other, level):
+    """Runs in the executor on a board rebuilt from cells; returns the robots
+    (copies when in a process) and the cells afterwards."""
+    board, _ = cells.restore(rng=False)
+    prepare_board(board, me, other)
+    DECIDERS[name](me, other, board, level=level)
+    return me, other, GameSnapshot.capture(board, (), rng=False)
+
+def _apply_cells(board, after):
+    """Replay a decision's cell changes (pickups, shield breaks) on board."""
+    for x, (row, new) in enumerate(zip(board.grid, after.rows)):
+        if "".join(row) == new:
+            continue
+        for y, ch in enumerate(new):
+            old = row[y]
+            if old == ch:
+                continue
+            if old == "X": board.remove_obstacle((x, y))
+            elif ch == "X": board.add_obstacle((x, y))
+            elif old == "E": board.take_resource((x, y))
+            elif old == "T": board.take_trap((x, y))
+
+def _sync_robot(robot, done, board):
+    if done is not robot:
+        robot.__dict__.update(done.__dict__)
+    index = getattr(board, 'index', None)
+    if index is not None:
+        index.move_robot(robot)
+
+# ---------- Sessions ----------
+class Session:
+    def __init__(self, sid, mode='bot', level='medium', seed=None):
+        self.id = sid
+        self.mode = mode
+        self.level = level
+        # own RNG: reseeding the shared one would disturb the other sessions
+        rng = random.Random(seed) if seed is not None else None
+        self.board, self.blue, self.red = setup_level(level, rng=rng)
+        self.projectiles = ProjectileSystem()
+        self.ticks_per_turn = seconds_to_ticks(get_ai_interval(level))
+        self.interval = get_ai_interval(level)
+        self.turn = 0
+        self.winner = None
+        self.error = None          # message of the exception that ended the session
+        self.busy = False
+        self.next_due = time.monotonic()
+        self.pending = []          # queued human actions
+        self.watchers = set()      # asyncio.StreamWriter
+
+    def state(self, full=False):
+        s = {
+            'session': self.id, 'mode': self.mode, 'level': self.level,
+            'turn': self.turn, 'winner': self.winner,
+            'blue': {'pos': self.blue.pos, 'health': self.blue.health, 'score': self.blue.score},
+            'red': {'pos': self.red.pos, 'health': self.red.health, 'score': self.red.score},
+        }
+        if self.error is not None:
+            s['error'] = self.error
+        if full:
+            s['grid'] = ["".join(row) for row in self.board.grid]
+        return s
+
+    def due(self, now):
+        if self.busy or self.winner is not None or now < self.next_due:
+            return False
+        return self.mode == 'bot' or bool(self.pending)
+
+    def apply_human(self, action):
+        me, other = self.blue, self.red
+        me.last_pos = me.pos
+        if action in HUMAN_ACTIONS:
+            me.move(*HUMAN_ACTIONS[action], self.board)
+        elif action == 'attack':
+            me.attack(other)
+        elif action == 'ranged':
+            me.pending_ranged = {'target_pos': other.pos, 'turns': 1}
+        apply_turn_effects(me, self.board, self.level, self.projectiles, 0)
+
+    async def play_turn(self, loop, executor):
+        """One scheduler step: a bot turn, or a human action plus the AI reply."""
+        self.busy = True
+        try:
+            if self.mode == 'human':
+                self.apply_human(self.pending.pop(0))
+                side, name = 1, 'ai_decision'
+            else:
+                side, name = self.turn % 2, 'ai_vs_ai_decision'
+            me, other = (self.blue, self.red) if side == 0 else (self.red, self.blue)
+            me.last_pos = me.pos
+            cells = GameSnapshot.capture(self.board, (), rng=False)
+            me_done, other_done, after = await loop.run_in_executor(executor, _decide, name, cells, me, other, self.level)
+            _apply_cells(self.board, after)
+            _sync_robot(me, me_done, self.board)
+            _sync_robot(other, other_done, self.board)
+            apply_turn_effects(me, self.board, self.level, self.projectiles, side)
+            if self.mode == 'human' and self.level != 'hard' and getattr(self.blue, 'pending_ranged', None):
+                # delayed ranged shot resolves after the AI reply (as in main.py)
+                target = self.blue.pending_ranged['target_pos']
+                if self.red.pos == target and has_los(self.board, self.blue.pos, target):
+                    self.red.health -= 20
+                self.blue.pending_ranged = None
+            self.turn += 1
+            self.projectiles.advance(self.ticks_per_turn, [self.blue, self.red])
+            self.winner = match_winner(self.board, self.blue, self.red, self.turn)
+        except Exception as e:
+            # a strategy error or a broken pool would fail the same turn forever
+            self.winner = 'error'
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.busy = False
+            self.next_due = time.monotonic() + (0 if self.mode == 'human' else self.interval)
+        await self.broadcast('error' if self.error else 'end' if self.winner else 'turn')
+
+    async def broadcast(self, event):
+        line = (json.dumps(dict(self.state(), event=event)) + "\n").encode()
+        for w in list(self.watchers):
+            try:
+                w.write(line)
+                await w.drain()
+            except (ConnectionError, RuntimeError):
+                self.watchers.discard(w)
+
+# ---------- Server ----------
+class GameServer:
+    def __init__(self, workers=None, use_processes=True):
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_quiet)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        _quiet()
+
+    async def scheduler(self):
+        """Shared turn scheduler for all sessions."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = time.monotonic()
+            for s in list(self.sessions.values()):
+                if s.due(now):
+                    s.busy = True
+                    loop.create_task(s.play_turn(loop, self.executor))
+            await asyncio.sleep(SCHEDULER_PERIOD)
+
+    def handle(self, msg, writer):
+        if not isinstance(msg, dict):
+            return {'ok': False, 'error': 'message must be a JSON object'}
+        op = msg.get('op')
+        if op == 'new':
+            level = msg.get('level', 'medium')
+            mode = msg.get('mode', 'bot')
+            if level not in LEVELS or mode not in ('bot', 'human'):
+                return {'ok': False, 'error': 'bad level or mode'}
+            s = Session(next(self._ids), mode, level, msg.get('seed'))
+            s.watchers.add(writer)
+            self.sessions[s.id] = s
+            return {'ok': True, 'session': s.id}
+        if op == 'list':
+            return {'ok': True, 'sessions': [s.state() for s in self.sessions.values()]}
+        s = self.sessions.get(msg.get('session'))
+        if s is None:
+            return {'ok': False, 'error': 'unknown session'}
+        if op == 'state':
+            return dict(s.state(bool(msg.get('full'))), ok=True)
+        if op == 'watch':
+            s.watchers.add(writer)
+            return {'ok': True}
+        if op == 'move':
+            if s.mode != 'human' or s.winner:
+                return {'ok': False, 'error': 'not accepting moves'}
+            action = msg.get('action')
+            if action not in HUMAN_ACTIONS and action not in ('attack', 'ranged'):
+                return {'ok': False, 'error': 'bad action'}
+            s.pending.append(action)
+            return {'ok': True}
+        if op == 'close':
+            del self.sessions[s.id]
+            return {'ok': True}
+        return {'ok': False, 'error': f'unknown op: {op}'}
+
+    async def client_connected(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.handle(json.loads(line), writer)
+                except (ValueError, TypeError) as e:
+                    reply = {'ok': False, 'error': str(e)}
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+        finally:
+            for s in self.sessions.values():
+                s.watchers.discard(writer)
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.client_connected, host, port)
+        sched = asyncio.create_task(self.scheduler())
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                sched.cancel()
+                self.executor.shutdown(cancel_futures=True)
+
+# ---------- Stand-in client ----------
+async def run_client(n=10, level='medium', host=HOST, port=PORT):
+    """Start n bot-vs-bot sessions on one connection and wait for all to end."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(n):
+        writer.write((json.dumps({'op': 'new', 'mode': 'bot', 'level': level, 'seed': i}) + "\n").encode())
+    await writer.drain()
+    results = {}
+    t0 = time.time()
+    while len(results) < n:
+        msg = json.loads(await reader.readline())
+        if msg.get('event') in ('end', 'error'):
+            results[msg['session']] = msg
+    writer.close()
+    wins = {}
+    for r in results.values():
+        wins[r['winner']] = wins.get(r['winner'], 0) + 1
+    print(f"{n} sessions finished in {time.time()-t0:.1f}s: {wins}")
+    return results
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if cmd == "client":
+        asyncio.run(run_client(int(sys.argv[2]) if len(sys.argv) > 2 else 10))
+    else:
+        asyncio.run(GameServer().serve())
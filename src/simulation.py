@@ -0,0 +1,178 @@
+# simulation.py
+# Headless AI vs AI matches with the same rules as main.py's 'pvp_ai' mode,
+# for batch runs, tournaments and tuning.
+import random, sys, time
+
+from board import Board
+from robot import Robot
+from ai_strategies import ai_vs_ai_decision
+from config import GRID_WIDTH, MAX_TURNS, NUM_RESOURCES, NUM_TRAPS, NUM_OBSTACLES, HPA_MIN_SIZE, HPA_CLUSTER_SIZE
+from hpa import attach_hpa
+from spatial_index import attach_index
+from connectivity import attach_connectivity
+from bitboard import attach_bitboard
+from line_of_sight import attach_los, clip_shot
+from forecast import attach_forecast
+from policy_table import attach_policy
+from projectiles import ProjectileSystem
+from scheduler import seconds_to_ticks
+import ai_trace
+
+LEVELS = ['easy', 'medium', 'hard']
+PERSONALITIES = ['Aggressive', 'Defensive', 'Balanced']
+
+# ---------- Level setup (shared with main.py) ----------
+def get_ai_interval(level):
+    if level == "easy":
+        return 0.5   # slower, more relaxed
+    elif level == "medium":
+        return 0.3   # moderate speed
+    else:  # hard
+        return 0.15  # very fast & challenging
+
+def level_counts(level):
+    if level=='easy':
+        return int(NUM_RESOURCES*1.4), int(NUM_TRAPS*0.6), int(NUM_OBSTACLES*0.7)
+    if level=='medium':
+        return NUM_RESOURCES, NUM_TRAPS, NUM_OBSTACLES
+    return int(NUM_RESOURCES*0.7), int(NUM_TRAPS*1.4), int(NUM_OBSTACLES*1.2)
+
+def setup_level(level, blue_personality='Balanced', red_personality=None, size=GRID_WIDTH, rng=None):
+    rng = rng or random
+    nr, nt, no = level_counts(level)
+    b = Board(size, num_resources=nr, num_traps=nt, num_obstacles=no, rng=rng)
+    p = Robot("Player", (0,0), blue_personality)
+    a = Robot("AI", (b.size-1, b.size-1), red_personality or rng.choice(PERSONALITIES))
+    prepare_board(b, p, a)
+    return b, p, a
+
+def prepare_board(b, p, a, policy=None):
+    """Attach the search helpers every game board carries (also used for map
+    files); policy is a solved policy_table .npy for this exact layout."""
+    if b.size >= HPA_MIN_SIZE:
+        attach_hpa(b, HPA_CLUSTER_SIZE)
+    attach_index(b, (p, a))
+    attach_connectivity(b)
+    attach_bitboard(b)
+    attach_los(b)
+    attach_forecast(b)
+    if policy is not None:
+        attach_policy(b, policy)
+
+# ---------- One match ----------
+def apply_turn_effects(robot, board, level, projectiles, owner):
+    """Per-turn rules main.py applies after a decision (medium walls, hard arrows)."""
+    if level=='medium' and getattr(robot,'last_collected',None) is not None:
+        x,y = robot.last_collected
+        if board.grid[x][y]==".": board.add_obstacle((x,y))
+        robot.last_collected = None
+    if level=='hard' and getattr(robot,'pending_ranged',None):
+        target = clip_shot(board, robot.pos, robot.pending_ranged['target_pos'])
+        projectiles.spawn(robot.pos, target, owner=owner)
+        robot.pending_ranged = None
+
+def match_winner(board, blue, red, turn, max_turns=MAX_TURNS):
+    """'blue', 'red', 'draw' or None while the match goes on (main.py's order)."""
+    if blue.pos == board.end_player and blue.health>0: return 'blue'
+    if red.pos == board.end_ai and red.health>0: return 'red'
+    if blue.health<=0: return 'red'
+    if red.health<=0: return 'blue'
+    if turn>=max_turns:
+        if blue.score>red.score: return 'blue'
+        if red.score>blue.score: return 'red'
+        return 'draw'
+    return None
+
+def _timing(samples):
+    if not samples:
+        return 0.0, 0.0, 0.0
+    s = sorted(samples)
+    return sum(s)/len(s), s[min(len(s)-1, int(len(s)*0.95))], s[-1]
+
+def play_match(level='medium', blue_personality='Balanced', red_personality=None, seed=None,
+               blue_decide=ai_vs_ai_decision, red_decide=ai_vs_ai_decision, max_turns=MAX_TURNS,
+               size=GRID_WIDTH, setup=None, on_turn=None):
+    """Play one headless match and return a result record (dict).
+
+    setup, if given, is called as setup(level) and returns (board, blue, red);
+    by default a random board is generated from `seed`.
+    on_turn(turns_played, board, robots, projectiles) sees the start state and
+    the state after every turn, before the projectiles fly (replay.py records it).
+    """
+    if seed is None:
+        seed = random.randrange(1 << 31)
+    random.seed(seed)
+    if setup is not None:
+        board, blue, red = setup(level)
+    else:
+        board, blue, red = setup_level(level, blue_personality, red_personality, size)
+    projectiles = ProjectileSystem()
+    ticks_per_turn = seconds_to_ticks(get_ai_interval(level))
+    robots = [blue, red]
+    times = ([], [])
+
+    turn = 0
+    winner = None
+    if on_turn is not None:
+        on_turn(0, board, robots, projectiles)
+    while winner is None:
+        side = turn % 2
+        me, other = robots[side], robots[1-side]
+        decide = blue_decide if side == 0 else red_decide
+        me.last_pos = me.pos
+        ai_trace.turn = turn
+        t0 = time.perf_counter()
+        decide(me, other, board, level=level)
+        times[side].append((time.perf_counter()-t0)*1000.0)
+        apply_turn_effects(me, board, level, projectiles, side)
+        turn += 1
+        if on_turn is not None:
+            on_turn(turn, board, robots, projectiles)
+        projectiles.advance(ticks_per_turn, robots)
+        winner = match_winner(board, blue, red, turn, max_turns)
+
+    b_mean, b_p95, b_max = _timing(times[0])
+    r_mean, r_p95, r_max = _timing(times[1])
+    return {
+        'level': level, 'seed': seed, 'board_size': board.size,
+        'blue_personality': blue.personality, 'red_personality': red.personality,
+        'winner': winner, 'turns': turn,
+        'blue_health': blue.health, 'red_health': red.health,
+        'blue_score': blue.score, 'red_score': red.score,
+        'blue_ms_mean': b_mean, 'blue_ms_p95': b_p95, 'blue_ms_max': b_max,
+        'red_ms_mean': r_mean, 'red_ms_p95': r_p95, 'red_ms_max': r_max,
+    }
+
+def run_batch(n, store=None, levels=LEVELS, first_seed=0, use_cache=False):
+    """Play n matches cycling levels/personalities; stream records into store.
+
+    use_cache replays repeated decisions from decision_cache (shared by all
+    games in this process).
+    """
+    import robot
+    robot.VERBOSE = False
+    decide = ai_vs_ai_decision
+    if use_cache:
+        from decision_cache import cached
+        decide = cached(ai_vs_ai_decision)
+    for i in range(n):
+        level = levels[i % len(levels)]
+        bp = PERSONALITIES[(i // len(levels)) % len(PERSONALITIES)]
+        rp = PERSONALITIES[(i // (len(levels)*len(PERSONALITIES))) % len(PERSONALITIES)]
+        rec = play_match(level, bp, rp, seed=first_seed+i, blue_decide=decide, red_decide=decide)
+        if store is not None:
+            store.add(rec)
+        yield rec
+
+if __name__ == "__main__":
+    from results_store import ResultStore
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    db = sys.argv[2] if len(sys.argv) > 2 else "results.db"
+    with ResultStore(db) as store:
+        t0 = time.time()
+        for _ in run_batch(n, store):
+            pass
+        store.flush()
+        print(f"{n} matches in {time.time()-t0:.1f}s -> {db}")
+        for row in store.aggregate(group_by=('level',)):
+            print(row)
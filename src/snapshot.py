@@ -0,0 +1,251 @@
+# snapshot.py
+# Compact, forkable game state: board, robots (with cooldowns, buffs, pending
+# ranged attacks), projectiles in flight, turn and RNG state.
+#
+# Grid rows are immutable strings; the row list and the item dicts are
+# copy-on-write, so fork() is O(1), the first write after a fork copies the
+# list/dict it touches (O(rows) for the grid) and each later set_cell only
+# rebuilds its own row.
+# to_bytes()/from_bytes() give a flat buffer for saves and worker hand-off.
+import random, struct, time
+
+from board import Board
+from robot import Robot
+from config import RESOURCE_TYPES, TRAP_TYPES
+
+MAGIC = b"RRS1"
+RES_NAMES = sorted(RESOURCE_TYPES)
+TRAP_NAMES = sorted(TRAP_TYPES)
+NO_INT = -(1 << 31)          # attribute not set on the robot
+NO_POS = (-1, -1)
+
+# Ad-hoc robot attributes the strategies keep between turns
+INT_FIELDS = ['ranged_cooldown', 'attack_cooldown', '_attack_cooldown', 'stunned_turns',
+              '_no_progress_turns', '_last_goal_dist']
+POS_FIELDS = ['last_pos', '_last_pos', 'goal', 'last_collected']
+
+class RobotState:
+    __slots__ = ('name', 'personality', 'pos', 'health', 'score', 'buffs', 'ints', 'poss', 'pending')
+
+    def __init__(self, name, personality, pos, health, score, buffs, ints, poss, pending):
+        self.name = name
+        self.personality = personality
+        self.pos = pos
+        self.health = health
+        self.score = score
+        self.buffs = buffs          # ((buff, seconds left), ...)
+        self.ints = ints            # values for INT_FIELDS (NO_INT = unset)
+        self.poss = poss            # values for POS_FIELDS (None = unset)
+        self.pending = pending      # (target_pos, turns) or None
+
+    @classmethod
+    def capture(cls, r, now=None):
+        now = time.time() if now is None else now
+        buffs = tuple((b, max(0.0, exp-now)) for b, exp in r.buffs.items())
+        ints = tuple(NO_INT if getattr(r, f, None) is None else int(getattr(r, f)) for f in INT_FIELDS)
+        poss = tuple(getattr(r, f, None) for f in POS_FIELDS)
+        pr = getattr(r, 'pending_ranged', None)
+        pending = (tuple(pr['target_pos']), pr.get('turns', 1)) if pr else None
+        return cls(r.name, r.personality, tuple(r.pos), r.health, r.score, buffs, ints, poss, pending)
+
+    def restore(self, now=None):
+        now = time.time() if now is None else now
+        r = Robot(self.name, self.pos, self.personality)
+        r.health = self.health
+        r.score = self.score
+        r.buffs = {b: now+left for b, left in self.buffs}
+        for f, v in zip(INT_FIELDS, self.ints):
+            if v != NO_INT: setattr(r, f, v)
+        for f, v in zip(POS_FIELDS, self.poss):
+            if v is not None: setattr(r, f, v)
+        r.pending_ranged = {'target_pos': self.pending[0], 'turns': self.pending[1]} if self.pending else None
+        return r
+
+    def replace(self, **kw):
+        vals = {k: getattr(self, k) for k in self.__slots__}
+        vals.update(kw)
+        return RobotState(**vals)
+
+class GameSnapshot:
+    def __init__(self, size, rows, resources, traps, goals, robots, projectiles=(), turn=0, rng_state=None):
+        self.size = size
+        self.rows = rows                  # str per grid row: tuple, or a list once written
+        self.resources = resources        # {(x,y): type}, shared until written
+        self.traps = traps
+        self.goals = goals                # (end_player, end_ai, end_blue, end_red)
+        self.robots = robots              # tuple of RobotState
+        self.projectiles = projectiles    # tuple of (src, dst, age, flight, damage, owner)
+        self.turn = turn
+        self.rng_state = rng_state
+        self._own_items = False
+        self._own_rows = False
+
+    # ---------- Capture / restore ----------
+    @classmethod
+    def capture(cls, board, robots, turn=0, projectiles=None, rng=True):
+        now = time.time()
+        shots = ()
+        if projectiles is not None:
+            shots = tuple(
+                (tuple(int(v) for v in projectiles.src[i]), tuple(int(v) for v in projectiles.dst[i]),
+                 int(projectiles.age[i]), int(projectiles.flight[i]),
+                 int(projectiles.damage[i]), int(projectiles.owner[i]))
+                for i in range(projectiles.count) if projectiles.active[i])
+        snap = cls(board.size, tuple("".join(r) for r in board.grid),
+                   dict(board.resources), dict(board.traps),
+                   (board.end_player, board.end_ai, board.end_blue, board.end_red),
+                   tuple(RobotState.capture(r, now) for r in robots),
+                   shots, turn, random.getstate() if rng else None)
+        snap._own_items = True
+        return snap
+
+    def restore(self, projectiles=None, rng=True):
+        """Build fresh (board, robots). Fills `projectiles` and the global RNG if given."""
+        b = Board(self.size, populate=False)
+        b.grid = [list(r) for r in self.rows]
+        b.resources = dict(self.resources)
+        b.traps = dict(self.traps)
+        b.obstacles = {(x, y) for x, row in enumerate(self.rows) for y, c in enumerate(row) if c == "X"}
+        b.end_player, b.end_ai, b.end_blue, b.end_red = self.goals
+        now = time.time()
+        robots = [rs.restore(now) for rs in self.robots]
+        if projectiles is not None:
+            projectiles.clear()
+            for src, dst, age, flight, dmg, owner in self.projectiles:
+                projectiles.spawn(src, dst, owner, dmg, flight, elapsed=age)
+        if rng and self.rng_state is not None:
+            random.setstate(self.rng_state)
+        return b, robots
+
+    # ---------- Fork / copy-on-write edits ----------
+    def fork(self):
+        s = GameSnapshot(self.size, self.rows, self.resources, self.traps, self.goals,
+                         self.robots, self.projectiles, self.turn, self.rng_state)
+        self._own_items = False     # the dicts are shared now: both sides copy before writing
+        self._own_rows = False
+        return s
+
+    def _items(self):
+        if not self._own_items:
+            self.resources = dict(self.resources)
+            self.traps = dict(self.traps)
+            self._own_items = True
+
+    def cell(self, pos):
+        return self.rows[pos[0]][pos[1]]
+
+    def set_cell(self, pos, ch):
+        x, y = pos
+        if not self._own_rows:
+            self.rows = list(self.rows)
+            self._own_rows = True
+        row = self.rows[x]
+        self.rows[x] = row[:y] + ch + row[y+1:]
+
+    def take_item(self, pos):
+        """Remove resource/trap at pos (pickup or trigger); returns (kind, type) or None."""
+        if pos not in self.resources and pos not in self.traps:
+            return None
+        self._items()
+        self.set_cell(pos, ".")
+        if pos in self.resources:
+            return 'resource', self.resources.pop(pos)
+        return 'trap', self.traps.pop(pos)
+
+    def set_robot(self, idx, **changes):
+        robots = list(self.robots)
+        robots[idx] = robots[idx].replace(**changes)
+        self.robots = tuple(robots)
+
+    # ---------- Flat bytes ----------
+    def to_bytes(self):
+        out = [MAGIC, struct.pack("<HiHHHH", self.size, self.turn, len(self.resources),
+                                  len(self.traps), len(self.robots), len(self.projectiles))]
+        out.append("".join(self.rows).encode("ascii"))
+        for (x, y), t in self.resources.items():
+            out.append(struct.pack("<HHB", x, y, RES_NAMES.index(t)))
+        for (x, y), t in self.traps.items():
+            out.append(struct.pack("<HHB", x, y, TRAP_NAMES.index(t)))
+        for g in self.goals:
+            out.append(struct.pack("<HH", *g))
+        for rs in self.robots:
+            for text in (rs.name, rs.personality):
+                raw = text.encode("utf-8")
+                out.append(struct.pack("<B", len(raw)) + raw)
+            out.append(struct.pack("<hhii", rs.pos[0], rs.pos[1], rs.health, rs.score))
+            out.append(struct.pack(f"<{len(INT_FIELDS)}i", *rs.ints))
+            for p in rs.poss:
+                out.append(struct.pack("<hh", *(p if p is not None else NO_POS)))
+            pt, pturns = rs.pending if rs.pending else (NO_POS, 0)
+            out.append(struct.pack("<Bhhh", rs.pending is not None, pt[0], pt[1], pturns))
+            out.append(struct.pack("<B", len(rs.buffs)))
+            for b, left in rs.buffs:
+                raw = b.encode("utf-8")
+                out.append(struct.pack("<B", len(raw)) + raw + struct.pack("<f", left))
+        for src, dst, age, flight, dmg, owner in self.projectiles:
+            out.append(struct.pack("<hhhhiihb", *src, *dst, age, flight, dmg, owner))
+        if self.rng_state is not None:
+            version, state, gauss = self.rng_state
+            out.append(struct.pack("<BB", 1, version))
+            out.append(struct.pack(f"<{len(state)}I", *state))
+            out.append(struct.pack("<Bd", gauss is not None, gauss or 0.0))
+        else:
+            out.append(struct.pack("<B", 0))
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, buf):
+        mv = memoryview(buf)
+        if bytes(mv[:4]) != MAGIC:
+            raise ValueError("not a game snapshot")
+        off = 4
+        def take(fmt):
+            nonlocal off
+            vals = struct.unpack_from(fmt, mv, off)
+            off += struct.calcsize(fmt)
+            return vals
+        def take_str():
+            nonlocal off
+            (ln,) = take("<B")
+            s = bytes(mv[off:off+ln]).decode("utf-8")
+            off += ln
+            return s
+
+        size, turn, nres, ntrap, nrob, nproj = take("<HiHHHH")
+        flat = bytes(mv[off:off+size*size]).decode("ascii")
+        off += size*size
+        rows = tuple(flat[i*size:(i+1)*size] for i in range(size))
+        resources, traps = {}, {}
+        for _ in range(nres):
+            x, y, t = take("<HHB"); resources[(x, y)] = RES_NAMES[t]
+        for _ in range(ntrap):
+            x, y, t = take("<HHB"); traps[(x, y)] = TRAP_NAMES[t]
+        goals = tuple(take("<HH") for _ in range(4))
+        robots = []
+        for _ in range(nrob):
+            name, pers = take_str(), take_str()
+            px, py, health, score = take("<hhii")
+            ints = take(f"<{len(INT_FIELDS)}i")
+            poss = tuple(None if p == NO_POS else p for p in (take("<hh") for _ in POS_FIELDS))
+            has_p, tx, ty, turns = take("<Bhhh")
+            (nb,) = take("<B")
+            buffs = []
+            for _ in range(nb):
+                b = take_str(); (left,) = take("<f")
+                buffs.append((b, left))
+            robots.append(RobotState(name, pers, (px, py), health, score, tuple(buffs), ints, poss,
+                                     ((tx, ty), turns) if has_p else None))
+        shots = []
+        for _ in range(nproj):
+            sx, sy, dx, dy, age, flight, dmg, owner = take("<hhhhiihb")
+            shots.append(((sx, sy), (dx, dy), age, flight, dmg, owner))
+        (has_rng,) = take("<B")
+        rng_state = None
+        if has_rng:
+            (version,) = take("<B")
+            state = take("<625I")
+            has_g, g = take("<Bd")
+            rng_state = (version, state, g if has_g else None)
+        snap = cls(size, rows, resources, traps, goals, tuple(robots), tuple(shots), turn, rng_state)
+        snap._own_items = True
+        return snap
@@ -0,0 +1,156 @@
+# spatial_index.py
+# Bucket-grid index over resources, traps and robots.
+#
+# The board is cut into BUCKET x BUCKET cells; each bucket keeps the items and
+# robots inside it. Nearest queries walk buckets in rings around the query
+# cell and stop as soon as no unvisited bucket can hold anything closer, so
+# cost depends on local density rather than the total number of items.
+# Items are kept current through Board listeners (pickup / trap trigger),
+# robots through Robot.move.
+BUCKET = 8
+
+def _manhattan(a, b):
+    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+
+class SpatialIndex:
+    def __init__(self, board, bucket=BUCKET):
+        self.board = board
+        self.bucket = bucket
+        self.nb = (board.size + bucket - 1) // bucket
+        self.items = {}       # (bx,by) -> {pos: (kind, type)}
+        self.robots = {}      # (bx,by) -> set of robots
+        self._robot_cell = {} # id(robot) -> bucket
+        for pos, t in board.resources.items():
+            self.add_item(pos, 'resource', t)
+        for pos, t in board.traps.items():
+            self.add_item(pos, 'trap', t)
+
+    def _key(self, pos):
+        return (pos[0] // self.bucket, pos[1] // self.bucket)
+
+    # ---------- Updates ----------
+    def add_item(self, pos, kind, t):
+        self.items.setdefault(self._key(pos), {})[pos] = (kind, t)
+
+    def remove_item(self, pos):
+        b = self.items.get(self._key(pos))
+        if b is not None:
+            b.pop(pos, None)
+
+    def on_board_change(self, kind, pos):
+        if kind in ('resource_removed', 'trap_removed'):
+            self.remove_item(pos)
+        elif kind == 'resource_added':
+            self.add_item(pos, 'resource', self.board.resources[pos])
+        elif kind == 'trap_added':
+            self.add_item(pos, 'trap', self.board.traps[pos])
+
+    def add_robot(self, robot):
+        key = self._key(robot.pos)
+        self.robots.setdefault(key, set()).add(robot)
+        self._robot_cell[id(robot)] = key
+
+    def move_robot(self, robot):
+        key = self._key(robot.pos)
+        old = self._robot_cell.get(id(robot))
+        if old == key:
+            return
+        if old is not None:
+            self.robots[old].discard(robot)
+        self.robots.setdefault(key, set()).add(robot)
+        self._robot_cell[id(robot)] = key
+
+    def remove_robot(self, robot):
+        old = self._robot_cell.pop(id(robot), None)
+        if old is not None:
+            self.robots[old].discard(robot)
+
+    # ---------- Queries ----------
+    def _ring(self, key, r):
+        """Bucket keys at Chebyshev distance exactly r from key (clipped to the board)."""
+        bx, by = key
+        n = self.nb
+        if r == 0:
+            yield key
+            return
+        for x in range(max(0, bx-r), min(n, bx+r+1)):
+            if abs(x-bx) == r:
+                for y in range(max(0, by-r), min(n, by+r+1)):
+                    yield (x, y)
+            else:
+                if by-r >= 0: yield (x, by-r)
+                if by+r < n: yield (x, by+r)
+
+    def nearest(self, pos, k=1, kind='resource', types=None, where=None):
+        """Up to k (dist, pos, type) of the closest items, nearest first.
+        where(pos) can veto items (e.g. unreachable ones)."""
+        key = self._key(pos)
+        found = []
+        for r in range(self.nb):
+            for bk in self._ring(key, r):
+                for p, (kd, t) in self.items.get(bk, {}).items():
+                    if kd == kind and (types is None or t in types) and (where is None or where(p)):
+                        found.append((_manhattan(pos, p), p, t))
+            # anything in ring r+1 or further is at least r*bucket+1 away
+            if len(found) >= k:
+                found.sort()
+                if found[k-1][0] <= r * self.bucket:
+                    return found[:k]
+        found.sort()
+        return found[:k]
+
+    def nearest_pos(self, pos, kind='resource', types=None, where=None):
+        hit = self.nearest(pos, 1, kind, types, where)
+        return hit[0][1] if hit else None
+
+    def _buckets_within(self, pos, radius):
+        b = self.bucket
+        x0, x1 = max(0, (pos[0]-radius)//b), min(self.nb-1, (pos[0]+radius)//b)
+        y0, y1 = max(0, (pos[1]-radius)//b), min(self.nb-1, (pos[1]+radius)//b)
+        for bx in range(x0, x1+1):
+            for by in range(y0, y1+1):
+                yield (bx, by)
+
+    def within(self, pos, radius, kind=None, types=None):
+        """[(dist, pos, kind, type)] of items within Manhattan radius, nearest first."""
+        out = []
+        for bk in self._buckets_within(pos, radius):
+            for p, (kd, t) in self.items.get(bk, {}).items():
+                if (kind is None or kd == kind) and (types is None or t in types):
+                    d = _manhattan(pos, p)
+                    if d <= radius:
+                        out.append((d, p, kd, t))
+        out.sort()
+        return out
+
+    def robots_within(self, pos, radius, exclude=None):
+        """Robots within Manhattan radius of pos (except `exclude`)."""
+        out = []
+        for bk in self._buckets_within(pos, radius):
+            for rb in self.robots.get(bk, ()):
+                if rb is not exclude and _manhattan(pos, rb.pos) <= radius:
+                    out.append(rb)
+        return out
+
+def attach_index(board, robots=(), bucket=BUCKET):
+    """Index board's items (and robots) and keep it updated on pickups."""
+    board.index = SpatialIndex(board, bucket)
+    board.add_listener(board.index.on_board_change)
+    for r in robots:
+        board.index.add_robot(r)
+    return board.index
+
+def nearest_resource(pos, board, types=None):
+    """Closest reachable resource cell to pos, or None; uses board.index when present."""
+    comps = getattr(board, 'components', None)
+    where = None
+    if comps is not None:
+        where = lambda p: comps.reachable(pos, p)
+    index = getattr(board, 'index', None)
+    if index is not None:
+        return index.nearest_pos(pos, 'resource', types, where)
+    cells = [p for p, t in board.resources.items()
+             if (types is None or t in types) and (where is None or where(p))]
+    if not cells:
+        return None
+    return min(cells, key=lambda r: (_manhattan(pos, r), r))
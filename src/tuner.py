@@ -0,0 +1,182 @@
+# tuner.py
+# Self-play tuner for the strategy parameters (ai_strategies.DEFAULT_PARAMS).
+#
+# Each candidate vector plays a block of headless matches against the
+# defaults, in a process pool:
+#   - as red with ai_decision (the PvE AI) against the default ai_vs_ai blue,
+#   - with ai_vs_ai_decision on alternating sides against the default.
+# All candidates of a generation use the same seeds (common random numbers),
+# so differences come from the parameters rather than the boards.
+#
+# Search is a (mu, lambda) evolution strategy in the unit cube of PARAM_BOUNDS
+# with a log-normal step size. The state is checkpointed as JSON after every
+# generation and a run resumes from it; profiles are written for
+# ai_strategies.load_profiles.
+#
+#   python tuner.py [generations] [checkpoint.json] [profiles.json]
+#
+# Profiles default to src/profiles.json (PROFILES_PATH), where the game loads them.
+import json, math, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import robot
+from ai_strategies import DEFAULT_PARAMS, PROFILES_PATH, ai_decision
+from simulation import play_match, setup_level, LEVELS, PERSONALITIES
+
+# name -> (low, high); ints stay ints
+PARAM_BOUNDS = {
+    'aggr_attack_bias': (0.0, 1.0), 'aggr_gather': (0.0, 1.5),
+    'def_attack_scale': (0.0, 1.5), 'def_retreat_bias': (0.0, 1.0), 'def_gather': (0.0, 2.0),
+    'bal_gather': (0.0, 1.5),
+    'easy_attack': (0.2, 2.0), 'easy_gather': (0.2, 2.0),
+    'medium_attack': (0.2, 2.0), 'medium_gather': (0.2, 2.0),
+    'hard_attack': (0.2, 2.0), 'hard_gather': (0.2, 2.0),
+    'easy_res_range': (2, 16), 'easy_end_near': (0, 12), 'easy_end_span': (2, 20),
+    'easy_gather_res_w': (0.0, 1.0), 'easy_goal_res_w': (0.0, 1.0),
+    'medium_res_range': (2, 16), 'medium_end_near': (0, 12), 'medium_end_span': (2, 20),
+    'medium_gather_res_w': (0.0, 1.0), 'medium_goal_res_w': (0.0, 1.0),
+    'hard_res_range': (2, 16), 'hard_end_near': (0, 12), 'hard_end_span': (2, 20),
+    'hard_attack_far_w': (0.0, 1.0), 'hard_cooldown_damp': (0.0, 1.0),
+    'hard_goal_w': (0.0, 1.5), 'hard_gather_w': (0.0, 1.5), 'hard_ranged_cooldown': (1, 6),
+    'ranged_min': (3, 5), 'ranged_max': (3, 8), 'ranged_cooldown': (1, 6), 'intercept_radius': (2, 12),
+}
+NAMES = sorted(PARAM_BOUNDS)
+
+# Target AI win rate per difficulty; None = as strong as possible
+PROFILE_TARGETS = {'easy': 0.3, 'medium': 0.5, 'hard': None}
+
+POPULATION = 12      # lambda
+PARENTS = 4          # mu
+GAMES = 24           # matches per candidate per generation
+SIGMA0 = 0.15        # initial step in unit-cube coordinates
+TAU = 1/math.sqrt(2*len(NAMES))
+
+# ---------- Vector <-> params ----------
+def encode(params):
+    out = []
+    for k in NAMES:
+        lo, hi = PARAM_BOUNDS[k]
+        out.append((params[k]-lo)/(hi-lo))
+    return out
+
+def decode(x):
+    params = dict(DEFAULT_PARAMS)
+    for k, v in zip(NAMES, x):
+        lo, hi = PARAM_BOUNDS[k]
+        v = lo + min(1.0, max(0.0, v))*(hi-lo)
+        params[k] = int(round(v)) if isinstance(DEFAULT_PARAMS[k], int) else round(v, 4)
+    if params['ranged_max'] < params['ranged_min']:
+        params['ranged_max'] = params['ranged_min']
+    return params
+
+# ---------- Evaluation (workers) ----------
+def _quiet():
+    robot.VERBOSE = False
+
+def _setup(level, params, side, game):
+    board, blue, red = setup_level(level, PERSONALITIES[game % 3], PERSONALITIES[(game//3) % 3])
+    blue.params, red.params = (params, DEFAULT_PARAMS) if side == 0 else (DEFAULT_PARAMS, params)
+    return board, blue, red
+
+def play_game(params, level, seed, game):
+    """Score of the candidate in one match: 1 win, 0.5 draw, 0 loss."""
+    if game % 2 == 0:
+        # PvE AI: candidate plays red with ai_decision
+        side = 1
+        rec = play_match(level, seed=seed, red_decide=ai_decision,
+                         setup=partial(_setup, params=params, side=side, game=game))
+    else:
+        side = (game // 2) % 2
+        rec = play_match(level, seed=seed, setup=partial(_setup, params=params, side=side, game=game))
+    if rec['winner'] == 'draw':
+        return 0.5
+    return 1.0 if rec['winner'] == ('blue', 'red')[side] else 0.0
+
+def _play(args):
+    return play_game(*args)
+
+def fitness(win_rate, level):
+    target = PROFILE_TARGETS.get(level)
+    return win_rate if target is None else -abs(win_rate - target)
+
+def evaluate(pool, candidates, level, seeds):
+    """Win rate of each candidate over the same seeds."""
+    jobs = [(c, level, s, g) for c in candidates for g, s in enumerate(seeds)]
+    scores = list(pool.map(_play, jobs, chunksize=max(1, len(jobs)//(4*(os.cpu_count() or 1)))))
+    n = len(seeds)
+    return [sum(scores[i*n:(i+1)*n])/n for i in range(len(candidates))]
+
+# ---------- Checkpoint ----------
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, path)   # never leave a half-written checkpoint
+
+def write_profiles(path, state):
+    profiles = {lv: st['best_params'] for lv, st in state.items() if 'best_params' in st}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({'profiles': profiles, 'targets': PROFILE_TARGETS}, f, indent=1)
+    os.replace(tmp, path)   # the game may be loading it
+
+# ---------- Search ----------
+def tune_level(pool, level, st, generations, games=GAMES, log=print):
+    """Run `generations` more ES generations for one level; st is updated in place."""
+    rng = random.Random(st.get('rng_seed', 0) + st.get('gen', 0))
+    if 'mean' not in st:
+        st.update(gen=0, mean=encode(DEFAULT_PARAMS), sigma=SIGMA0,
+                  best_fit=None, best_params=dict(DEFAULT_PARAMS), history=[])
+    for _ in range(generations):
+        gen = st['gen']
+        seeds = [1_000_000*(gen+1) + i for i in range(games)]
+        sigmas = [st['sigma']*math.exp(TAU*rng.gauss(0, 1)) for _ in range(POPULATION)]
+        xs = [[min(1.0, max(0.0, m + s*rng.gauss(0, 1))) for m in st['mean']] for s in sigmas]
+        cands = [decode(x) for x in xs]
+        cands_mean = decode(st['mean'])
+        best = dict(DEFAULT_PARAMS, **st['best_params'])
+        # the current mean and the incumbent best are re-evaluated on the same
+        # seeds, so the best is only replaced by something better on this block
+        rates = evaluate(pool, cands + [cands_mean, best], level, seeds)
+        fits = [fitness(r, level) for r in rates]
+        order = sorted(range(POPULATION), key=lambda i: -fits[i])[:PARENTS]
+        st['mean'] = [sum(xs[i][j] for i in order)/PARENTS for j in range(len(NAMES))]
+        st['sigma'] = math.exp(sum(math.log(sigmas[i]) for i in order)/PARENTS)
+        top = order[0]
+        if fits[-2] >= fits[top]:
+            top_fit, top_params, top_rate = fits[-2], cands_mean, rates[-2]
+        else:
+            top_fit, top_params, top_rate = fits[top], cands[top], rates[top]
+        if top_fit > fits[-1]:
+            st['best_fit'], st['best_params'] = top_fit, top_params
+        else:
+            st['best_fit'] = fits[-1]
+        st['history'].append({'gen': gen, 'best_rate': top_rate, 'fit': top_fit, 'sigma': st['sigma']})
+        st['gen'] = gen + 1
+        log(f"[{level}] gen {gen}: win rate {top_rate:.2f} fit {top_fit:+.3f} sigma {st['sigma']:.3f}")
+        yield st
+
+def tune(generations=10, checkpoint="tuning.json", profiles=PROFILES_PATH, levels=LEVELS, workers=None):
+    state = load_checkpoint(checkpoint)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_quiet) as pool:
+        for level in levels:
+            st = state.setdefault(level, {})
+            for _ in tune_level(pool, level, st, generations):
+                save_checkpoint(checkpoint, state)
+                write_profiles(profiles, state)
+    return state
+
+if __name__ == "__main__":
+    gens = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    ckpt = sys.argv[2] if len(sys.argv) > 2 else "tuning.json"
+    prof = sys.argv[3] if len(sys.argv) > 3 else PROFILES_PATH
+    t0 = time.time()
+    tune(gens, ckpt, prof)
+    print(f"done in {time.time()-t0:.0f}s -> {prof}")
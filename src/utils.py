@@ -14,6 +14,19 @@ IMAGES = {}
 SFX = {}
 CELL_IMG_SIZE = 64  # overwritten by init_assets(cell_size)
 
+# Cell sprites are packed side by side into one atlas per cell size
+SPRITES = [  # (key, file, subdir)
+    ("robot_blue", "blue.png", "robots"),
+    ("robot_red",  "red.png", "robots"),
+    ("coin",       "coin.png", None),
+    ("heart",      "heart.png", None),
+    ("bonus",      "bonus.png", None),
+    ("trap",       "trap.png", None),
+    ("obstacle",   "obstacle.png", None),
+]
+_SPRITE_SRC = {}   # key -> unscaled surface
+_ATLASES = {}      # cell size -> (atlas surface, {key: Rect})
+
 # ---------- Helpers ----------
 def _ensure_pygame_inited():
     if not pygame.get_init():
@@ -130,21 +143,15 @@ def init_assets(cell_size, screen_size):
     CELL_IMG_SIZE = cell_size
     bg_path = ensure_assets(screen_size)
 
-    # Load images
-    def load_scale(name, sub=None):
+    # Load images (once); scaled copies live in the per-size atlases
+    _SPRITE_SRC.clear()
+    _ATLASES.clear()
+    for key, name, sub in SPRITES:
         path = os.path.join(IMG_DIR if not sub else os.path.join(IMG_DIR, sub), name)
-        img = pygame.image.load(path).convert_alpha()
-        return pygame.transform.smoothscale(img, (CELL_IMG_SIZE, CELL_IMG_SIZE))
-
-    IMAGES = {
-        "robot_blue": load_scale("blue.png", sub="robots"),
-        "robot_red":  load_scale("red.png", sub="robots"),
-        "coin":       load_scale("coin.png"),
-        "heart":      load_scale("heart.png"),
-        "bonus":      load_scale("bonus.png"),
-        "trap":       load_scale("trap.png"),
-        "obstacle":   load_scale("obstacle.png"),
-    }
+        _SPRITE_SRC[key] = pygame.image.load(path).convert_alpha()
+
+    atlas, rects = get_atlas(CELL_IMG_SIZE)
+    IMAGES = {key: atlas.subsurface(r) for key, r in rects.items()}
 
     bg_raw = pygame.image.load(os.path.join(IMG_DIR, "background.png")).convert()
     IMAGES["background"] = bg_raw
@@ -168,6 +175,21 @@ def start_music(loop=True):
             pygame.mixer.music.play(-1 if loop else 0)
             break
 
+def get_atlas(cell_size):
+    """(atlas, {key: Rect}) for sprites scaled to cell_size; built once per size."""
+    hit = _ATLASES.get(cell_size)
+    if hit is None:
+        atlas = pygame.Surface((cell_size*len(SPRITES), cell_size), pygame.SRCALPHA)
+        rects = {}
+        for i, (key, _, _) in enumerate(SPRITES):
+            img = pygame.transform.smoothscale(_SPRITE_SRC[key], (cell_size, cell_size))
+            rects[key] = pygame.Rect(i*cell_size, 0, cell_size, cell_size)
+            atlas.blit(img, rects[key].topleft)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        hit = _ATLASES[cell_size] = (atlas, rects)
+    return hit
+
 def get_image(key):
     return IMAGES.get(key)
 
@@ -0,0 +1,4 @@
+# The game modules are flat files in src/ (run from there), so put it on the path.
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
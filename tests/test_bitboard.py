@@ -0,0 +1,24 @@
+from board import Board
+from bitboard import Bitboard
+
+def _board(rows):
+    b = Board(len(rows), populate=False)
+    b.grid = [list(r) for r in rows]
+    return b
+
+def test_wall_ends_are_unreachable():
+    bits = Bitboard(_board(["..X",
+                            "..X",
+                            "..."]))
+    assert not bits.reachable((0, 2), (0, 0))
+    assert not bits.reachable((0, 0), (0, 2))
+    assert bits.distance((0, 2), (0, 2)) is None
+    assert bits.distance((0, 2), (2, 2)) is None
+
+def test_distance_walks_around_walls():
+    bits = Bitboard(_board(["...",
+                            "XX.",
+                            "..."]))
+    assert bits.reachable((0, 0), (2, 0))
+    assert bits.distance((0, 0), (2, 0)) == 6
+    assert bits.distance((0, 0), (0, 0)) == 0
@@ -0,0 +1,12 @@
+from ratings import llr, sprt_bounds
+
+def test_one_sided_results_reach_the_bounds():
+    lower, upper = sprt_bounds()
+    assert llr(200, 0, 0, 0, 10) > upper
+    assert llr(0, 0, 300, 0, 10) < lower
+    assert llr(0, 200, 0, 0, 10) < lower      # all draws: not better
+
+def test_llr_sign_and_growth():
+    assert llr(0, 0, 0, 0, 10) == 0.0
+    assert llr(60, 20, 40, 0, 10) > 0 > llr(40, 20, 60, 0, 10)
+    assert llr(120, 40, 80, 0, 10) > llr(60, 20, 40, 0, 10)
@@ -0,0 +1,44 @@
+import random
+
+from board import Board
+from robot import Robot
+from snapshot import GameSnapshot
+
+def _snapshot():
+    random.seed(3)
+    board = Board(12)
+    return GameSnapshot.capture(board, [Robot("Player", (0, 0)), Robot("AI", (11, 11))])
+
+def test_fork_is_unchanged_by_parent_edits():
+    parent = _snapshot()
+    child = parent.fork()
+    resources, rows, raw = dict(child.resources), child.rows, child.to_bytes()
+    pos = next(iter(parent.resources))
+    assert parent.take_item(pos) == ('resource', resources[pos])
+    assert child.resources == resources
+    assert child.rows == rows
+    assert child.cell(pos) == "E"
+    assert child.to_bytes() == raw
+
+def test_parent_is_unchanged_by_fork_edits():
+    parent = _snapshot()
+    resources, raw = dict(parent.resources), parent.to_bytes()
+    child = parent.fork()
+    child.take_item(next(iter(child.resources)))
+    assert parent.resources == resources
+    assert parent.to_bytes() == raw
+
+def test_bytes_round_trip():
+    snap = _snapshot()
+    assert GameSnapshot.from_bytes(snap.to_bytes()).to_bytes() == snap.to_bytes()
+
+def test_fork_copies_rows_once():
+    parent = _snapshot()
+    child = parent.fork()
+    a, b = list(child.resources)[:2]
+    child.take_item(a)
+    rows = child.rows
+    child.take_item(b)
+    assert child.rows is rows
+    assert parent.cell(a) == parent.cell(b) == "E"
+    assert child.cell(a) == child.cell(b) == "."